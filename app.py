@@ -1,10 +1,25 @@
 """Streamlit-Webplattform für die Haltungsform-Vorabschätzung."""
 
-import base64
+import csv
+import hashlib
+import io
+import sqlite3
+import time
+import tracemalloc
+import zipfile
+from datetime import date
 
 import pandas as pd
 import streamlit as st
 
+from src import instrumentation
+from src.frames import (
+    frame_to_ist_rows,
+    frame_to_plan_rows,
+    ist_rows_to_frame,
+    plan_rows_to_frame,
+)
+from src.jobs import DONE, FAILED, QUEUED, JobQueue
 from src.models import (
     AMPEL_DISPLAY,
     AMPEL_LABELS,
@@ -15,12 +30,13 @@ from src.models import (
     AmpelColor,
     Assessment,
     FarmProject,
-    IstZustandRow,
-    PlanZustandRow,
+    Nachbarbetrieb,
     Pruefungserfordernis,
 )
-from src.pdf_generator import generate_pdf, generate_pdf_kurz
-from src.tim_online import build_tim_online_url
+from src.nachbarbetriebe import FarmRegister
+from src.pdf_generator import generate_pdf, generate_pdf_kurz, generate_reports
+from src.project_store import ProjectStore
+from src.tim_online import build_tim_online_url, geocode_utm, normalize_address
 from src.xlsx_parser import parse_xlsx
 
 st.set_page_config(
@@ -29,6 +45,13 @@ st.set_page_config(
     layout="wide",
 )
 
+_rerun_started = time.perf_counter()
+
+# Kantenlänge der Lageplan-Vorschau in Pixeln
+_PREVIEW_MAX_PX = 800
+# Anzahl der Seitenaufbauten, über die die Laufzeitanzeige mittelt
+_RERUN_HISTORY = 20
+
 st.title("Immissionsschutztechnische Vorabschätzung")
 st.caption("Änderung der Haltungsform in der Schweinemast")
 
@@ -45,6 +68,9 @@ def _init_state():
         "standort_text": "",
         "zusammenfassung_text": "",
         "lageplan_bytes": None,
+        "lageplan_digest": None,
+        # ID des gespeicherten Entwurfs (None = noch nicht gespeichert)
+        "draft_id": None,
         # Ampel-Bewertungen (Index in AMPEL_LABELS keys)
         "gen_aufwand": "Grün",
         "gen_begr_aufwand": "",
@@ -67,14 +93,16 @@ def _init_state():
         "pruef_plan": "Ja",
         "pruef_gesamt": "Ja",
         "pruef_minderung": "Nein",
+        # Nachbarbetriebe aus dem Betriebsregister (Umkreis 0 = nicht ermittelt)
+        "nachbar_radius": 600,
+        "nachbar_umkreis": 0,
+        "nachbarbetriebe_liste": [],
         # Dataframes für Ist/Plan-Zustand
-        "ist_df": pd.DataFrame(columns=[
-            "BE-Nr.", "Tierart", "Tierplätze", "Ausführung", "Kamine", "S.d.T."
-        ]),
-        "plan_df": pd.DataFrame(columns=[
-            "BE-Nr.", "Tierart", "Tierplätze", "Ausführung"
-        ]),
-        "xlsx_parsed": False,
+        "ist_df": ist_rows_to_frame([]),
+        "plan_df": plan_rows_to_frame([]),
+        # SHA-256 der zuletzt übernommenen XLSX-Datei
+        "xlsx_hash": None,
+        "rerun_times": [],
     }
     for key, val in defaults.items():
         if key not in st.session_state:
@@ -83,6 +111,255 @@ def _init_state():
 
 _init_state()
 
+
+@st.cache_resource
+def _get_job_queue() -> JobQueue:
+    """Prozessweite Render-Warteschlange, gemeinsam für alle Sitzungen."""
+    return JobQueue(max_workers=2)
+
+
+@st.cache_resource
+def _get_project_store() -> ProjectStore:
+    """Prozessweite Ablage der Projektentwürfe."""
+    try:
+        return ProjectStore()
+    except (OSError, sqlite3.Error):
+        # Kein beschreibbares Datenverzeichnis: Entwürfe nur bis zum Neustart
+        return ProjectStore(":memory:")
+
+
+# Rückabbildung AmpelColor -> Beschriftung der Auswahlfelder
+_AMPEL_NAMES = {color: label for label, color in AMPEL_LABELS.items()}
+
+
+def _apply_project(project: FarmProject) -> None:
+    """Überträgt ein FarmProject in den Session State (Umkehrung von _build_project).
+
+    Setzt neben den allgemeinen Keys auch die Widget-Keys, damit die
+    Eingabefelder die Werte beim nächsten Durchlauf übernehmen.
+    """
+    def _schwierigkeit(value: str) -> str:
+        try:
+            return _AMPEL_NAMES[AmpelColor(value)]
+        except ValueError:
+            # "Kein Einfluss" hat kein Auswahlfeld
+            return "Grün"
+
+    values = {
+        # state key: (Wert, Widget-Key)
+        "strasse": (project.strasse, "inp_strasse"),
+        "hausnummer": (project.hausnummer, "inp_hausnummer"),
+        "plz": (project.plz, "inp_plz"),
+        "ort": (project.ort, "inp_ort"),
+        "projektnummer": (project.projektnummer, "inp_projektnummer"),
+        "genehmigung_text": (project.genehmigung_text, "gen_text"),
+        "standort_text": (project.standort_text, None),
+        "zusammenfassung_text": (project.zusammenfassung_text, "zusammenfassung_input"),
+        "gen_aufwand": (_AMPEL_NAMES[project.genehmigung.aufwand], "gen_aufwand_sel"),
+        "gen_begr_aufwand": (project.genehmigung.begruendung_aufwand, "gen_begr_a"),
+        "pruef_geruch": (project.pruefung.geruchshaeufigkeiten, "pruef_geruch_sel"),
+        "pruef_stickstoff": (project.pruefung.stickstoffdeposition, "pruef_stickstoff_sel"),
+        "pruef_ist": (project.pruefung.ausbreitung_ist, "pruef_ist_sel"),
+        "pruef_plan": (project.pruefung.ausbreitung_plan, "pruef_plan_sel"),
+        "pruef_gesamt": (project.pruefung.ausbreitung_gesamt, "pruef_gesamt_sel"),
+        "pruef_minderung": (project.pruefung.minderungsmassnahmen, "pruef_minderung_sel"),
+    }
+    for prefix, assessment in (
+        ("imm", project.immissionsorte),
+        ("nach", project.nachbarbetriebe),
+        ("ip", project.ist_plan),
+    ):
+        values.update({
+            f"{prefix}_aufwand": (_AMPEL_NAMES[assessment.aufwand], f"{prefix}_aufwand_sel"),
+            f"{prefix}_schwierigkeit": (
+                _schwierigkeit(assessment.schwierigkeit), f"{prefix}_schwierigkeit_sel",
+            ),
+            f"{prefix}_begr_aufwand": (assessment.begruendung_aufwand, f"{prefix}_begr_a"),
+            f"{prefix}_begr_schwierigkeit": (
+                assessment.begruendung_schwierigkeit, f"{prefix}_begr_s",
+            ),
+        })
+
+    for key, (value, widget_key) in values.items():
+        st.session_state[key] = value
+        if widget_key is not None:
+            st.session_state[widget_key] = value
+
+    st.session_state.ist_df = ist_rows_to_frame(project.ist_zustand)
+    st.session_state.plan_df = plan_rows_to_frame(project.plan_zustand)
+    # Bearbeitungsstand der Tabellen-Editoren verwerfen
+    for editor_key in ("ist_editor", "plan_editor"):
+        st.session_state.pop(editor_key, None)
+
+    st.session_state.lageplan_bytes = project.lageplan
+    st.session_state.lageplan_digest = project.lageplan_sha256
+
+    st.session_state.nachbar_umkreis = project.nachbar_umkreis
+    st.session_state.nachbarbetriebe_liste = list(project.nachbarbetriebe_liste)
+    if project.nachbar_umkreis:
+        st.session_state.nachbar_radius = project.nachbar_umkreis
+        st.session_state.nachbar_radius_input = project.nachbar_umkreis
+
+
+def _resume_draft(project_id: str) -> None:
+    """Callback: lädt einen gespeicherten Entwurf in die Sitzung."""
+    try:
+        project = _get_project_store().load(project_id)
+    except KeyError:
+        st.session_state.draft_error = "Der Entwurf existiert nicht mehr."
+        return
+    _apply_project(project)
+    st.session_state.draft_id = project_id
+
+
+def _file_digest(uploaded, memo_key: str) -> str:
+    """SHA-256 einer hochgeladenen Datei, je Upload nur einmal berechnet.
+
+    Unter ``memo_key`` wird nur der zuletzt berechnete Upload gemerkt
+    (``(file_id, digest)``), damit die Sitzung nicht mit jedem Upload wächst.
+    """
+    memo = st.session_state.get(memo_key)
+    if memo is not None and memo[0] == uploaded.file_id:
+        return memo[1]
+    digest = hashlib.sha256(uploaded.getvalue()).hexdigest()
+    st.session_state[memo_key] = (uploaded.file_id, digest)
+    return digest
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _parse_xlsx_cached(file_hash: str, _file_bytes: bytes) -> dict:
+    """parse_xlsx, zwischengespeichert anhand des Datei-Hashes."""
+    return parse_xlsx(_file_bytes)
+
+
+class _GeocodingFailed(Exception):
+    """Kein Geocoding-Ergebnis; Ausnahmen werden von st.cache_data nicht gespeichert.
+
+    Nicht gefundene Adressen cacht bereits der Geocoding-Cache (kurze
+    Gültigkeit), Dienstfehler gar nicht – der nächste Lauf versucht es erneut.
+    """
+
+
+@st.cache_data(ttl=24 * 3600, max_entries=256, show_spinner=False)
+def _tim_online_url_cached(strasse: str, hausnummer: str, plz: str, ort: str) -> str:
+    """Tim-Online-Link, zwischengespeichert je Schreibweise der Adresse.
+
+    Der Link enthält den Adresstext wie eingegeben; verschiedene
+    Schreibweisen teilen sich nur die Koordinaten im Geocoding-Cache.
+
+    Raises:
+        _GeocodingFailed: Wenn der Standort nicht geocodiert werden konnte.
+    """
+    url = build_tim_online_url(strasse=strasse, hausnummer=hausnummer, plz=plz, ort=ort)
+    if url is None:
+        raise _GeocodingFailed
+    return url
+
+
+@st.cache_data(ttl=24 * 3600, max_entries=256, show_spinner=False)
+def _utm_cached(
+    address_key: tuple[str, str, str, str],
+    _strasse: str,
+    _hausnummer: str,
+    _plz: str,
+    _ort: str,
+) -> tuple[float, float]:
+    """UTM32-Koordinaten des Standorts, zwischengespeichert anhand der normalisierten Adresse.
+
+    Raises:
+        _GeocodingFailed: Wenn der Standort nicht geocodiert werden konnte.
+    """
+    coords = geocode_utm(_strasse, _hausnummer, _plz, _ort)
+    if coords is None:
+        raise _GeocodingFailed
+    return coords
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _farm_register(digest: str, _data: bytes) -> FarmRegister:
+    """Index des hochgeladenen Betriebsregisters, je Dateiinhalt nur einmal aufgebaut."""
+    try:
+        text = _data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        # CSV-Export aus Excel
+        text = _data.decode("cp1252")
+    return FarmRegister.from_csv(io.StringIO(text, newline=""))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _lageplan_preview(digest: str, _image_bytes: bytes) -> bytes:
+    """Verkleinerte Vorschau des Lageplans für die Anzeige im Browser."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(_image_bytes)) as img:
+            img.draft("RGB", (_PREVIEW_MAX_PX, _PREVIEW_MAX_PX))
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((_PREVIEW_MAX_PX, _PREVIEW_MAX_PX))
+            out = io.BytesIO()
+            if img.mode in ("RGBA", "LA", "P"):
+                img.save(out, format="PNG", optimize=True)
+            else:
+                img.convert("RGB").save(out, format="JPEG", quality=80)
+            return out.getvalue()
+    except (UnidentifiedImageError, OSError):
+        return _image_bytes
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _overview_html(
+    gen_aufwand: str,
+    imm_aufwand: str,
+    imm_schwierigkeit: str,
+    nach_aufwand: str,
+    nach_schwierigkeit: str,
+    ip_aufwand: str,
+    ip_schwierigkeit: str,
+) -> str:
+    """HTML-Tabelle der Ampel-Übersicht."""
+
+    def _ampel_html(label: str) -> str:
+        """Erzeugt HTML für farbige Ampelzelle."""
+        color = AMPEL_LABELS[label]
+        bg = AMPEL_DISPLAY[color]["bg"]
+        return f'<td style="background-color: {bg}; text-align: center; padding: 8px;">&nbsp;</td>'
+
+    def _schwierigkeit_html(label: str, is_kein_einfluss: bool = False) -> str:
+        if is_kein_einfluss:
+            return '<td style="text-align: center; padding: 8px;">Kein Einfluss</td>'
+        return _ampel_html(label)
+
+    return f"""
+    <table style="width:100%; border-collapse:collapse; font-family:sans-serif; font-size:14px;">
+        <tr style="background:#f0f0f0;">
+            <th style="border:1px solid #ccc; padding:8px; text-align:left;">Thema</th>
+            <th style="border:1px solid #ccc; padding:8px; text-align:center;">Aufwand</th>
+            <th style="border:1px solid #ccc; padding:8px; text-align:center;">Schwierigkeit</th>
+        </tr>
+        <tr>
+            <td style="border:1px solid #ccc; padding:8px;">Genehmigungsrecht</td>
+            {_ampel_html(gen_aufwand)}
+            {_schwierigkeit_html("", is_kein_einfluss=True)}
+        </tr>
+        <tr>
+            <td style="border:1px solid #ccc; padding:8px;">Immissionsorte</td>
+            {_ampel_html(imm_aufwand)}
+            {_schwierigkeit_html(imm_schwierigkeit)}
+        </tr>
+        <tr>
+            <td style="border:1px solid #ccc; padding:8px;">Nachbarbetriebe</td>
+            {_ampel_html(nach_aufwand)}
+            {_schwierigkeit_html(nach_schwierigkeit)}
+        </tr>
+        <tr>
+            <td style="border:1px solid #ccc; padding:8px;">Ist- und Plan-Zustand</td>
+            {_ampel_html(ip_aufwand)}
+            {_schwierigkeit_html(ip_schwierigkeit)}
+        </tr>
+    </table>
+    """
+
+
 # ── Tabs ──
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "1. Betriebsdaten",
@@ -99,6 +376,36 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 with tab1:
     st.header("Betriebsdaten")
 
+    # Gespeicherte Entwürfe
+    with st.expander("Gespeicherten Entwurf fortsetzen"):
+        if st.session_state.get("draft_error"):
+            st.warning(st.session_state.pop("draft_error"))
+        draft_query = st.text_input(
+            "Suche (Projektnummer, Straße, Ort)", key="draft_query",
+        )
+        store = _get_project_store()
+        drafts = store.search(draft_query, limit=10) if draft_query else store.list_projects(limit=10)
+        if not drafts:
+            st.caption("Keine gespeicherten Entwürfe gefunden.")
+        for draft in drafts:
+            col_info, col_button = st.columns([4, 1])
+            with col_info:
+                st.markdown(
+                    f"**{draft.projektnummer or 'ohne Projektnummer'}** – "
+                    f"{draft.adresse_einzeilig}  \n"
+                    f"<small>gespeichert {date.fromtimestamp(draft.updated):%d.%m.%Y}"
+                    f"{', mit Lageplan' if draft.has_lageplan else ''}</small>",
+                    unsafe_allow_html=True,
+                )
+            with col_button:
+                st.button(
+                    "Fortsetzen",
+                    key=f"resume_{draft.id}",
+                    on_click=_resume_draft,
+                    args=(draft.id,),
+                    use_container_width=True,
+                )
+
     # XLSX-Upload
     uploaded_file = st.file_uploader(
         "XLSX-Datei von profarm hochladen",
@@ -106,10 +413,14 @@ with tab1:
         key="xlsx_upload",
     )
 
-    if uploaded_file is not None and not st.session_state.xlsx_parsed:
+    if uploaded_file is None:
+        # Erneutes Hochladen derselben Datei soll sie wieder übernehmen
+        st.session_state.xlsx_hash = None
+    elif _file_digest(uploaded_file, "xlsx_upload_digest") != st.session_state.xlsx_hash:
+        xlsx_hash = _file_digest(uploaded_file, "xlsx_upload_digest")
         with st.spinner("XLSX wird gelesen..."):
             try:
-                data = parse_xlsx(uploaded_file.getvalue())
+                data = _parse_xlsx_cached(xlsx_hash, uploaded_file.getvalue())
                 # Widget-Keys direkt setzen, damit st.text_input die Werte übernimmt
                 st.session_state.inp_strasse = data["strasse"]
                 st.session_state.inp_hausnummer = data["hausnummer"]
@@ -124,33 +435,17 @@ with tab1:
                 st.session_state.ort = data["ort"]
                 st.session_state.projektnummer = data["projektnummer"]
 
-                # Ist-Zustand DataFrame
                 if data["ist_zustand"]:
-                    ist_rows = []
-                    for r in data["ist_zustand"]:
-                        ist_rows.append({
-                            "BE-Nr.": r.be_nr,
-                            "Tierart": r.tierart,
-                            "Tierplätze": r.tierplaetze,
-                            "Ausführung": r.ausfuehrung,
-                            "Kamine": r.kamine,
-                            "S.d.T.": r.stand_der_technik,
-                        })
-                    st.session_state.ist_df = pd.DataFrame(ist_rows)
-
-                # Plan-Zustand DataFrame
+                    st.session_state.ist_df = ist_rows_to_frame(data["ist_zustand"])
                 if data["plan_zustand"]:
-                    plan_rows = []
-                    for r in data["plan_zustand"]:
-                        plan_rows.append({
-                            "BE-Nr.": r.be_nr,
-                            "Tierart": r.tierart,
-                            "Tierplätze": r.tierplaetze,
-                            "Ausführung": r.ausfuehrung,
-                        })
-                    st.session_state.plan_df = pd.DataFrame(plan_rows)
-
-                st.session_state.xlsx_parsed = True
+                    st.session_state.plan_df = plan_rows_to_frame(data["plan_zustand"])
+                # Bearbeitungsstand der Tabellen-Editoren gehört zur alten Datei
+                for editor_key in ("ist_editor", "plan_editor"):
+                    st.session_state.pop(editor_key, None)
+
+                st.session_state.xlsx_hash = xlsx_hash
+                # Neue Datei = neues Projekt, nicht den geladenen Entwurf überschreiben
+                st.session_state.draft_id = None
                 st.rerun()
             except Exception as e:
                 st.error(f"Fehler beim Einlesen der XLSX-Datei: {e}")
@@ -174,7 +469,13 @@ with tab1:
     )
     if lageplan_file is not None:
         st.session_state.lageplan_bytes = lageplan_file.getvalue()
-        st.image(st.session_state.lageplan_bytes, caption="Lageplan", use_container_width=True)
+        st.session_state.lageplan_digest = _file_digest(lageplan_file, "lageplan_upload_digest")
+    if st.session_state.lageplan_bytes:
+        st.image(
+            _lageplan_preview(st.session_state.lageplan_digest, st.session_state.lageplan_bytes),
+            caption="Lageplan",
+            use_container_width=True,
+        )
 
 
 # ════════════════════════════════════════
@@ -235,12 +536,16 @@ with tab3:
     # Tim-Online Link
     if st.session_state.strasse and st.session_state.ort:
         with st.spinner("Standort wird ermittelt..."):
-            tim_url = build_tim_online_url(
-                strasse=st.session_state.strasse,
-                hausnummer=st.session_state.hausnummer,
-                plz=st.session_state.plz,
-                ort=st.session_state.ort,
+            address = (
+                st.session_state.strasse,
+                st.session_state.hausnummer,
+                st.session_state.plz,
+                st.session_state.ort,
             )
+            try:
+                tim_url = _tim_online_url_cached(*address)
+            except _GeocodingFailed:
+                tim_url = None
         if tim_url:
             st.link_button(
                 "Standort in Tim-Online anzeigen",
@@ -321,6 +626,86 @@ with tab3:
 
     # ── 3. Nachbarbetriebe ──
     st.subheader("3. Nachbarbetriebe")
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        register_file = st.file_uploader(
+            "Betriebsregister (CSV mit ostwert;nordwert;tierart;tierplaetze, optional bezeichnung; UTM32)",
+            type=["csv"],
+            key="register_upload",
+        )
+    with col2:
+        st.session_state.nachbar_radius = st.number_input(
+            "Umkreis (m)",
+            min_value=100,
+            max_value=10000,
+            step=100,
+            value=st.session_state.nachbar_radius,
+            key="nachbar_radius_input",
+        )
+
+    if register_file is not None:
+        try:
+            register = _farm_register(_file_digest(register_file, "register_upload_digest"), register_file.getvalue())
+        except (ValueError, csv.Error) as e:
+            st.error(f"Betriebsregister konnte nicht gelesen werden: {e}")
+            register = None
+
+        address = (
+            st.session_state.strasse,
+            st.session_state.hausnummer,
+            st.session_state.plz,
+            st.session_state.ort,
+        )
+        coords = None
+        if address[0] and address[3]:
+            try:
+                coords = _utm_cached(normalize_address(*address), *address)
+            except _GeocodingFailed:
+                pass
+        if register is not None and coords is None:
+            st.warning("Ohne geocodierten Standort können keine Nachbarbetriebe ermittelt werden.")
+        elif register is not None:
+            radius = st.session_state.nachbar_radius
+            t0 = time.perf_counter()
+            nearby = register.within_radius(*coords, radius)
+            query_ms = (time.perf_counter() - t0) * 1000
+            st.session_state.nachbar_umkreis = radius
+            st.session_state.nachbarbetriebe_liste = [
+                Nachbarbetrieb(
+                    bezeichnung=farm.bezeichnung,
+                    tierart=farm.tierart,
+                    tierplaetze=farm.tierplaetze,
+                    entfernung=round(farm.entfernung),
+                )
+                for farm in nearby
+            ]
+            st.caption(
+                f"{len(nearby)} von {len(register)} Betrieben im Umkreis von {radius} m "
+                f"(Suche: {query_ms:.2f} ms)"
+            )
+            if not nearby:
+                nearest = register.nearest(*coords, k=3)
+                if nearest:
+                    st.info(
+                        "Nächstgelegene Betriebe: "
+                        + ", ".join(f"{f.tierart} ({f.entfernung:.0f} m)" for f in nearest)
+                    )
+
+    if st.session_state.nachbar_umkreis and st.session_state.nachbarbetriebe_liste:
+        st.dataframe(
+            pd.DataFrame(
+                [b.model_dump() for b in st.session_state.nachbarbetriebe_liste],
+                columns=["bezeichnung", "tierart", "tierplaetze", "entfernung"],
+            ).rename(columns={
+                "bezeichnung": "Betrieb",
+                "tierart": "Tierart",
+                "tierplaetze": "Tierplätze",
+                "entfernung": "Entfernung (m)",
+            }),
+            hide_index=True,
+            use_container_width=True,
+        )
+
     col1, col2 = st.columns(2)
     with col1:
         st.session_state.nach_aufwand = st.selectbox(
@@ -393,46 +778,15 @@ with tab4:
 
     st.subheader("Ampel-Übersicht")
 
-    def _ampel_html(label: str) -> str:
-        """Erzeugt HTML für farbige Ampelzelle."""
-        color = AMPEL_LABELS[label]
-        bg = AMPEL_DISPLAY[color]["bg"]
-        return f'<td style="background-color: {bg}; text-align: center; padding: 8px;">&nbsp;</td>'
-
-    def _schwierigkeit_html(label: str, is_kein_einfluss: bool = False) -> str:
-        if is_kein_einfluss:
-            return '<td style="text-align: center; padding: 8px;">Kein Einfluss</td>'
-        return _ampel_html(label)
-
-    overview_html = f"""
-    <table style="width:100%; border-collapse:collapse; font-family:sans-serif; font-size:14px;">
-        <tr style="background:#f0f0f0;">
-            <th style="border:1px solid #ccc; padding:8px; text-align:left;">Thema</th>
-            <th style="border:1px solid #ccc; padding:8px; text-align:center;">Aufwand</th>
-            <th style="border:1px solid #ccc; padding:8px; text-align:center;">Schwierigkeit</th>
-        </tr>
-        <tr>
-            <td style="border:1px solid #ccc; padding:8px;">Genehmigungsrecht</td>
-            {_ampel_html(st.session_state.gen_aufwand)}
-            {_schwierigkeit_html("", is_kein_einfluss=True)}
-        </tr>
-        <tr>
-            <td style="border:1px solid #ccc; padding:8px;">Immissionsorte</td>
-            {_ampel_html(st.session_state.imm_aufwand)}
-            {_schwierigkeit_html(st.session_state.imm_schwierigkeit)}
-        </tr>
-        <tr>
-            <td style="border:1px solid #ccc; padding:8px;">Nachbarbetriebe</td>
-            {_ampel_html(st.session_state.nach_aufwand)}
-            {_schwierigkeit_html(st.session_state.nach_schwierigkeit)}
-        </tr>
-        <tr>
-            <td style="border:1px solid #ccc; padding:8px;">Ist- und Plan-Zustand</td>
-            {_ampel_html(st.session_state.ip_aufwand)}
-            {_schwierigkeit_html(st.session_state.ip_schwierigkeit)}
-        </tr>
-    </table>
-    """
+    overview_html = _overview_html(
+        st.session_state.gen_aufwand,
+        st.session_state.imm_aufwand,
+        st.session_state.imm_schwierigkeit,
+        st.session_state.nach_aufwand,
+        st.session_state.nach_schwierigkeit,
+        st.session_state.ip_aufwand,
+        st.session_state.ip_schwierigkeit,
+    )
     st.markdown(overview_html, unsafe_allow_html=True)
 
     st.divider()
@@ -497,29 +851,14 @@ with tab5:
 
     def _build_project() -> FarmProject:
         """Erstellt das FarmProject-Objekt aus dem aktuellen Session State."""
-        ist_rows = []
-        for _, row in st.session_state.ist_df.iterrows():
-            ist_rows.append(IstZustandRow(
-                be_nr=str(row.get("BE-Nr.", "")),
-                tierart=str(row.get("Tierart", "Mastschweine")),
-                tierplaetze=int(row.get("Tierplätze", 0)) if pd.notna(row.get("Tierplätze")) else 0,
-                ausfuehrung=str(row.get("Ausführung", "1 - Zwangsbelüfteter Stall")),
-                kamine=str(row.get("Kamine", "Nein")),
-                stand_der_technik=str(row.get("S.d.T.", "Nein")),
-            ))
-
-        plan_rows = []
-        for _, row in st.session_state.plan_df.iterrows():
-            plan_rows.append(PlanZustandRow(
-                be_nr=str(row.get("BE-Nr.", "")),
-                tierart=str(row.get("Tierart", "Mastschweine")),
-                tierplaetze=int(row.get("Tierplätze", 0)) if pd.notna(row.get("Tierplätze")) else 0,
-                ausfuehrung=str(row.get("Ausführung", "1 - Zwangsbelüfteter Stall")),
-            ))
-
-        lageplan_b64 = None
-        if st.session_state.lageplan_bytes:
-            lageplan_b64 = base64.b64encode(st.session_state.lageplan_bytes).decode()
+        ist_rows, ist_errors = frame_to_ist_rows(st.session_state.ist_df)
+        plan_rows, plan_errors = frame_to_plan_rows(st.session_state.plan_df)
+        for label, errors in (("Ist-Zustand", ist_errors), ("Plan-Zustand", plan_errors)):
+            if errors:
+                st.warning(
+                    f"{label}: ungültige Werte wurden durch Standardwerte ersetzt\n\n"
+                    + "\n".join(f"- {e}" for e in errors)
+                )
 
         return FarmProject(
             strasse=st.session_state.strasse,
@@ -547,6 +886,8 @@ with tab5:
                 begruendung_aufwand=st.session_state.nach_begr_aufwand,
                 begruendung_schwierigkeit=st.session_state.nach_begr_schwierigkeit,
             ),
+            nachbar_umkreis=st.session_state.nachbar_umkreis,
+            nachbarbetriebe_liste=st.session_state.nachbarbetriebe_liste,
             ist_plan=Assessment(
                 aufwand=AMPEL_LABELS[st.session_state.ip_aufwand],
                 schwierigkeit=AMPEL_LABELS[st.session_state.ip_schwierigkeit].value,
@@ -563,48 +904,153 @@ with tab5:
                 ausbreitung_gesamt=st.session_state.pruef_gesamt,
                 minderungsmassnahmen=st.session_state.pruef_minderung,
             ),
-            lageplan_b64=lageplan_b64,
+            lageplan=st.session_state.lageplan_bytes or None,
         )
 
+    def _job_key(variant: str, project: FarmProject) -> str:
+        """Schlüssel zum Zusammenfassen identischer Render-Jobs."""
+        payload = f"{variant}|{date.today().isoformat()}|{project.model_dump_json()}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _submit_job(variant: str, generate, *args) -> None:
+        try:
+            project = _build_project()
+        except Exception as e:
+            st.error(f"Fehler bei der PDF-Erzeugung: {e}")
+            st.exception(e)
+            return
+        job_id = _get_job_queue().submit(_job_key(variant, project), generate, project, *args)
+        st.session_state[f"job_{variant}"] = job_id
+
+    def _generate_zip(project: FarmProject, pnr: str) -> bytes:
+        """Erzeugt beide Reports in einem Durchgang und packt sie als ZIP."""
+        pdfs = generate_reports(project, variants=("voll", "kurz"))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(f"Vorabschätzung-{pnr}.pdf", pdfs["voll"])
+            zf.writestr(f"Kurzreport-{pnr}.pdf", pdfs["kurz"])
+        return buffer.getvalue()
+
+    def _job_panel(
+        variant: str,
+        download_label: str,
+        filename: str,
+        primary: bool,
+        mime: str = "application/pdf",
+    ) -> None:
+        """Zeigt den Zustand des Render-Jobs und bietet das Ergebnis zum Download an."""
+        job_id = st.session_state.get(f"job_{variant}")
+        if job_id is None:
+            return
+        job = _get_job_queue().get(job_id)
+        if job is None:
+            st.session_state[f"job_{variant}"] = None
+            return
+
+        active = job.status not in (DONE, FAILED)
+
+        @st.fragment(run_every=1.0 if active else None)
+        def _poll():
+            current = _get_job_queue().get(job_id)
+            if current is None:
+                return
+            if current.status == DONE:
+                if active:
+                    # Polling beenden und Download-Bereich neu aufbauen
+                    st.rerun(scope="app")
+                st.download_button(
+                    label=f"{download_label} ({filename})",
+                    data=current.result,
+                    file_name=filename,
+                    mime=mime,
+                    type="primary" if primary else "secondary",
+                    use_container_width=True,
+                    key=f"download_{variant}",
+                )
+                st.success(f"Erstellt in {current.elapsed:.1f} s.")
+            elif current.status == FAILED:
+                if active:
+                    st.rerun(scope="app")
+                st.error(f"Fehler bei der PDF-Erzeugung: {current.error}")
+                st.exception(current.error)
+            else:
+                state = "wartet" if current.status == QUEUED else "wird erzeugt"
+                st.info(f"PDF {state} … ({current.elapsed:.0f} s)")
+
+        _poll()
+
+    if st.button("Entwurf speichern", use_container_width=True):
+        try:
+            st.session_state.draft_id = _get_project_store().save(
+                _build_project(), st.session_state.draft_id,
+            )
+            st.success("Entwurf gespeichert.")
+        except Exception as e:
+            st.error(f"Fehler beim Speichern des Entwurfs: {e}")
+
     col_voll, col_kurz = st.columns(2)
+    pnr = st.session_state.projektnummer or "ENTWURF"
 
     with col_voll:
         if st.button("Vollständiger Report erstellen", type="primary", use_container_width=True):
-            with st.spinner("PDF wird erzeugt..."):
-                try:
-                    project = _build_project()
-                    pdf_bytes = generate_pdf(project)
-                    pnr = st.session_state.projektnummer or "ENTWURF"
-                    filename = f"Vorabschätzung-{pnr}.pdf"
-                    st.download_button(
-                        label=f"PDF herunterladen ({filename})",
-                        data=pdf_bytes,
-                        file_name=filename,
-                        mime="application/pdf",
-                        type="primary",
-                        use_container_width=True,
-                    )
-                    st.success("Vollständiger Report erfolgreich erstellt!")
-                except Exception as e:
-                    st.error(f"Fehler bei der PDF-Erzeugung: {e}")
-                    st.exception(e)
+            _submit_job("voll", generate_pdf)
+        _job_panel("voll", "PDF herunterladen", f"Vorabschätzung-{pnr}.pdf", primary=True)
 
     with col_kurz:
         if st.button("Kurzreport erstellen (max. 3 Seiten)", use_container_width=True):
-            with st.spinner("Kurzreport wird erzeugt..."):
-                try:
-                    project = _build_project()
-                    pdf_bytes = generate_pdf_kurz(project)
-                    pnr = st.session_state.projektnummer or "ENTWURF"
-                    filename = f"Kurzreport-{pnr}.pdf"
-                    st.download_button(
-                        label=f"Kurzreport herunterladen ({filename})",
-                        data=pdf_bytes,
-                        file_name=filename,
-                        mime="application/pdf",
-                        use_container_width=True,
-                    )
-                    st.success("Kurzreport erfolgreich erstellt!")
-                except Exception as e:
-                    st.error(f"Fehler bei der PDF-Erzeugung: {e}")
-                    st.exception(e)
+            _submit_job("kurz", generate_pdf_kurz)
+        _job_panel("kurz", "Kurzreport herunterladen", f"Kurzreport-{pnr}.pdf", primary=False)
+
+    if st.button("Beide Reports als ZIP erstellen", use_container_width=True):
+        _submit_job("zip", _generate_zip, pnr)
+    _job_panel(
+        "zip",
+        "ZIP herunterladen",
+        f"Vorabschätzung-{pnr}.zip",
+        primary=False,
+        mime="application/zip",
+    )
+
+    # ── Debug: Laufzeiten der letzten Ausführung ──
+    with st.expander("Debug: Laufzeiten"):
+        trace_memory = st.checkbox(
+            "Speicher messen (tracemalloc, verlangsamt die Erzeugung)",
+            value=tracemalloc.is_tracing(),
+        )
+        instrumentation.configure(trace_memory=trace_memory)
+
+        run = instrumentation.last_run()
+        if run is None:
+            st.caption("Noch keine Messung vorhanden.")
+        else:
+            st.caption(
+                f"Letzter Lauf: {run.name}, {run.total * 1000:.0f} ms "
+                "(prozessweit, ggf. aus einer anderen Sitzung)"
+            )
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Schritt": "\u2003" * s.depth + s.name,
+                        "Wandzeit [ms]": round(s.wall * 1000, 1),
+                        "CPU [ms]": round(s.cpu * 1000, 1),
+                        "Spitze [KiB]": (
+                            round(s.peak_bytes / 1024) if s.peak_bytes is not None else None
+                        ),
+                        "Fehler": s.error or "",
+                    }
+                    for s in run.stages
+                ]),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+
+# ── Laufzeit des Seitenaufbaus ──
+_rerun_ms = (time.perf_counter() - _rerun_started) * 1000
+_history = st.session_state.rerun_times
+_history.append(_rerun_ms)
+del _history[:-_RERUN_HISTORY]
+st.caption(
+    f"Seitenaufbau: {_rerun_ms:.0f} ms "
+    f"(Median der letzten {len(_history)}: {sorted(_history)[len(_history) // 2]:.0f} ms)"
+)
@@ -0,0 +1,115 @@
+"""Benchmark: Speicherbedarf des Lageplans als Bytes statt Base64-String.
+
+Aufruf aus dem Projektverzeichnis::
+
+    python -m benchmarks.bench_lageplan_memory [--mb 15]
+
+Vergleicht den Weg eines großen Lageplans von der App bis zur Data-URI im
+Template:
+
+- ``base64``: früherer Stand – Base64-Kodierung beim Aufbau des Projekts,
+  String im Modell, JSON-Dump mit eingebettetem Bild als Cache-Schlüssel,
+  Dekodieren vor der Aufbereitung.
+- ``bytes``: aktueller Stand – Rohdaten im Modell, JSON-Dump mit Hash,
+  Aufbereitung direkt aus den Bytes.
+
+Gemessen werden Spitzen-Speicher (tracemalloc) und Laufzeit, jeweils für
+Modell und Cache-Schlüssel allein sowie einschließlich der
+Lageplan-Aufbereitung (Lageplan-Cache vorher geleert). tracemalloc erfasst
+nur Python-Allokationen, nicht die Pixelpuffer von Pillow. Das Testbild ist
+ein PNG aus Zufallsrauschen und lässt sich daher kaum komprimieren.
+"""
+
+import argparse
+import base64
+import gc
+import hashlib
+import io
+import time
+import tracemalloc
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+from pydantic import BaseModel
+
+from src import pdf_generator
+from src.instrumentation import stage
+from src.models import FarmProject
+
+
+class _LegacyProject(BaseModel):
+    """Lageplan-Feld des früheren Modells."""
+
+    lageplan_b64: Optional[str] = None
+
+
+def _noise_png(megabytes: float) -> bytes:
+    """Erzeugt ein PNG aus Zufallsrauschen von etwa ``megabytes`` MB."""
+    pixels = int(megabytes * 1024 * 1024 / 3)
+    width = int(pixels ** 0.5 * 4 / 3)
+    height = pixels // width
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(data, "RGB").save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def _legacy(image: bytes, prepare: bool) -> None:
+    project = _LegacyProject(lageplan_b64=base64.b64encode(image).decode())
+    hashlib.sha256(project.model_dump_json().encode("utf-8")).hexdigest()
+    if prepare:
+        pdf_generator.prepare_lageplan(base64.b64decode(project.lageplan_b64))
+
+
+def _current(image: bytes, prepare: bool) -> None:
+    project = FarmProject(lageplan=image)
+    hashlib.sha256(project.model_dump_json().encode("utf-8")).hexdigest()
+    if prepare:
+        pdf_generator.prepare_lageplan(project.lageplan)
+
+
+def _measure(fn, image: bytes, prepare: bool) -> tuple[float, int]:
+    """Gibt (Laufzeit in s, Spitzen-Speicher in Bytes) eines Durchlaufs zurück."""
+    pdf_generator._lageplan_cache.clear()
+    gc.collect()
+    t0 = time.perf_counter()
+    fn(image, prepare)
+    duration = time.perf_counter() - t0
+
+    pdf_generator._lageplan_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # stage() verrechnet die Spitzen der inneren Schritte (z.B. "lageplan"),
+        # die tracemalloc.reset_peak() aufrufen
+        with stage("bench_lageplan_memory") as record:
+            fn(image, prepare)
+    finally:
+        tracemalloc.stop()
+    return duration, record.peak_bytes
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=15.0, help="Größe des Testbilds in MB")
+    args = parser.parse_args(argv)
+
+    image = _noise_png(args.mb)
+    print(f"Testbild: {len(image) / 1024 / 1024:.1f} MB PNG")
+    print(f"{'Weg':<8} {'Umfang':<22} {'Laufzeit':>10} {'Spitze':>10}")
+
+    for prepare, scope in ((False, "Modell + Cache-Schlüssel"), (True, "inkl. Aufbereitung")):
+        results = {}
+        for label, fn in (("base64", _legacy), ("bytes", _current)):
+            results[label] = _measure(fn, image, prepare)
+            duration, peak = results[label]
+            print(f"{label:<8} {scope:<22} {duration * 1000:>7.0f} ms {peak / 1024 / 1024:>7.1f} MB")
+        old, new = results["base64"], results["bytes"]
+        memory_factor = f"{old[1] / new[1]:>4.1f}" if new[1] >= 64 * 1024 else "   –"
+        print(f"{'':<8} {'':<22} Faktor {old[0] / new[0]:>4.1f} Faktor {memory_factor}")
+
+
+if __name__ == "__main__":
+    main()
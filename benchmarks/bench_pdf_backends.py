@@ -0,0 +1,57 @@
+"""Benchmark: Renderzeit der verfügbaren PDF-Backends.
+
+Aufruf aus dem Projektverzeichnis::
+
+    python -m benchmarks.bench_pdf_backends [XLSX-DATEI] [--repeat N]
+
+Erzeugt für die Projektdaten der XLSX-Datei beide Report-Varianten mit
+jedem verfügbaren Backend (ohne PDF-Cache) und gibt Median-Laufzeit und
+Dateigröße aus. Nicht installierte Backends werden übersprungen.
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from src.models import FarmProject
+from src.pdf_backends import PDF_BACKENDS
+from src.pdf_generator import REPORT_VARIANTS, render_pdf_view
+from src.xlsx_parser import parse_xlsx
+
+_DEFAULT_XLSX = Path(__file__).resolve().parent.parent / "RHFB_Vorabschätzung_K-HA.xlsx"
+
+
+def _measure(project: FarmProject, variant: str, backend: str, repeat: int) -> tuple[float, int]:
+    """Gibt (Median-Laufzeit in s, PDF-Größe in Bytes) zurück."""
+    size = len(render_pdf_view(project, variant, use_cache=False, backend=backend))  # Aufwärmen
+
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        render_pdf_view(project, variant, use_cache=False, backend=backend)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), size
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("xlsx", nargs="?", type=Path, default=_DEFAULT_XLSX)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    project = FarmProject.model_validate(parse_xlsx(args.xlsx.read_bytes()))
+    print(f"{args.xlsx.name}, {len(project.ist_zustand)} Betriebseinheiten, {args.repeat} Läufe")
+    print(f"{'Backend':<12} {'Variante':<8} {'Median':>10} {'Größe':>10}")
+
+    for name, backend in PDF_BACKENDS.items():
+        if not backend.is_available():
+            print(f"{name:<12} übersprungen (nicht installiert)")
+            continue
+        for variant in REPORT_VARIANTS:
+            duration, size = _measure(project, variant, name, args.repeat)
+            print(f"{name:<12} {variant:<8} {duration * 1000:>8.0f} ms {size / 1024:>7.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
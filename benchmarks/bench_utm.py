@@ -0,0 +1,106 @@
+"""Benchmark und Vergleich: ``src.utm`` gegen pyproj.
+
+Aufruf aus dem Projektverzeichnis::
+
+    python -m benchmarks.bench_utm [--points N] [--threads N] [--tolerance-mm MM]
+
+Rechnet ``--points`` zufällige Punkte im Rechteck um NRW sowie ein
+regelmäßiges Gitter über das Rechteck nach UTM32 um und misst den
+Durchsatz: einmal in einem Thread, einmal in ``--threads`` Threads
+(Ergebnisse müssen mit dem Einzel-Thread-Lauf übereinstimmen).
+
+Ist pyproj installiert (optional, ``pip install pyproj``), werden die
+Ergebnisse mit ``EPSG:4326 -> EPSG:25832`` verglichen; das Skript endet mit
+Exit-Code 1, wenn die größte Abweichung ``--tolerance-mm`` überschreitet.
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.utm import wgs84_to_utm32
+
+# Rechteck um NRW (Breite, Länge in Grad)
+NRW_LAT = (50.32, 52.53)
+NRW_LON = (5.86, 9.47)
+
+
+def _points(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Zufallspunkte und ein 0,01°-Gitter über das Rechteck um NRW."""
+    rng = np.random.default_rng(0)
+    grid_lat, grid_lon = np.meshgrid(
+        np.arange(NRW_LAT[0], NRW_LAT[1], 0.01), np.arange(NRW_LON[0], NRW_LON[1], 0.01),
+    )
+    lat = np.concatenate([rng.uniform(*NRW_LAT, n), grid_lat.ravel()])
+    lon = np.concatenate([rng.uniform(*NRW_LON, n), grid_lon.ravel()])
+    return lat, lon
+
+
+def _rate(fn, n: int, repeat: int = 3) -> float:
+    """Bester Durchsatz von ``fn`` in Punkten pro Sekunde."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return n / best
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1_000_000, help="Anzahl Zufallspunkte")
+    parser.add_argument("--threads", type=int, default=8, help="Threads für den parallelen Lauf")
+    parser.add_argument("--tolerance-mm", type=float, default=0.1, help="Erlaubte Abweichung zu pyproj")
+    args = parser.parse_args(argv)
+
+    lat, lon = _points(args.points)
+    n = len(lat)
+    easting, northing = wgs84_to_utm32(lat, lon)
+    print(f"{n} Punkte")
+    print(f"{'src.utm':<22} {_rate(lambda: wgs84_to_utm32(lat, lon), n) / 1e6:>6.2f} Mio. Punkte/s")
+
+    chunks = np.array_split(np.arange(n), args.threads)
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        def _parallel():
+            return list(pool.map(lambda idx: wgs84_to_utm32(lat[idx], lon[idx]), chunks))
+
+        parts = _parallel()
+        label = f"src.utm, {args.threads} Threads"
+        print(f"{label:<22} {_rate(_parallel, n) / 1e6:>6.2f} Mio. Punkte/s")
+    if not (
+        np.array_equal(np.concatenate([p[0] for p in parts]), easting)
+        and np.array_equal(np.concatenate([p[1] for p in parts]), northing)
+    ):
+        print("FEHLER: Ergebnisse der Threads weichen ab", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        wgs84_to_utm32(51.9, 8.2)
+    print(f"{'src.utm, Einzelpunkt':<22} {(time.perf_counter() - t0) * 1000:>6.1f} µs/Punkt")
+
+    try:
+        from pyproj import Transformer
+    except ImportError:
+        print("pyproj nicht installiert – kein Vergleich")
+        return 0
+
+    transformer = Transformer.from_crs("EPSG:4326", "EPSG:25832", always_xy=False)
+    ref_easting, ref_northing = transformer.transform(lat, lon)
+    print(f"{'pyproj':<22} {_rate(lambda: transformer.transform(lat, lon), n) / 1e6:>6.2f} Mio. Punkte/s")
+
+    deviation_mm = 1000 * max(
+        np.abs(easting - ref_easting).max(), np.abs(northing - ref_northing).max(),
+    )
+    print(f"Größte Abweichung zu pyproj: {deviation_mm:.6f} mm")
+    if deviation_mm > args.tolerance_mm:
+        print(f"FEHLER: Abweichung über {args.tolerance_mm} mm", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Benchmark: parse_xlsx im Streaming-Modus gegenüber dem Vollmodus.
+
+Aufruf aus dem Projektverzeichnis::
+
+    python -m benchmarks.bench_xlsx_parser [XLSX-DATEI] [--repeat N]
+
+Misst Laufzeit (Median über N Läufe) und Spitzen-Speicherbedarf
+(tracemalloc) für ``read_only=True`` und ``read_only=False``.
+tracemalloc erfasst nur Python-Allokationen.
+"""
+
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.xlsx_parser import parse_xlsx
+
+_DEFAULT_XLSX = Path(__file__).resolve().parent.parent / "RHFB_Vorabschätzung_K-HA.xlsx"
+
+
+def _measure(file_bytes: bytes, read_only: bool, repeat: int) -> tuple[float, int]:
+    """Gibt (Median-Laufzeit in s, Spitzen-Speicher in Bytes) zurück."""
+    parse_xlsx(file_bytes, read_only=read_only)  # Aufwärmen (Imports, Caches)
+
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parse_xlsx(file_bytes, read_only=read_only)
+        times.append(time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        parse_xlsx(file_bytes, read_only=read_only)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return statistics.median(times), peak
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("xlsx", nargs="?", type=Path, default=_DEFAULT_XLSX)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    file_bytes = args.xlsx.read_bytes()
+    print(f"{args.xlsx.name} ({len(file_bytes) / 1024:.0f} KiB), {args.repeat} Läufe")
+    print(f"{'Modus':<12} {'Median':>10} {'Spitze':>12}")
+
+    results = {}
+    for label, read_only in (("Vollmodus", False), ("Streaming", True)):
+        duration, peak = _measure(file_bytes, read_only, args.repeat)
+        results[label] = (duration, peak)
+        print(f"{label:<12} {duration * 1000:>8.1f} ms {peak / 1024:>8.0f} KiB")
+
+    full, fast = results["Vollmodus"], results["Streaming"]
+    print(f"Laufzeit: Faktor {full[0] / fast[0]:.1f}, Spitzen-Speicher: Faktor {full[1] / fast[1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
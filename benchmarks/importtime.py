@@ -0,0 +1,135 @@
+"""Importzeiten der Module unter ``src`` (``python -X importtime``).
+
+Aufruf aus dem Projektverzeichnis::
+
+    python -m benchmarks.importtime [--budget-ms MS] [--repeat N] [--top N]
+                                    [MODUL ...]
+
+Jedes Modul (Standard: alle Module unter ``src``) wird ``--repeat``-mal in
+einem frischen Interpreter importiert; ausgegeben wird der Median der
+kumulierten Importzeit sowie die teuersten direkt oder indirekt geladenen
+Pakete des langsamsten Laufs. Vorab wird einmal ungemessen importiert,
+damit das Kompilieren des Bytecodes nicht mitzählt.
+
+Das Skript endet mit Exit-Code 1, wenn
+
+- ein Modul das Budget ``--budget-ms`` (Standard: ``DEFAULT_BUDGET_MS``)
+  überschreitet oder
+- ein Modul beim Import eine der schweren Abhängigkeiten aus
+  ``LAZY_DEPENDENCIES`` lädt (unabhängig von der Rechnergeschwindigkeit).
+
+So lässt es sich als Prüfung in CI oder vor dem Bau des Containers einsetzen.
+"""
+
+import argparse
+import pkgutil
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+# Erst beim ersten PDF, Geocoding, XLSX-Import bzw. Umwandeln der Tabellen
+# benötigt; darf kein src-Modul beim Import laden
+LAZY_DEPENDENCIES = (
+    "xhtml2pdf", "reportlab", "pyhanko", "pypdf", "PIL", "geopy", "pyproj", "openpyxl", "pandas",
+)
+
+# Großzügig bemessen (pydantic und jinja2 werden eager geladen), damit die
+# Prüfung auch auf langsamen CI-Rechnern nur echte Rückschritte meldet
+DEFAULT_BUDGET_MS = 1000.0
+
+
+def src_modules() -> list[str]:
+    """Alle Module des Pakets ``src``."""
+    return [f"src.{m.name}" for m in pkgutil.iter_modules([str(_ROOT / "src")])]
+
+
+def _parse(stderr: str, module: str) -> dict[str, int]:
+    """Liest die Ausgabe von ``-X importtime`` für den Import von ``module``.
+
+    Importe beim Start des Interpreters (``site`` usw.) werden übergangen:
+    berücksichtigt werden nur ``module`` selbst und die unmittelbar davor
+    ausgegebenen, tiefer eingerückten Zeilen seiner Abhängigkeiten.
+
+    Returns:
+        dict Modulname -> kumulierte Importzeit in Mikrosekunden.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Kopfzeile
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(cumulative_us)))
+
+    times = {}
+    for name, depth, cumulative in reversed(entries):
+        if not times:
+            if name == module and depth == 0:
+                times[name] = cumulative
+            continue
+        if depth == 0:
+            break
+        times.setdefault(name, cumulative)
+    return times
+
+
+def measure(module: str) -> dict[str, int]:
+    """Importiert ``module`` in einem frischen Interpreter und gibt die Importzeiten zurück."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import von {module} fehlgeschlagen:\n{result.stderr[-2000:]}")
+    return _parse(result.stderr, module)
+
+
+def _top_packages(times: dict[str, int], top: int) -> list[tuple[str, int]]:
+    """Die teuersten Pakete der obersten Ebene (außer ``src``) nach kumulierter Zeit."""
+    packages = {}
+    for name, cumulative in times.items():
+        root = name.split(".")[0]
+        if root != "src":
+            packages[root] = max(packages.get(root, 0), cumulative)
+    return sorted(packages.items(), key=lambda item: -item[1])[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="Zu messende Module (Standard: alle unter src)")
+    parser.add_argument(
+        "--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+        help=f"Höchste erlaubte Importzeit je Modul (Standard: {DEFAULT_BUDGET_MS:.0f})",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Messungen je Modul")
+    parser.add_argument("--top", type=int, default=5, help="Anzahl angezeigter Pakete je Modul")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module in args.modules or src_modules():
+        measure(module)  # Bytecode kompilieren
+        runs = [measure(module) for _ in range(args.repeat)]
+        median_ms = statistics.median(run[module] for run in runs) / 1000
+        slowest = max(runs, key=lambda run: run[module])
+
+        top = ", ".join(f"{name} {us / 1000:.0f}" for name, us in _top_packages(slowest, args.top))
+        print(f"{module:<24} {median_ms:>8.1f} ms   {top}")
+
+        lazy = sorted({name.split(".")[0] for name in slowest} & set(LAZY_DEPENDENCIES))
+        if lazy:
+            failures.append(f"{module} lädt beim Import: {', '.join(lazy)}")
+        if median_ms > args.budget_ms:
+            failures.append(f"{module}: {median_ms:.1f} ms > Budget {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FEHLER: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""Benchmark-Suite für die Pipeline XLSX → FarmProject → HTML → PDF.
+
+Aufruf aus dem Projektverzeichnis::
+
+    python -m benchmarks.suite [--output DATEI] [--compare ALT.json]
+                               [--filter TEXT] [--repeat N]
+
+Gemessen werden:
+
+- ``parse_xlsx`` auf der mitgelieferten Arbeitsmappe und auf synthetischen
+  Arbeitsmappen mit 10/100/1000 Betriebseinheiten,
+- ``FarmProject``-Konstruktion und ``model_dump``,
+- Umwandlung zwischen Editor-Tabellen und Zeilenmodellen (``src.frames``),
+- Umkreis- und k-nächste-Suche im Betriebsregister (``src.nachbarbetriebe``),
+- Jinja-Rendering allein (ohne PDF-Satz),
+- ``generate_pdf``/``generate_pdf_kurz`` Ende-zu-Ende ohne PDF-Cache, ohne
+  und mit einem mehrere MB großen Lageplan (der Lageplan-Cache wird vor
+  jedem Lauf geleert, damit das Dekodieren mitgemessen wird) sowie ohne
+  vorab gerenderte statische Kapitel.
+
+Die Ergebnisse werden als JSON geschrieben (Standard:
+``benchmarks/results/<commit>.json``). Mit ``--compare`` werden die
+Medianwerte einer früheren Ergebnisdatei gegenübergestellt.
+"""
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+from PIL import Image
+
+from src import pdf_generator
+from src.frames import frame_to_ist_rows, ist_rows_to_frame
+from src.models import FarmProject
+from src.nachbarbetriebe import FarmRegister
+from src.pdf_backends import get_backend
+from src.xlsx_parser import DEFAULT_COLUMNS, DEFAULT_LAYOUT, parse_xlsx
+
+_ROOT = Path(__file__).resolve().parent.parent
+_DEFAULT_XLSX = _ROOT / "RHFB_Vorabschätzung_K-HA.xlsx"
+_RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SYNTHETIC_SIZES = (10, 100, 1000)
+REGISTER_SIZE = 50_000
+
+# Standort der mitgelieferten Arbeitsmappe (UTM32) und Rechteck um NRW
+_PROJECT_UTM = (444958.0, 5750218.0)
+_NRW_UTM = ((280000.0, 540000.0), (5580000.0, 5830000.0))
+
+# Zeilen, aus denen die synthetischen Betriebseinheiten zusammengesetzt werden
+_SYNTHETIC_ROWS = (
+    ("Mastschweine", 700, "1 - Zwangsbelüfteter Stall", "Ja", "Nein",
+     "Mastschweine", 700, "2 - Zwangsbelüfteter Stall mit Auslauf"),
+    ("Sauen", 240, "1 - Zwangsbelüfteter Stall", "Nein", "Nein",
+     "Sauen", 300, "1 - Zwangsbelüfteter Stall"),
+    ("Milchkühe", 120, "3 - Offenstall", "Nein", "Ja",
+     "Milchkühe", 150, "3 - Offenstall"),
+    ("Masthähnchen", 30000, "1 - Zwangsbelüfteter Stall", "Ja", "Nein",
+     "Masthähnchen", 39900, "1 - Zwangsbelüfteter Stall"),
+)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unbekannt"
+
+
+def synthetic_workbook(n_units: int, template: Path = _DEFAULT_XLSX) -> bytes:
+    """Erzeugt eine Arbeitsmappe im profarm-Layout mit ``n_units`` Betriebseinheiten.
+
+    Kopfdaten und Beschriftungen stammen aus der mitgelieferten
+    Arbeitsmappe, die Betriebseinheiten werden zyklisch aus
+    ``_SYNTHETIC_ROWS`` gebildet.
+    """
+    wb = openpyxl.load_workbook(template)
+    ws = wb[DEFAULT_LAYOUT.sheet_name]
+    # Vorhandene Betriebseinheiten entfernen
+    if ws.max_row >= DEFAULT_LAYOUT.start_row:
+        ws.delete_rows(DEFAULT_LAYOUT.start_row, ws.max_row - DEFAULT_LAYOUT.start_row + 1)
+
+    fields = list(DEFAULT_COLUMNS)[1:]  # ohne be_nr
+    for i in range(n_units):
+        row = DEFAULT_LAYOUT.start_row + i
+        ws[f"{DEFAULT_COLUMNS['be_nr']}{row}"] = i + 1
+        for name, value in zip(fields, _SYNTHETIC_ROWS[i % len(_SYNTHETIC_ROWS)]):
+            ws[f"{DEFAULT_COLUMNS[name]}{row}"] = value
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def synthetic_lageplan(width: int = 4000, height: int = 3000) -> bytes:
+    """Erzeugt ein fotoähnliches JPEG (Verlauf mit Rauschen) von einigen MB."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack(
+        [x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)],
+        axis=-1,
+    )
+    noise = rng.integers(0, 64, size=(height, width, 3))
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+def synthetic_register(n_farms: int) -> FarmRegister:
+    """Betriebsregister mit ``n_farms`` gleichverteilten Betrieben in NRW."""
+    rng = np.random.default_rng(0)
+    eastings = rng.uniform(*_NRW_UTM[0], n_farms)
+    northings = rng.uniform(*_NRW_UTM[1], n_farms)
+    plaetze = rng.integers(10, 3000, n_farms)
+    return FarmRegister(
+        (f"Betrieb {i}", e, n, _SYNTHETIC_ROWS[i % len(_SYNTHETIC_ROWS)][0], p)
+        for i, (e, n, p) in enumerate(zip(eastings.tolist(), northings.tolist(), plaetze.tolist()))
+    )
+
+
+def _bench(fn, repeat: int, setup=None) -> dict:
+    """Führt ``fn`` nach einem Aufwärmlauf ``repeat``-mal aus und misst die Laufzeit.
+
+    Args:
+        fn: Zu messende Funktion ohne Argumente.
+        repeat: Anzahl gemessener Läufe.
+        setup: Optionale Funktion, die vor jedem Lauf ungemessen aufgerufen wird.
+    """
+    if setup is not None:
+        setup()
+    fn()
+
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    return {
+        "repeat": repeat,
+        "median": statistics.median(times),
+        "min": min(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def _cases(repeat: int, pdf_repeat: int):
+    """Liefert (Name, Funktion, Wiederholungen, Setup, Metadaten) je Benchmark."""
+    bundled = _DEFAULT_XLSX.read_bytes()
+    yield "parse_xlsx[bundled]", lambda: parse_xlsx(bundled), repeat, None, {"bytes": len(bundled)}
+
+    workbooks = {}
+    for n in SYNTHETIC_SIZES:
+        workbooks[n] = synthetic_workbook(n)
+        data = workbooks[n]
+        yield (
+            f"parse_xlsx[{n}]", lambda data=data: parse_xlsx(data), repeat, None,
+            {"betriebseinheiten": n, "bytes": len(data)},
+        )
+
+    for n in SYNTHETIC_SIZES:
+        parsed = parse_xlsx(workbooks[n])
+        yield (
+            f"model_validate[{n}]", lambda parsed=parsed: FarmProject.model_validate(parsed),
+            repeat, None, {"betriebseinheiten": n},
+        )
+        project = FarmProject.model_validate(parsed)
+        yield (
+            f"model_dump[{n}]", lambda project=project: project.model_dump(),
+            repeat, None, {"betriebseinheiten": n},
+        )
+        yield (
+            f"rows_to_frame[{n}]",
+            lambda project=project: ist_rows_to_frame(project.ist_zustand),
+            repeat, None, {"betriebseinheiten": n},
+        )
+        frame = ist_rows_to_frame(project.ist_zustand)
+        yield (
+            f"frame_to_rows[{n}]", lambda frame=frame: frame_to_ist_rows(frame),
+            repeat, None, {"betriebseinheiten": n},
+        )
+
+    register = synthetic_register(REGISTER_SIZE)
+    for radius in (600, 2000):
+        yield (
+            f"nachbarbetriebe_umkreis[{radius}]",
+            lambda radius=radius: register.within_radius(*_PROJECT_UTM, radius),
+            repeat, None, {"betriebe": REGISTER_SIZE},
+        )
+    yield (
+        "nachbarbetriebe_naechste[5]", lambda: register.nearest(*_PROJECT_UTM, k=5),
+        repeat, None, {"betriebe": REGISTER_SIZE},
+    )
+
+    backend = get_backend()
+    for n in (1, *SYNTHETIC_SIZES[:2]):
+        data = bundled if n == 1 else workbooks[n]
+        project = FarmProject.model_validate(parse_xlsx(data))
+        for variant, template_name in pdf_generator.REPORT_VARIANTS.items():
+            yield (
+                f"render_html[{variant},{n}]",
+                lambda project=project, template_name=template_name: pdf_generator._render_html(
+                    pdf_generator._RenderInputs(project), template_name, backend,
+                ),
+                repeat, None, {"betriebseinheiten": n, "variante": variant},
+            )
+
+    project = FarmProject.model_validate(parse_xlsx(bundled))
+    lageplan = synthetic_lageplan()
+    with_lageplan = project.model_copy(update={"lageplan": lageplan})
+    for label, generate in (
+        ("generate_pdf", pdf_generator.generate_pdf),
+        ("generate_pdf_kurz", pdf_generator.generate_pdf_kurz),
+    ):
+        yield (
+            f"{label}[ohne_lageplan]",
+            lambda generate=generate: generate(project, use_cache=False),
+            pdf_repeat, None, {"backend": backend.name},
+        )
+        yield (
+            f"{label}[lageplan]",
+            lambda generate=generate: generate(with_lageplan, use_cache=False),
+            pdf_repeat, pdf_generator._lageplan_cache.clear,
+            {"backend": backend.name, "lageplan_bytes": len(lageplan)},
+        )
+    # Erster Report nach Start bzw. Template-Änderung: statische Kapitel werden mitgesetzt
+    yield (
+        "generate_pdf[statisch_kalt]",
+        lambda: pdf_generator.generate_pdf(project, use_cache=False),
+        pdf_repeat, pdf_generator._static_pages_cache.clear, {"backend": backend.name},
+    )
+
+
+def run_suite(repeat: int = 20, pdf_repeat: int = 5, name_filter: str | None = None) -> dict:
+    """Führt alle Benchmarks aus und gibt das Ergebnis als JSON-fähiges dict zurück."""
+    results = {}
+    for name, fn, n, setup, meta in _cases(repeat, pdf_repeat):
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = {**_bench(fn, n, setup), **meta}
+        print(f"{name:<36} {results[name]['median'] * 1000:>10.2f} ms", file=sys.stderr)
+
+    return {
+        "commit": _git_commit(),
+        "zeitpunkt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plattform": platform.platform(),
+        "ergebnisse": results,
+    }
+
+
+def compare(current: dict, previous: dict) -> None:
+    """Gibt die Medianwerte zweier Ergebnisdateien nebeneinander aus."""
+    print(f"{'Benchmark':<36} {previous['commit']:>12} {current['commit']:>12} {'Faktor':>8}")
+    for name, result in current["ergebnisse"].items():
+        old = previous["ergebnisse"].get(name)
+        if old is None:
+            continue
+        factor = result["median"] / old["median"]
+        print(
+            f"{name:<36} {old['median'] * 1000:>9.2f} ms {result['median'] * 1000:>9.2f} ms "
+            f"{factor:>7.2f}x"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="Ergebnisdatei (Standard: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Frühere Ergebnisdatei zum Vergleich")
+    parser.add_argument("--filter", help="Nur Benchmarks, deren Name diesen Text enthält")
+    parser.add_argument("--repeat", type=int, default=20, help="Läufe je Benchmark")
+    parser.add_argument("--pdf-repeat", type=int, default=5, help="Läufe je PDF-Benchmark")
+    args = parser.parse_args(argv)
+
+    result = run_suite(args.repeat, args.pdf_repeat, args.filter)
+
+    output = args.output or _RESULTS_DIR / f"{result['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"Ergebnisse geschrieben: {output}", file=sys.stderr)
+
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
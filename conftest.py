@@ -0,0 +1 @@
+"""pytest: Projektverzeichnis in den Importpfad, damit ``src`` importierbar ist."""
@@ -0,0 +1,199 @@
+"""Stapelverarbeitung: erzeugt Reports für ein Verzeichnis von profarm XLSX-Dateien.
+
+Aufruf::
+
+    python -m src.batch EINGABE_VERZEICHNIS AUSGABE_VERZEICHNIS [--overrides DATEI]
+
+Pro XLSX-Datei werden der vollständige Report und der Kurzreport erzeugt.
+Zusätzlich wird ``manifest.json`` mit Laufzeiten und Fehlern je Datei
+geschrieben.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from src.models import FarmProject
+from src.pdf_generator import write_pdf
+from src.xlsx_parser import parse_xlsx
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _load_overrides(path: Path | None) -> dict:
+    """Lädt die Overrides-Datei.
+
+    Erwartet ein JSON-Objekt, dessen Schlüssel Dateinamen (ohne Endung) sind
+    und dessen Werte Teil-Felder eines FarmProject enthalten. Der Schlüssel
+    ``"*"`` gilt für alle Dateien.
+    """
+    if path is None:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"Overrides müssen ein JSON-Objekt sein: {path}")
+    return overrides
+
+
+def _overrides_for(overrides: dict, stem: str) -> dict:
+    """Kombiniert die globalen und die dateispezifischen Overrides."""
+    merged = dict(overrides.get("*", {}))
+    merged.update(overrides.get(stem, {}))
+    return merged
+
+
+def process_file(xlsx_path: Path, out_dir: Path, overrides: dict) -> dict:
+    """Erzeugt beide Reports für eine XLSX-Datei.
+
+    Fehler werden nicht weitergereicht, sondern im Ergebnis vermerkt, damit
+    eine fehlerhafte Datei den übrigen Stapel nicht abbricht.
+
+    Returns:
+        Manifest-Eintrag mit Status, Laufzeiten (Sekunden) und Ausgabedateien.
+    """
+    entry = {
+        "datei": xlsx_path.name,
+        "status": "ok",
+        "projektnummer": "",
+        "ausgaben": [],
+        "zeiten": {},
+        "fehler": None,
+    }
+    started = time.perf_counter()
+    stage = "parse"
+    try:
+        t0 = time.perf_counter()
+        data = parse_xlsx(xlsx_path.read_bytes())
+        data.update(overrides)
+        entry["zeiten"]["parse"] = time.perf_counter() - t0
+
+        stage = "modell"
+        project = FarmProject.model_validate(data)
+        entry["projektnummer"] = project.projektnummer
+
+        for stage, prefix, variant in (
+            ("report", "Vorabschätzung", "voll"),
+            ("kurzreport", "Kurzreport", "kurz"),
+        ):
+            t0 = time.perf_counter()
+            out_path = out_dir / f"{prefix}-{xlsx_path.stem}.pdf"
+            # Direkt in die Zieldatei rendern, ohne das PDF im Speicher zu kopieren
+            write_pdf(project, out_path, variant=variant, use_cache=False)
+            entry["zeiten"][stage] = time.perf_counter() - t0
+            entry["ausgaben"].append(out_path.name)
+    except Exception as e:
+        entry["status"] = "fehler"
+        entry["fehler"] = {
+            "schritt": stage,
+            "meldung": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(),
+        }
+
+    entry["zeiten"]["gesamt"] = time.perf_counter() - started
+    return entry
+
+
+def run_batch(
+    input_dir: Path,
+    out_dir: Path,
+    overrides: dict | None = None,
+    max_workers: int | None = None,
+) -> list[dict]:
+    """Verarbeitet alle XLSX-Dateien eines Verzeichnisses parallel.
+
+    Args:
+        input_dir: Verzeichnis mit den profarm XLSX-Dateien.
+        out_dir: Zielverzeichnis für PDFs und Manifest.
+        overrides: Optionale Overrides (siehe ``_load_overrides``).
+        max_workers: Anzahl Prozesse (Standard: Anzahl CPU-Kerne).
+
+    Returns:
+        Die Manifest-Einträge in der Reihenfolge der Eingabedateien.
+    """
+    overrides = overrides or {}
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Temporäre Excel-Sperrdateien (~$...) ignorieren
+    files = sorted(
+        p for p in input_dir.glob("*.xlsx") if not p.name.startswith("~$")
+    )
+    workers = max_workers or os.cpu_count() or 1
+
+    entries: dict[Path, dict] = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(workers, max(len(files), 1))) as pool:
+        futures = {
+            pool.submit(process_file, path, out_dir, _overrides_for(overrides, path.stem)): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            entry = future.result()
+            entries[path] = entry
+            print(
+                f"[{len(entries)}/{len(files)}] {path.name}: {entry['status']} "
+                f"({entry['zeiten']['gesamt']:.2f} s)",
+                file=sys.stderr,
+            )
+
+    manifest = [entries[p] for p in files]
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "eingabe": str(input_dir),
+                "prozesse": workers,
+                "dauer": time.perf_counter() - started,
+                "dateien": manifest,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    return manifest
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Erzeugt Vorabschätzungen für alle XLSX-Dateien eines Verzeichnisses.",
+    )
+    parser.add_argument("input_dir", type=Path, help="Verzeichnis mit XLSX-Dateien")
+    parser.add_argument("out_dir", type=Path, help="Zielverzeichnis für PDFs und Manifest")
+    parser.add_argument(
+        "--overrides",
+        type=Path,
+        help="JSON-Datei mit FarmProject-Feldern je Dateiname ('*' für alle)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Anzahl paralleler Prozesse (Standard: Anzahl CPU-Kerne)",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.input_dir.is_dir():
+        parser.error(f"Verzeichnis nicht gefunden: {args.input_dir}")
+
+    manifest = run_batch(
+        args.input_dir,
+        args.out_dir,
+        overrides=_load_overrides(args.overrides),
+        max_workers=args.workers,
+    )
+    failed = [e for e in manifest if e["status"] != "ok"]
+    print(
+        f"{len(manifest) - len(failed)} von {len(manifest)} Dateien erfolgreich verarbeitet.",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Umwandlung zwischen den Tabellen der App (DataFrame) und den Zeilenmodellen.
+
+Die Spalten werden als Ganzes umgewandelt (``pd.to_numeric`` statt
+``iterrows``). Nach der Prüfung werden die Zeilenmodelle ohne erneute
+pydantic-Validierung per ``model_construct`` erzeugt. Ungültige Zellen
+brechen die Umwandlung nicht ab: sie erhalten den Standardwert der Spalte
+und werden als ``CellError`` gemeldet.
+
+pandas wird erst beim ersten Umwandeln geladen; der Aufrufer (die App)
+hat es dann ohnehin importiert.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.models import IstZustandRow, PlanZustandRow
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Abbildung einer Tabellenspalte auf ein Feld des Zeilenmodells.
+
+    Attributes:
+        column: Spaltenbeschriftung in der App.
+        field: Feldname im Zeilenmodell.
+        kind: ``"str"`` oder ``"int"`` (nicht-negative ganze Zahl).
+        default: Wert für leere oder ungültige Zellen.
+    """
+
+    column: str
+    field: str
+    kind: str
+    default: object
+
+
+@dataclass(frozen=True)
+class CellError:
+    """Ungültige Zelle; ``row`` ist die 1-basierte Zeilennummer der Tabelle."""
+
+    row: int
+    column: str
+    value: object
+    message: str
+
+    def __str__(self) -> str:
+        return f"Zeile {self.row}, {self.column}: {self.message} ({self.value!r})"
+
+
+IST_COLUMNS = (
+    ColumnSpec("BE-Nr.", "be_nr", "str", ""),
+    ColumnSpec("Tierart", "tierart", "str", "Mastschweine"),
+    ColumnSpec("Tierplätze", "tierplaetze", "int", 0),
+    ColumnSpec("Ausführung", "ausfuehrung", "str", "1 - Zwangsbelüfteter Stall"),
+    ColumnSpec("Kamine", "kamine", "str", "Nein"),
+    ColumnSpec("S.d.T.", "stand_der_technik", "str", "Nein"),
+)
+
+PLAN_COLUMNS = (
+    ColumnSpec("BE-Nr.", "be_nr", "str", ""),
+    ColumnSpec("Tierart", "tierart", "str", "Mastschweine"),
+    ColumnSpec("Tierplätze", "tierplaetze", "int", 0),
+    ColumnSpec("Ausführung", "ausfuehrung", "str", "1 - Zwangsbelüfteter Stall"),
+)
+
+
+def rows_to_frame(rows: list[BaseModel], specs: tuple[ColumnSpec, ...]) -> pd.DataFrame:
+    """Baut die Tabelle spaltenweise aus den Zeilenmodellen auf."""
+    import pandas as pd
+
+    data = {}
+    for spec in specs:
+        values = [getattr(r, spec.field) for r in rows]
+        data[spec.column] = pd.Series(values, dtype="int64" if spec.kind == "int" else object)
+    return pd.DataFrame(data, columns=[spec.column for spec in specs])
+
+
+# Kleinste float64-Zahl, die nicht mehr in int64 passt (2**63-1 ist als
+# float nicht darstellbar und wird auf 2**63 gerundet)
+_INT64_LIMIT = 2.0**63
+
+
+def _coerce_int(
+    series: pd.Series,
+    spec: ColumnSpec,
+    positions: np.ndarray,
+    errors: list[CellError],
+) -> np.ndarray:
+    import pandas as pd
+
+    numeric = pd.to_numeric(series, errors="coerce")
+    missing = series.isna().to_numpy()
+    values = numeric.to_numpy(dtype=float, na_value=np.nan)
+
+    checks = (
+        (np.isnan(values) & ~missing, "keine Zahl"),
+        (values >= _INT64_LIMIT, "zu groß"),
+        (np.isfinite(values) & (np.floor(values) != values), "keine ganze Zahl"),
+        (values < 0, "negativ"),
+    )
+    invalid = np.zeros(len(values), dtype=bool)
+    for mask, message in checks:
+        for i in np.flatnonzero(mask & ~invalid):
+            errors.append(CellError(int(positions[i]) + 1, spec.column, series.iloc[i], message))
+        invalid |= mask
+
+    return np.where(np.isnan(values) | invalid, spec.default, values).astype(np.int64)
+
+
+def _number_str(value) -> str:
+    # 1.0 (Float-Spalte durch leere Zellen) als "1" übernehmen
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _coerce_str(series: pd.Series, spec: ColumnSpec) -> np.ndarray:
+    values = series.to_numpy(dtype=object, copy=True)
+    missing = series.isna().to_numpy()
+    values[missing] = spec.default
+    # Zahlen aus dem Editor (z.B. BE-Nr. 1) als Text übernehmen
+    not_str = np.fromiter((not isinstance(v, str) for v in values), dtype=bool, count=len(values))
+    values[not_str] = [_number_str(v) for v in values[not_str]]
+    return values
+
+
+def frame_to_rows(
+    df: pd.DataFrame,
+    model: type[BaseModel],
+    specs: tuple[ColumnSpec, ...],
+) -> tuple[list[BaseModel], list[CellError]]:
+    """Wandelt eine Tabelle in Zeilenmodelle um.
+
+    Vollständig leere Zeilen (z.B. vom Editor neu angelegt) werden
+    übersprungen; fehlende Spalten erhalten den Standardwert.
+
+    Args:
+        df: Tabelle aus ``st.data_editor``.
+        model: Zeilenmodell, z.B. ``IstZustandRow``.
+        specs: Spaltenbeschreibung, z.B. ``IST_COLUMNS``.
+
+    Returns:
+        (Zeilenmodelle, ungültige Zellen)
+    """
+    present = [spec.column for spec in specs if spec.column in df.columns]
+    if present:
+        keep = ~df[present].isna().all(axis=1).to_numpy()
+    else:
+        keep = np.zeros(len(df), dtype=bool)
+    # Zeilennummern der Fehlermeldungen beziehen sich auf die ungefilterte Tabelle
+    positions = np.flatnonzero(keep)
+    df = df.iloc[positions]
+
+    errors: list[CellError] = []
+    columns = []
+    for spec in specs:
+        if spec.column not in df.columns:
+            columns.append([spec.default] * len(df))
+        elif spec.kind == "int":
+            columns.append(_coerce_int(df[spec.column], spec, positions, errors).tolist())
+        else:
+            columns.append(_coerce_str(df[spec.column], spec).tolist())
+
+    fields = [spec.field for spec in specs]
+    rows = [model.model_construct(**dict(zip(fields, values))) for values in zip(*columns)]
+    errors.sort(key=lambda e: e.row)
+    return rows, errors
+
+
+def ist_rows_to_frame(rows: list[IstZustandRow]) -> pd.DataFrame:
+    return rows_to_frame(rows, IST_COLUMNS)
+
+
+def plan_rows_to_frame(rows: list[PlanZustandRow]) -> pd.DataFrame:
+    return rows_to_frame(rows, PLAN_COLUMNS)
+
+
+def frame_to_ist_rows(df: pd.DataFrame) -> tuple[list[IstZustandRow], list[CellError]]:
+    return frame_to_rows(df, IstZustandRow, IST_COLUMNS)
+
+
+def frame_to_plan_rows(df: pd.DataFrame) -> tuple[list[PlanZustandRow], list[CellError]]:
+    return frame_to_rows(df, PlanZustandRow, PLAN_COLUMNS)
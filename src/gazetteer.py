@@ -0,0 +1,183 @@
+"""Offline-Geocoder auf Basis einer lokalen Adressliste.
+
+Lädt eine Adressliste (CSV oder Parquet mit Straße, Hausnummer, PLZ, Ort,
+Breite und Länge – z.B. aus den Hauskoordinaten NRW) in einen kompakten,
+sortierten Index. Suchen benötigen nur eine binäre Suche über die
+Straßenliste und kommen ohne Netzwerkzugriff aus.
+
+Der Geocoder bietet dieselbe ``geocode()``-Schnittstelle wie geopy und kann
+daher über ``src.tim_online.set_geocoder`` bzw.
+``src.tim_online.use_offline_gazetteer`` vor Nominatim geschaltet werden.
+"""
+
+import csv
+import re
+from bisect import bisect_left
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from src.tim_online import normalize_address
+
+# Spaltennamen der Eingabedatei
+DEFAULT_COLUMNS = {
+    "strasse": "strasse",
+    "hausnummer": "hausnummer",
+    "plz": "plz",
+    "ort": "ort",
+    "lat": "lat",
+    "lon": "lon",
+}
+
+# Trennzeichen im Straßenschlüssel "plz<SEP>strasse"
+_SEP = "\x1f"
+
+# "3", "3a", "3 a", "3-5" am Anfang der kombinierten Nominatim-Straßenangabe
+_STREET_QUERY_RE = re.compile(r"^(\d+\s*[a-zA-Z]?(?:\s*[-/]\s*\d+\s*[a-zA-Z]?)?)\s+(.+)$")
+
+
+class OfflineLocation(NamedTuple):
+    latitude: float
+    longitude: float
+    address: str
+
+
+def _number_sort_key(hausnummer: str) -> tuple[int, str]:
+    """Sortierschlüssel für Hausnummern: numerischer Anteil, dann Zusatz."""
+    match = re.match(r"\d+", hausnummer)
+    if match is None:
+        return (-1, hausnummer)
+    return (int(match.group()), hausnummer[match.end():])
+
+
+class OfflineGeocoder:
+    """Sortierter, array-basierter Adressindex.
+
+    Aufbau: eine sortierte Liste der Schlüssel ``plz + strasse`` und je
+    Straße ein zusammenhängender Bereich in den Arrays für Hausnummern und
+    Koordinaten (sortiert nach Hausnummer).
+    """
+
+    def __init__(self, records):
+        """Baut den Index aus Tupeln (strasse, hausnummer, plz, ort, lat, lon)."""
+        entries = []
+        for strasse, hausnummer, plz, ort, lat, lon in records:
+            try:
+                lat, lon = float(lat), float(lon)
+            except (TypeError, ValueError):
+                continue
+            if np.isnan(lat) or np.isnan(lon):
+                continue
+            strasse_n, nr_n, plz_n, _ = normalize_address(strasse, hausnummer, plz, ort)
+            if not strasse_n or not plz_n:
+                continue
+            entries.append((
+                f"{plz_n}{_SEP}{strasse_n}",
+                _number_sort_key(nr_n),
+                nr_n,
+                lat,
+                lon,
+            ))
+        entries.sort(key=lambda e: (e[0], e[1]))
+
+        self._streets: list[str] = []
+        starts: list[int] = []
+        for i, entry in enumerate(entries):
+            if not self._streets or self._streets[-1] != entry[0]:
+                self._streets.append(entry[0])
+                starts.append(i)
+        starts.append(len(entries))
+
+        self._starts = np.asarray(starts, dtype=np.int64)
+        self._numbers: list[str] = [e[2] for e in entries]
+        self._number_values = np.asarray([e[1][0] for e in entries], dtype=np.int64)
+        self._lat = np.asarray([e[3] for e in entries], dtype=np.float64)
+        self._lon = np.asarray([e[4] for e in entries], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    @classmethod
+    def from_file(cls, path: Path | str, columns: dict | None = None, delimiter: str = ";"):
+        """Lädt eine CSV- oder Parquet-Datei.
+
+        Args:
+            path: Pfad zur Adressliste (``.csv`` oder ``.parquet``).
+            columns: Abbildung der Felder aus ``DEFAULT_COLUMNS`` auf die
+                Spaltennamen der Datei.
+            delimiter: Spaltentrenner für CSV (Standard: Semikolon).
+        """
+        path = Path(path)
+        cols = {**DEFAULT_COLUMNS, **(columns or {})}
+        names = [cols[f] for f in ("strasse", "hausnummer", "plz", "ort", "lat", "lon")]
+
+        if path.suffix.lower() == ".parquet":
+            import pandas as pd
+
+            df = pd.read_parquet(path, columns=names)
+            return cls(df.itertuples(index=False, name=None))
+
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f, delimiter=delimiter)
+            return cls(
+                tuple(row[name] for name in names)
+                for row in reader
+            )
+
+    def lookup(self, strasse: str, hausnummer: str, plz: str, ort: str = "") -> OfflineLocation | None:
+        """Sucht eine Adresse im Index.
+
+        Ist die Hausnummer nicht enthalten, wird die numerisch nächste
+        Hausnummer derselben Straße verwendet; ohne Hausnummer der
+        Schwerpunkt der Straße.
+        """
+        strasse_n, nr_n, plz_n, _ = normalize_address(strasse, hausnummer, plz, ort)
+        key = f"{plz_n}{_SEP}{strasse_n}"
+        i = bisect_left(self._streets, key)
+        if i == len(self._streets) or self._streets[i] != key:
+            return None
+
+        start, end = int(self._starts[i]), int(self._starts[i + 1])
+        label = f"{strasse} {hausnummer}, {plz} {ort}".strip()
+
+        if nr_n:
+            for j in range(start, end):
+                if self._numbers[j] == nr_n:
+                    return OfflineLocation(float(self._lat[j]), float(self._lon[j]), label)
+
+            wanted = _number_sort_key(nr_n)[0]
+            values = self._number_values[start:end]
+            if wanted >= 0 and (values >= 0).any():
+                distance = np.where(values >= 0, np.abs(values - wanted), np.iinfo(np.int64).max)
+                j = start + int(np.argmin(distance))
+                return OfflineLocation(float(self._lat[j]), float(self._lon[j]), label)
+
+        return OfflineLocation(
+            float(self._lat[start:end].mean()),
+            float(self._lon[start:end].mean()),
+            label,
+        )
+
+    def geocode(self, query, exactly_one: bool = True, timeout=None) -> OfflineLocation | None:
+        """geopy-kompatible Schnittstelle für strukturierte Anfragen.
+
+        Erwartet das Query-Format von ``src.tim_online`` mit ``street``
+        (Hausnummer und Straße), ``postalcode`` und ``city``.
+        """
+        if not isinstance(query, dict):
+            return None
+
+        street = str(query.get("street") or "").strip()
+        match = _STREET_QUERY_RE.match(street)
+        if match is not None:
+            hausnummer, strasse = match.group(1), match.group(2)
+        else:
+            hausnummer, strasse = "", street
+
+        return self.lookup(
+            strasse,
+            hausnummer,
+            str(query.get("postalcode") or ""),
+            str(query.get("city") or ""),
+        )
@@ -0,0 +1,332 @@
+"""Laufzeit- und Speichermessung der Report-Pipeline.
+
+Einzelne Schritte werden mit ``stage("name")`` (bzw. dem Dekorator
+``instrumented``) umschlossen. Je Schritt werden Wandzeit, CPU-Zeit des
+Threads und – falls tracemalloc läuft – der Spitzen-Speicherbedarf erfasst.
+Verschachtelte Schritte bilden zusammen einen Lauf; ist der äußerste
+Schritt beendet, wird der Lauf an alle registrierten Sinks übergeben und
+ist über ``last_run()`` abrufbar.
+
+Sinks werden mit ``add_sink`` registriert oder über Umgebungsvariablen
+eingerichtet:
+
+- ``HALTUNGSFORM_METRICS_LOG=1``: ``LoggingSink``
+- ``HALTUNGSFORM_METRICS_JSONL=<datei>``: ``JsonLinesSink``
+- ``HALTUNGSFORM_METRICS_PROM=<datei>``: ``PrometheusTextfileSink``
+- ``HALTUNGSFORM_TRACE_MEMORY=1``: tracemalloc beim Import starten
+
+tracemalloc verlangsamt Python-Code deutlich und ist daher standardmäßig
+aus (siehe ``configure``). Es misst prozessweit; laufen Schritte in
+mehreren Threads gleichzeitig, sind die Spitzenwerte nur Näherungen.
+"""
+
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ENV_LOG = "HALTUNGSFORM_METRICS_LOG"
+ENV_JSONL = "HALTUNGSFORM_METRICS_JSONL"
+ENV_PROM = "HALTUNGSFORM_METRICS_PROM"
+ENV_TRACE_MEMORY = "HALTUNGSFORM_TRACE_MEMORY"
+
+# Anzahl der über recent_runs() abrufbaren Läufe
+_RECENT_RUNS = 20
+
+
+@dataclass
+class StageRecord:
+    """Messwerte eines Schritts.
+
+    Attributes:
+        name: Name des Schritts.
+        depth: Verschachtelungstiefe (0 = äußerster Schritt des Laufs).
+        wall: Wandzeit in Sekunden.
+        cpu: CPU-Zeit des ausführenden Threads in Sekunden.
+        peak_bytes: Spitzen-Speicher über dem Stand beim Eintritt
+            (None, wenn tracemalloc nicht läuft).
+        error: Name der Ausnahme, falls der Schritt fehlgeschlagen ist.
+    """
+
+    name: str
+    depth: int
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_bytes: int | None = None
+    error: str | None = None
+
+
+@dataclass
+class Run:
+    """Ein vollständiger Lauf: äußerster Schritt mit allen inneren Schritten."""
+
+    name: str
+    started: float
+    stages: list[StageRecord] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        """Wandzeit des äußersten Schritts in Sekunden."""
+        return self.stages[0].wall if self.stages else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started": self.started,
+            "stages": [asdict(s) for s in self.stages],
+        }
+
+
+class _Frame:
+    """Offener Schritt auf dem Stack des aktuellen Threads."""
+
+    __slots__ = ("record", "mem_start", "mem_peak")
+
+    def __init__(self, record: StageRecord):
+        self.record = record
+        self.mem_start = 0
+        self.mem_peak = 0
+
+
+class LoggingSink:
+    """Schreibt je Schritt eine Zeile in ein Logging-Logger."""
+
+    def __init__(self, log: logging.Logger | None = None, level: int = logging.INFO):
+        self._log = log or logger
+        self._level = level
+
+    def __call__(self, run: Run) -> None:
+        for s in run.stages:
+            peak = f", Spitze {s.peak_bytes / 1024:.0f} KiB" if s.peak_bytes is not None else ""
+            error = f", Fehler {s.error}" if s.error else ""
+            self._log.log(
+                self._level,
+                "%s%s: %.1f ms (CPU %.1f ms%s%s)",
+                "  " * s.depth, s.name, s.wall * 1000, s.cpu * 1000, peak, error,
+            )
+
+
+class JsonLinesSink:
+    """Hängt je Lauf eine JSON-Zeile an eine Datei an."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def __call__(self, run: Run) -> None:
+        line = json.dumps(run.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class PrometheusTextfileSink:
+    """Schreibt aufsummierte Messwerte je Schritt im Prometheus-Textformat.
+
+    Die Datei ist für den Textfile-Collector des node_exporters gedacht und
+    wird nach jedem Lauf atomar ersetzt.
+
+    Args:
+        path: Zieldatei (Endung ``.prom``).
+        prefix: Präfix der Metriknamen.
+    """
+
+    def __init__(self, path: Path | str, prefix: str = "haltungsform"):
+        self.path = Path(path)
+        self.prefix = prefix
+        self._totals: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, run: Run) -> None:
+        with self._lock:
+            for s in run.stages:
+                total = self._totals.setdefault(
+                    s.name, {"count": 0, "errors": 0, "wall": 0.0, "cpu": 0.0, "peak": None},
+                )
+                total["count"] += 1
+                total["errors"] += s.error is not None
+                total["wall"] += s.wall
+                total["cpu"] += s.cpu
+                if s.peak_bytes is not None:
+                    total["peak"] = s.peak_bytes
+            self._write()
+
+    def _write(self) -> None:
+        p = self.prefix
+        metrics = (
+            ("stage_runs_total", "counter", "Anzahl Ausführungen je Schritt", "count"),
+            ("stage_errors_total", "counter", "Anzahl fehlgeschlagener Ausführungen", "errors"),
+            ("stage_seconds_total", "counter", "Summierte Wandzeit je Schritt", "wall"),
+            ("stage_cpu_seconds_total", "counter", "Summierte CPU-Zeit je Schritt", "cpu"),
+            ("stage_memory_peak_bytes", "gauge", "Spitzen-Speicher der letzten Ausführung", "peak"),
+        )
+        lines = []
+        for metric, kind, help_text, key in metrics:
+            lines.append(f"# HELP {p}_{metric} {help_text}")
+            lines.append(f"# TYPE {p}_{metric} {kind}")
+            for name, total in sorted(self._totals.items()):
+                if total[key] is None:
+                    continue
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{p}_{metric}{{stage="{label}"}} {total[key]}')
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+_local = threading.local()
+_sinks: list = []
+_recent: deque[Run] = deque(maxlen=_RECENT_RUNS)
+_lock = threading.Lock()
+
+
+def _stack() -> list[_Frame]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+@contextmanager
+def stage(name: str):
+    """Misst den umschlossenen Block als Schritt ``name``.
+
+    Innerhalb eines anderen Schritts wird der Block als innerer Schritt
+    erfasst, sonst beginnt ein neuer Lauf.
+    """
+    stack = _stack()
+    if not stack:
+        _local.run = Run(name=name, started=time.time())
+    run: Run = _local.run
+
+    record = StageRecord(name=name, depth=len(stack))
+    run.stages.append(record)
+    frame = _Frame(record)
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # Bisherige Spitze an den äußeren Schritt weitergeben, dann neu zählen
+            stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+        tracemalloc.reset_peak()
+        frame.mem_start = frame.mem_peak = current
+
+    stack.append(frame)
+    wall0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    try:
+        yield record
+    except BaseException as e:
+        record.error = type(e).__name__
+        raise
+    finally:
+        record.cpu = time.thread_time() - cpu0
+        record.wall = time.perf_counter() - wall0
+        stack.pop()
+
+        if tracing and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            frame.mem_peak = max(frame.mem_peak, peak)
+            record.peak_bytes = max(0, frame.mem_peak - frame.mem_start)
+            if stack:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, frame.mem_peak)
+
+        if not stack:
+            _local.run = None
+            _finish(run)
+
+
+def instrumented(name: str | None = None):
+    """Dekorator: misst jeden Aufruf der Funktion als Schritt.
+
+    Args:
+        name: Name des Schritts (Standard: Funktionsname).
+    """
+    def decorator(fn):
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _finish(run: Run) -> None:
+    with _lock:
+        _recent.append(run)
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink(run)
+        except Exception:
+            # Ein defekter Sink darf die Report-Erzeugung nicht abbrechen
+            logger.exception("Instrumentierungs-Sink %r fehlgeschlagen", sink)
+
+
+def add_sink(sink) -> None:
+    """Registriert einen Sink (aufrufbar mit einem ``Run``)."""
+    with _lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink) -> None:
+    """Entfernt einen registrierten Sink."""
+    with _lock:
+        _sinks.remove(sink)
+
+
+def last_run() -> Run | None:
+    """Gibt den zuletzt abgeschlossenen Lauf zurück (aus beliebigem Thread)."""
+    with _lock:
+        return _recent[-1] if _recent else None
+
+
+def recent_runs() -> list[Run]:
+    """Gibt die zuletzt abgeschlossenen Läufe zurück, neuester zuerst."""
+    with _lock:
+        return list(reversed(_recent))
+
+
+def configure(trace_memory: bool) -> None:
+    """Schaltet die Speichermessung per tracemalloc ein oder aus."""
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _configure_from_env() -> None:
+    if os.environ.get(ENV_LOG):
+        add_sink(LoggingSink())
+    if os.environ.get(ENV_JSONL):
+        add_sink(JsonLinesSink(os.environ[ENV_JSONL]))
+    if os.environ.get(ENV_PROM):
+        add_sink(PrometheusTextfileSink(os.environ[ENV_PROM]))
+    if os.environ.get(ENV_TRACE_MEMORY):
+        configure(trace_memory=True)
+
+
+_configure_from_env()
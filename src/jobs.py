@@ -0,0 +1,153 @@
+"""Job-Warteschlange für die Report-Erzeugung im Hintergrund.
+
+Jobs laufen in einem gemeinsamen Executor. Jeder Job hat einen
+Schlüssel; wird ein Job mit gleichem Schlüssel eingereicht, solange der
+vorherige noch wartet, läuft oder erfolgreich war, wird dessen ID
+zurückgegeben statt erneut zu rendern (z.B. bei Doppelklicks).
+
+Mit ``max_pending`` wird die Anzahl offener (wartender oder laufender)
+Jobs begrenzt; weitere Jobs werden mit ``QueueFull`` abgewiesen.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+# Job-Zustände
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(RuntimeError):
+    """Die Warteschlange enthält bereits ``max_pending`` offene Jobs."""
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    future: Future
+    submitted: float = field(default_factory=time.time)
+    finished: float | None = None
+
+    @property
+    def status(self) -> str:
+        if self.future.done():
+            if self.future.cancelled() or self.future.exception() is not None:
+                return FAILED
+            return DONE
+        if self.future.running():
+            return RUNNING
+        return QUEUED
+
+    @property
+    def elapsed(self) -> float:
+        """Sekunden seit dem Einreichen (bzw. bis zum Abschluss)."""
+        end = self.finished if self.finished is not None else time.time()
+        return end - self.submitted
+
+    @property
+    def result(self):
+        """Ergebnis des Jobs; None solange er nicht abgeschlossen ist."""
+        if self.status != DONE:
+            return None
+        return self.future.result()
+
+    @property
+    def error(self) -> BaseException | None:
+        if not self.future.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+
+class JobQueue:
+    """Thread-sichere Job-Verwaltung über einem Executor.
+
+    Args:
+        executor: Zu verwendender Executor (Standard: ThreadPoolExecutor mit
+            ``max_workers`` Threads).
+        max_workers: Anzahl Worker des Standard-Executors.
+        max_finished: Anzahl abgeschlossener Jobs, die zum Abholen des
+            Ergebnisses aufbewahrt werden.
+        max_pending: Maximale Anzahl offener Jobs (None = unbegrenzt).
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        max_workers: int = 2,
+        max_finished: int = 32,
+        max_pending: int | None = None,
+    ):
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="render-job",
+        )
+        self.max_finished = max_finished
+        self.max_pending = max_pending
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._by_key: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, fn, *args, **kwargs) -> str:
+        """Reicht einen Job ein und gibt seine ID zurück.
+
+        Existiert bereits ein wartender, laufender oder erfolgreicher Job mit
+        demselben Schlüssel, wird dessen ID zurückgegeben.
+
+        Raises:
+            QueueFull: Wenn bereits ``max_pending`` Jobs offen sind.
+        """
+        with self._lock:
+            existing_id = self._by_key.get(key)
+            if existing_id is not None:
+                existing = self._jobs.get(existing_id)
+                if existing is not None and existing.status != FAILED:
+                    return existing_id
+
+            if self.max_pending is not None and self._pending() >= self.max_pending:
+                raise QueueFull(f"{self.max_pending} Jobs in Bearbeitung")
+
+            job_id = uuid.uuid4().hex
+            future = self._executor.submit(fn, *args, **kwargs)
+            job = Job(id=job_id, key=key, future=future)
+            self._jobs[job_id] = job
+            self._by_key[key] = job_id
+            self._evict()
+
+        future.add_done_callback(lambda _f: self._mark_finished(job))
+        return job_id
+
+    def get(self, job_id: str) -> Job | None:
+        """Gibt den Job zur ID zurück oder None, falls unbekannt/verworfen."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pending(self) -> int:
+        """Anzahl offener (wartender oder laufender) Jobs."""
+        with self._lock:
+            return self._pending()
+
+    def _pending(self) -> int:
+        # Aufrufer hält self._lock
+        return sum(not j.future.done() for j in self._jobs.values())
+
+    def _mark_finished(self, job: Job) -> None:
+        job.finished = time.time()
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        # Aufrufer hält self._lock; älteste abgeschlossene Jobs zuerst verwerfen
+        finished = [j for j in self._jobs.values() if j.future.done()]
+        for job in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) == job.id:
+                del self._by_key[job.key]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
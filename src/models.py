@@ -1,9 +1,11 @@
 """Datenmodelle für die Haltungsform-Vorabschätzung."""
 
+import base64
+import hashlib
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field, model_validator
 
 
 class AmpelColor(str, Enum):
@@ -108,6 +110,13 @@ class PlanZustandRow(BaseModel):
     ausfuehrung: str = "1 - Zwangsbelüfteter Stall"
 
 
+class Nachbarbetrieb(BaseModel):
+    bezeichnung: str = ""
+    tierart: str = ""
+    tierplaetze: int = 0
+    entfernung: int = 0  # Meter
+
+
 class Pruefungserfordernis(BaseModel):
     geruchshaeufigkeiten: str = "Ja"
     stickstoffdeposition: str = "Ja"
@@ -143,8 +152,33 @@ class FarmProject(BaseModel):
     # Prüfungserfordernis
     pruefung: Pruefungserfordernis = Pruefungserfordernis()
 
-    # Lageplan-Bild (Base64)
-    lageplan_b64: Optional[str] = None
+    # Aus dem Betriebsregister ermittelte Nachbarbetriebe (src.nachbarbetriebe);
+    # Umkreis in Metern, 0 = nicht ermittelt
+    nachbar_umkreis: int = 0
+    nachbarbetriebe_liste: list[Nachbarbetrieb] = []
+
+    # Lageplan-Bild als Rohdaten; nicht Teil von model_dump/JSON, dort steht
+    # nur der Hash (lageplan_sha256)
+    lageplan: Optional[bytes] = Field(default=None, exclude=True, repr=False)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _legacy_lageplan_b64(cls, data):
+        """Akzeptiert das frühere Feld ``lageplan_b64`` (Base64-String)."""
+        if isinstance(data, dict) and "lageplan_b64" in data:
+            data = dict(data)
+            lageplan_b64 = data.pop("lageplan_b64")
+            if lageplan_b64 and data.get("lageplan") is None:
+                data["lageplan"] = base64.b64decode(lageplan_b64)
+        return data
+
+    @computed_field
+    @property
+    def lageplan_sha256(self) -> Optional[str]:
+        """SHA-256 des Lageplans; identifiziert das Bild in Dumps und Cache-Schlüsseln."""
+        if not self.lageplan:
+            return None
+        return hashlib.sha256(self.lageplan).hexdigest()
 
     @property
     def adresse_einzeilig(self) -> str:
@@ -0,0 +1,213 @@
+"""Ermittlung benachbarter Tierhaltungsbetriebe aus einem lokalen Register.
+
+Das Register (CSV oder Parquet mit UTM32-Koordinaten, Tierart und
+Tierplätzen je Betrieb) wird in einen Gitterindex geladen: die Betriebe
+werden nach quadratischen Zellen der Kantenlänge ``cell_size`` sortiert.
+Da die Zellen spaltenweise fortlaufend nummeriert sind, liegen alle
+Betriebe einer Zellspalte eines Suchquadrats in einem zusammenhängenden
+Bereich der Arrays; eine Umkreissuche braucht je Zellspalte nur eine
+binäre Suche und prüft dann nur die Betriebe der umliegenden Zellen.
+
+Die Koordinaten des Vorhabens liefert ``src.tim_online.geocode_utm``.
+Der Index ist nach dem Aufbau unveränderlich und kann von mehreren
+Threads gleichzeitig abgefragt werden.
+"""
+
+import csv
+import math
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+# Spaltennamen der Eingabedatei; "bezeichnung" ist optional
+DEFAULT_COLUMNS = {
+    "bezeichnung": "bezeichnung",
+    "ostwert": "ostwert",
+    "nordwert": "nordwert",
+    "tierart": "tierart",
+    "tierplaetze": "tierplaetze",
+}
+
+DEFAULT_CELL_SIZE = 1000.0
+
+# Zellspalten-Versatz im Zellschlüssel (Zeilenindex < 2**31)
+_ROW_SPAN = 1 << 32
+
+
+class NearbyFarm(NamedTuple):
+    bezeichnung: str
+    tierart: str
+    tierplaetze: int
+    ostwert: float
+    nordwert: float
+    entfernung: float
+
+
+def _parse_float(value) -> float:
+    if isinstance(value, str):
+        # Dezimalkomma aus deutschen CSV-Exporten
+        value = value.strip().replace(",", ".")
+    return float(value)
+
+
+class FarmRegister:
+    """Gitterindex über die Standorte landwirtschaftlicher Betriebe.
+
+    Args:
+        records: Tupel (bezeichnung, ostwert, nordwert, tierart, tierplaetze).
+            Einträge ohne gültige Koordinaten werden übersprungen, ungültige
+            Tierplätze als 0 übernommen.
+        cell_size: Kantenlänge der Gitterzellen in Metern; sinnvoll ist etwa
+            der übliche Suchradius.
+    """
+
+    def __init__(self, records, cell_size: float = DEFAULT_CELL_SIZE):
+        names, eastings, northings, tierarten, plaetze = [], [], [], [], []
+        for bezeichnung, ostwert, nordwert, tierart, tierplaetze in records:
+            try:
+                e, n = _parse_float(ostwert), _parse_float(nordwert)
+            except (TypeError, ValueError):
+                continue
+            if not (math.isfinite(e) and math.isfinite(n)):
+                continue
+            try:
+                count = int(_parse_float(tierplaetze))
+            except (TypeError, ValueError, OverflowError):
+                count = 0
+            names.append("" if bezeichnung is None else str(bezeichnung).strip())
+            eastings.append(e)
+            northings.append(n)
+            tierarten.append("" if tierart is None else str(tierart).strip())
+            plaetze.append(count)
+
+        self.cell_size = float(cell_size)
+        easting = np.asarray(eastings, dtype=np.float64)
+        northing = np.asarray(northings, dtype=np.float64)
+        keys = self._cell_keys(easting, northing)
+        order = np.argsort(keys, kind="stable")
+
+        self._keys = keys[order]
+        self._easting = easting[order]
+        self._northing = northing[order]
+        self._tierplaetze = np.asarray(plaetze, dtype=np.int64)[order]
+        self._bezeichnung = [names[i] for i in order]
+        self._tierart = [tierarten[i] for i in order]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @classmethod
+    def from_csv(cls, lines, columns: dict | None = None, delimiter: str = ";", **kwargs):
+        """Liest das Register aus CSV-Zeilen (z.B. einer geöffneten Datei).
+
+        Args:
+            lines: Iterierbare Textzeilen mit Kopfzeile.
+            columns: Abbildung der Felder aus ``DEFAULT_COLUMNS`` auf die
+                Spaltennamen der Datei.
+            delimiter: Spaltentrenner (Standard: Semikolon).
+            **kwargs: Weitere Argumente für ``FarmRegister``.
+
+        Raises:
+            ValueError: Wenn eine Pflichtspalte fehlt.
+        """
+        cols = {**DEFAULT_COLUMNS, **(columns or {})}
+        reader = csv.DictReader(lines, delimiter=delimiter)
+        missing = [
+            cols[f] for f in ("ostwert", "nordwert", "tierart", "tierplaetze")
+            if cols[f] not in (reader.fieldnames or ())
+        ]
+        if missing:
+            raise ValueError(f"Spalten fehlen im Betriebsregister: {', '.join(missing)}")
+        return cls(
+            (
+                (row.get(cols["bezeichnung"]), row[cols["ostwert"]], row[cols["nordwert"]],
+                 row[cols["tierart"]], row[cols["tierplaetze"]])
+                for row in reader
+            ),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_file(cls, path: Path | str, columns: dict | None = None, delimiter: str = ";", **kwargs):
+        """Lädt eine CSV- oder Parquet-Datei (siehe ``from_csv``)."""
+        path = Path(path)
+        if path.suffix.lower() == ".parquet":
+            import pandas as pd
+
+            cols = {**DEFAULT_COLUMNS, **(columns or {})}
+            df = pd.read_parquet(path)
+            if cols["bezeichnung"] not in df.columns:
+                df[cols["bezeichnung"]] = ""
+            names = [cols[f] for f in ("bezeichnung", "ostwert", "nordwert", "tierart", "tierplaetze")]
+            return cls(df[names].itertuples(index=False, name=None), **kwargs)
+
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            return cls.from_csv(f, columns=columns, delimiter=delimiter, **kwargs)
+
+    def _cell_keys(self, easting: np.ndarray, northing: np.ndarray) -> np.ndarray:
+        col = np.floor_divide(easting, self.cell_size).astype(np.int64)
+        row = np.floor_divide(northing, self.cell_size).astype(np.int64)
+        return col * _ROW_SPAN + row
+
+    def _candidates(self, ostwert: float, nordwert: float, radius: float) -> np.ndarray:
+        """Indizes aller Betriebe in den Zellen, die den Suchkreis berühren."""
+        size = self.cell_size
+        row_min = math.floor((nordwert - radius) / size)
+        row_max = math.floor((nordwert + radius) / size)
+        cols = np.arange(math.floor((ostwert - radius) / size), math.floor((ostwert + radius) / size) + 1)
+        starts = np.searchsorted(self._keys, cols * _ROW_SPAN + row_min, side="left")
+        ends = np.searchsorted(self._keys, cols * _ROW_SPAN + row_max, side="right")
+        ranges = [np.arange(s, e) for s, e in zip(starts.tolist(), ends.tolist()) if e > s]
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(ranges)
+
+    def _result(self, idx: np.ndarray, distances: np.ndarray) -> list[NearbyFarm]:
+        return [
+            NearbyFarm(
+                bezeichnung=self._bezeichnung[i],
+                tierart=self._tierart[i],
+                tierplaetze=int(self._tierplaetze[i]),
+                ostwert=float(self._easting[i]),
+                nordwert=float(self._northing[i]),
+                entfernung=float(d),
+            )
+            for i, d in zip(idx.tolist(), distances.tolist())
+        ]
+
+    def _within(self, ostwert: float, nordwert: float, radius: float) -> tuple[np.ndarray, np.ndarray]:
+        """(Indizes, Entfernungen) der Betriebe im Umkreis, nach Entfernung sortiert."""
+        idx = self._candidates(ostwert, nordwert, radius)
+        distances = np.hypot(self._easting[idx] - ostwert, self._northing[idx] - nordwert)
+        inside = distances <= radius
+        idx, distances = idx[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return idx[order], distances[order]
+
+    def within_radius(self, ostwert: float, nordwert: float, radius: float) -> list[NearbyFarm]:
+        """Alle Betriebe im Umkreis ``radius`` (Meter), nächstgelegene zuerst."""
+        if radius < 0 or not len(self):
+            return []
+        return self._result(*self._within(ostwert, nordwert, radius))
+
+    def nearest(self, ostwert: float, nordwert: float, k: int = 5) -> list[NearbyFarm]:
+        """Die ``k`` nächstgelegenen Betriebe, nächstgelegener zuerst.
+
+        Der Suchradius beginnt bei einer Zellgröße und wird verdoppelt, bis
+        mindestens ``k`` Betriebe darin liegen; die ``k`` nächsten liegen dann
+        sicher im Kreis.
+        """
+        if k <= 0 or not len(self):
+            return []
+        # Radius, der das gesamte Register einschließt
+        max_radius = math.hypot(
+            max(abs(ostwert - self._easting.min()), abs(ostwert - self._easting.max())),
+            max(abs(nordwert - self._northing.min()), abs(nordwert - self._northing.max())),
+        )
+        radius = self.cell_size
+        while True:
+            idx, distances = self._within(ostwert, nordwert, min(radius, max_radius))
+            if len(idx) >= k or radius >= max_radius:
+                return self._result(idx[:k], distances[:k])
+            radius *= 2
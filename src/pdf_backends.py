@@ -0,0 +1,116 @@
+"""PDF-Backends: setzen das gerenderte Report-HTML in ein PDF.
+
+Standard ist xhtml2pdf. Optional steht WeasyPrint zur Verfügung (benötigt
+das Paket ``weasyprint`` sowie cairo/pango aus ``packages.txt``). Das
+Backend wird je Aufruf über den Parameter ``backend`` oder prozessweit über
+``set_default_backend`` bzw. die Umgebungsvariable
+``HALTUNGSFORM_PDF_BACKEND`` gewählt.
+
+Die Bibliotheken der Backends werden erst beim ersten Setzen eines PDFs
+geladen (xhtml2pdf zieht reportlab und pyHanko nach sich).
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import BinaryIO
+
+ENV_BACKEND = "HALTUNGSFORM_PDF_BACKEND"
+
+
+class PdfBackend(ABC):
+    """Schnittstelle eines PDF-Backends.
+
+    Attributes:
+        name: Name zur Auswahl des Backends.
+        extra_css: Optionale Stylesheet-Datei im Template-Verzeichnis, die an
+            ``style.css`` angehängt wird (backend-spezifische Anpassungen).
+    """
+
+    name: str = ""
+    extra_css: str | None = None
+
+    def is_available(self) -> bool:
+        """Prüft, ob die benötigten Bibliotheken geladen werden können."""
+        return True
+
+    @abstractmethod
+    def write(self, html_content: str, dest: BinaryIO, base_url: str) -> None:
+        """Setzt ``html_content`` und schreibt das PDF nach ``dest``."""
+
+
+class XHtml2PdfBackend(PdfBackend):
+    """Reines Python-Backend; versteht die ``@frame``/``<pdf:…>``-Erweiterungen."""
+
+    name = "xhtml2pdf"
+
+    def is_available(self) -> bool:
+        try:
+            from xhtml2pdf import pisa  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def write(self, html_content: str, dest: BinaryIO, base_url: str) -> None:
+        from xhtml2pdf import pisa
+
+        pisa_status = pisa.CreatePDF(
+            src=html_content,
+            dest=dest,
+            encoding="utf-8",
+        )
+
+        if pisa_status.err:
+            raise RuntimeError(f"PDF-Erzeugung fehlgeschlagen: {pisa_status.err} Fehler")
+
+
+class WeasyPrintBackend(PdfBackend):
+    """Backend auf Basis von WeasyPrint (cairo/pango).
+
+    Kopf- und Fußzeile sowie Seitenzahlen der xhtml2pdf-Templates werden über
+    ``weasyprint.css`` auf laufende Elemente und CSS-Zähler abgebildet.
+    """
+
+    name = "weasyprint"
+    extra_css = "weasyprint.css"
+
+    def is_available(self) -> bool:
+        try:
+            import weasyprint  # noqa: F401
+        except (ImportError, OSError):
+            return False
+        return True
+
+    def write(self, html_content: str, dest: BinaryIO, base_url: str) -> None:
+        try:
+            from weasyprint import HTML
+        except (ImportError, OSError) as e:
+            # OSError: Python-Paket vorhanden, aber cairo/pango fehlen
+            raise RuntimeError(f"WeasyPrint ist nicht verfügbar: {e}") from e
+
+        HTML(string=html_content, base_url=base_url).write_pdf(dest)
+
+
+PDF_BACKENDS: dict[str, PdfBackend] = {
+    backend.name: backend
+    for backend in (XHtml2PdfBackend(), WeasyPrintBackend())
+}
+
+_default_backend = os.environ.get(ENV_BACKEND, XHtml2PdfBackend.name)
+
+
+def get_backend(name: str | None = None) -> PdfBackend:
+    """Gibt das Backend ``name`` zurück (None = prozessweiter Standard)."""
+    name = name or _default_backend
+    try:
+        return PDF_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unbekanntes PDF-Backend: {name} (verfügbar: {', '.join(PDF_BACKENDS)})"
+        ) from None
+
+
+def set_default_backend(name: str) -> None:
+    """Setzt das prozessweite Standard-Backend."""
+    global _default_backend
+    get_backend(name)
+    _default_backend = name
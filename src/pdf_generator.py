@@ -1,27 +1,395 @@
-"""PDF-Erzeugung mit xhtml2pdf."""
+"""PDF-Erzeugung aus den HTML-Templates (Standard-Backend: xhtml2pdf)."""
 
 import base64
+import hashlib
 import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from functools import cached_property
 from pathlib import Path
+from typing import BinaryIO
 
 from jinja2 import Environment, FileSystemLoader
-from xhtml2pdf import pisa
 
 from src import static_texts as texts
+from src.instrumentation import stage
 from src.models import AMPEL_DISPLAY, AmpelColor, FarmProject
+from src.pdf_backends import PdfBackend, get_backend
 
 # Pfade
 _BASE_DIR = Path(__file__).resolve().parent.parent
 _TEMPLATES_DIR = _BASE_DIR / "templates"
 _ASSETS_DIR = _BASE_DIR / "assets"
 
+# Report-Varianten -> Template
+REPORT_VARIANTS = {
+    "voll": "report.html",
+    "kurz": "report_kurz.html",
+}
+_REPORT_TEMPLATES = tuple(REPORT_VARIANTS.values())
 
-def _load_logo_b64() -> str:
-    """Lädt das Firmenlogo als Base64-String."""
-    logo_path = _ASSETS_DIR / "logo.png"
-    with open(logo_path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
+# Der Lageplan wird im Report mit width="480" (ca. 12,7 cm) eingebettet;
+# 1500 px entsprechen dort knapp 300 dpi.
+_LAGEPLAN_MAX_PX = 1500
+_LAGEPLAN_JPEG_QUALITY = 85
+# Bilder mit höchstens so vielen Farben gelten als Zeichnung (-> PNG)
+_LAGEPLAN_MAX_PNG_COLORS = 256
+# Kantenlänge der Stichprobe für das Zählen der Farben
+_LAGEPLAN_SAMPLE_PX = 512
+_LAGEPLAN_CACHE_SIZE = 16
+
+# Templates mit einem "segment"-Schalter: Kapitel ohne Projektdaten werden
+# einmal je Template-/CSS-Stand als PDF-Seiten gerendert und zwischengespeichert
+_SPLIT_TEMPLATES = frozenset({"report.html"})
+_STATIC_PAGES_CACHE_SIZE = 8
+
+
+class RenderContext:
+    """Prozessweiter Cache für kompilierte Templates, CSS und Logo.
+
+    Jeder Eintrag wird zusammen mit der Änderungszeit (mtime) seiner Quelldatei
+    gespeichert. Ändert sich die Datei auf der Platte, wird der Eintrag beim
+    nächsten Zugriff neu geladen, sodass Template-Anpassungen ohne Neustart
+    sichtbar werden.
+    """
+
+    def __init__(self, templates_dir: Path, assets_dir: Path):
+        self._templates_dir = templates_dir
+        self._assets_dir = assets_dir
+        self._env = Environment(
+            loader=FileSystemLoader(str(templates_dir)),
+            autoescape=False,
+        )
+        self._env.globals["ampel_class"] = _ampel_class
+        self._entries: dict[Path, tuple[int, object, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, path: Path, build) -> tuple[object, str]:
+        """Liefert (Wert, SHA-256 des Dateiinhalts) für ``path``.
+
+        ``build`` erhält den Dateiinhalt als Bytes und erzeugt daraus den
+        zu cachenden Wert. Er wird nur bei einem Cache-Miss aufgerufen.
+        """
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime:
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+
+        data = path.read_bytes()
+        value = build(data)
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._entries[path] = (mtime, value, digest)
+        return value, digest
+
+    def _template_entry(self, template_name: str):
+        return self._entry(
+            self._templates_dir / template_name,
+            lambda data: self._env.from_string(data.decode("utf-8")),
+        )
+
+    def _css_entry(self):
+        return self._entry(
+            self._templates_dir / "style.css",
+            lambda data: data.decode("utf-8"),
+        )
+
+    def _logo_entry(self):
+        return self._entry(
+            self._assets_dir / "logo.png",
+            lambda data: f"data:image/png;base64,{base64.b64encode(data).decode()}",
+        )
+
+    def template(self, template_name: str):
+        """Gibt das kompilierte Jinja2-Template zurück."""
+        return self._template_entry(template_name)[0]
+
+    def css(self) -> str:
+        """Gibt den Inhalt von ``style.css`` zurück."""
+        return self._css_entry()[0]
+
+    def _extra_css_entry(self, filename: str):
+        return self._entry(
+            self._templates_dir / filename,
+            lambda data: data.decode("utf-8"),
+        )
+
+    def logo_uri(self) -> str:
+        """Gibt das Firmenlogo als Data-URI zurück."""
+        return self._logo_entry()[0]
+
+    def extra_css(self, filename: str) -> str:
+        """Gibt ein zusätzliches Stylesheet aus dem Template-Verzeichnis zurück."""
+        return self._extra_css_entry(filename)[0]
+
+    def fingerprint(self, template_name: str, extra_css: str | None = None) -> str:
+        """Hash über Template, CSS und Logo – ändert sich mit jedem dieser Inhalte."""
+        digests = [
+            self._template_entry(template_name)[1],
+            self._css_entry()[1],
+            self._logo_entry()[1],
+        ]
+        if extra_css is not None:
+            digests.append(self._extra_css_entry(extra_css)[1])
+        return hashlib.sha256("|".join(digests).encode()).hexdigest()
+
+    def warm(self) -> None:
+        """Lädt alle Report-Templates, CSS und Logo vorab in den Cache."""
+        for template_name in _REPORT_TEMPLATES:
+            self.template(template_name)
+        self.css()
+        self.logo_uri()
+
+    def stats(self) -> dict:
+        """Gibt die Trefferstatistik des Caches zurück."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Verwirft alle Einträge und setzt die Statistik zurück."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class PdfCache:
+    """Inhaltsadressierter Cache für fertige PDFs.
+
+    Zwei Stufen: ein begrenzter LRU-Cache im Speicher und optional ein
+    Verzeichnis auf der Platte. Das Plattenverzeichnis wird nach Größe
+    begrenzt; bei Überschreitung werden die am längsten nicht genutzten
+    Dateien (nach mtime) gelöscht.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Path | str | None = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> bytes | None:
+        """Gibt die gespeicherten PDF-Bytes zurück oder None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+        data = self._disk_get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._memory_put(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Legt ein PDF in beiden Cache-Stufen ab."""
+        with self._lock:
+            self._memory_put(key, data)
+        self._disk_put(key, data)
+
+    def _memory_put(self, key: str, data: bytes) -> None:
+        # Aufrufer hält self._lock
+        if len(data) > self.max_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory and (
+            len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes
+        ):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pdf"
+
+    def _disk_get(self, key: str) -> bytes | None:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # mtime dient als Zeitpunkt der letzten Nutzung für die Verdrängung
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _disk_put(self, key: str, data: bytes) -> None:
+        if self.disk_dir is None or len(data) > self.disk_max_bytes:
+            return
+        # Atomar schreiben, damit parallele Leser nie eine halbe Datei sehen
+        fd, tmp_name = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, self._disk_path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        files = []
+        total = 0
+        for path in self.disk_dir.glob("*.pdf"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+
+        files.sort()
+        for _, size, path in files:
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> dict:
+        """Gibt die Trefferstatistik des Caches zurück."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._memory),
+                "bytes": self._memory_bytes,
+            }
+
+    def clear(self) -> None:
+        """Leert den Speicher-Cache und das Plattenverzeichnis."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.pdf"):
+                path.unlink(missing_ok=True)
+
+
+_lageplan_cache: OrderedDict[str, str] = OrderedDict()
+_lageplan_lock = threading.Lock()
+
+
+def _sniff_mime(image_bytes: bytes) -> str:
+    """Bestimmt den MIME-Typ anhand der Dateisignatur."""
+    if image_bytes.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    return "image/png"
+
+
+def _encode_lageplan(image_bytes: bytes) -> tuple[str, bytes]:
+    """Skaliert und komprimiert den Lageplan für den Druck.
+
+    Das Bild wird auf ``_LAGEPLAN_MAX_PX`` verkleinert, gemäß EXIF gedreht
+    und ohne Metadaten neu gespeichert: Zeichnungen und Bilder mit
+    Transparenz als PNG, Fotos und Luftbilder als JPEG.
+
+    Returns:
+        (MIME-Typ, Bilddaten). Ist das Bild nicht lesbar, werden die
+        Originaldaten zurückgegeben.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        # JPEGs bereits beim Dekodieren verkleinern (deutlich schneller)
+        img.draft("RGB", (_LAGEPLAN_MAX_PX, _LAGEPLAN_MAX_PX))
+        img = ImageOps.exif_transpose(img)
+    except (UnidentifiedImageError, OSError):
+        return _sniff_mime(image_bytes), image_bytes
+
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    if has_alpha:
+        use_png = True
+    else:
+        # Farben vor dem Verkleinern zählen, an einer Stichprobe ohne
+        # Interpolation: LANCZOS erzeugt an Linien Zwischentöne, mit denen
+        # eine Zeichnung wie ein Foto aussähe
+        scale = min(1.0, _LAGEPLAN_SAMPLE_PX / max(img.size))
+        sample_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        sample = img.resize(sample_size, Image.Resampling.NEAREST).convert("RGB")
+        use_png = sample.getcolors(maxcolors=_LAGEPLAN_MAX_PNG_COLORS) is not None
+
+    img.thumbnail((_LAGEPLAN_MAX_PX, _LAGEPLAN_MAX_PX), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    if use_png:
+        if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        img.save(out, format="PNG", optimize=True)
+        return "image/png", out.getvalue()
+
+    img.convert("RGB").save(out, format="JPEG", quality=_LAGEPLAN_JPEG_QUALITY, optimize=True)
+    return "image/jpeg", out.getvalue()
+
+
+def prepare_lageplan(image_bytes: bytes) -> str:
+    """Gibt den druckfertigen Lageplan als Data-URI zurück.
+
+    Das Projekt führt den Lageplan als Rohdaten; Base64 entsteht nur hier,
+    einmalig und für das bereits verkleinerte Bild. Das Ergebnis wird anhand
+    des SHA-256 der Eingabedaten zwischengespeichert, sodass wiederholte
+    Reports dasselbe Bild nicht erneut verarbeiten.
+    """
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    with _lageplan_lock:
+        uri = _lageplan_cache.get(digest)
+        if uri is not None:
+            _lageplan_cache.move_to_end(digest)
+            return uri
+
+    with stage("lageplan"):
+        mime, data = _encode_lageplan(image_bytes)
+    uri = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+    with _lageplan_lock:
+        _lageplan_cache[digest] = uri
+        while len(_lageplan_cache) > _LAGEPLAN_CACHE_SIZE:
+            _lageplan_cache.popitem(last=False)
+    return uri
+
+
+_static_pages_cache: OrderedDict[str, bytes] = OrderedDict()
+_static_pages_lock = threading.Lock()
 
 
 def _ampel_class(color_value: str) -> str:
@@ -39,59 +407,346 @@ def _ampel_class(color_value: str) -> str:
         return ""
 
 
-def _render_pdf(project: FarmProject, template_name: str) -> bytes:
+_render_context = RenderContext(_TEMPLATES_DIR, _ASSETS_DIR)
+_pdf_cache = PdfCache()
+
+
+class _RenderInputs:
+    """Vom Template unabhängige Eingaben eines Projekts.
+
+    Wird von allen Varianten eines Projekts geteilt; JSON-Dump und Lageplan
+    werden erst bei Bedarf und dann nur einmal erzeugt.
+    """
+
+    def __init__(self, project: FarmProject):
+        self.project = project
+        self.datum = date.today().strftime("%d.%m.%Y")
+
+    @cached_property
+    def project_json(self) -> str:
+        return self.project.model_dump_json()
+
+    @cached_property
+    def lageplan_uri(self) -> str | None:
+        if not self.project.lageplan:
+            return None
+        return prepare_lageplan(self.project.lageplan)
+
+    def warm(self) -> None:
+        """Erzeugt Projekt-JSON und Lageplan vorab (z.B. bevor Threads sie teilen)."""
+        # Der Zugriff berechnet die cached_property und legt sie am Objekt ab
+        _ = self.project_json
+        _ = self.lageplan_uri
+
+
+def _cache_key(inputs: _RenderInputs, template_name: str, backend: PdfBackend) -> str:
+    """Stabiler Schlüssel für den PDF-Cache."""
+    h = hashlib.sha256()
+    for part in (
+        inputs.project_json,
+        template_name,
+        _render_context.fingerprint(template_name, backend.extra_css),
+        inputs.datum,
+        backend.name,
+    ):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _render_pdf(
+    project: FarmProject,
+    template_name: str,
+    use_cache: bool = True,
+    inputs: _RenderInputs | None = None,
+    backend: str | None = None,
+) -> bytes:
     """Interne Hilfsfunktion: Rendert ein Template und erzeugt ein PDF."""
-    env = Environment(
-        loader=FileSystemLoader(str(_TEMPLATES_DIR)),
-        autoescape=False,
-    )
-    env.globals["ampel_class"] = _ampel_class
+    pdf_backend = get_backend(backend)
+    if inputs is None:
+        inputs = _RenderInputs(project)
 
-    template = env.get_template(template_name)
+    with stage(f"report[{template_name}]"):
+        key = None
+        if use_cache:
+            key = _cache_key(inputs, template_name, pdf_backend)
+            cached = _pdf_cache.get(key)
+            if cached is not None:
+                return cached
 
-    css_path = _TEMPLATES_DIR / "style.css"
-    css_content = css_path.read_text(encoding="utf-8")
+        pdf_buffer = io.BytesIO()
+        _produce_pdf(inputs, template_name, pdf_backend, pdf_buffer)
 
-    logo_b64 = _load_logo_b64()
-    logo_uri = f"data:image/png;base64,{logo_b64}"
+        pdf_bytes = pdf_buffer.getvalue()
+        if key is not None:
+            _pdf_cache.put(key, pdf_bytes)
+        return pdf_bytes
 
-    datum = date.today().strftime("%d.%m.%Y")
 
-    html_content = template.render(
-        css=css_content,
-        logo_uri=logo_uri,
-        project=project,
-        texts=texts,
-        datum=datum,
-    )
+def _render_html(
+    inputs: _RenderInputs,
+    template_name: str,
+    backend: PdfBackend,
+    **segment_vars,
+) -> str:
+    """Rendert das Template mit den Projektdaten zu HTML.
+
+    ``segment_vars`` (``segment``, ``static_pages``) wählen bei
+    ``_SPLIT_TEMPLATES`` den zu rendernden Teil aus.
+    """
+    with stage("render_html"):
+        template = _render_context.template(template_name)
+
+        css = _render_context.css()
+        if backend.extra_css is not None:
+            css = f"{css}\n{_render_context.extra_css(backend.extra_css)}"
+
+        return template.render(
+            css=css,
+            logo_uri=_render_context.logo_uri(),
+            lageplan_uri=inputs.lageplan_uri,
+            project=inputs.project,
+            texts=texts,
+            datum=inputs.datum,
+            **segment_vars,
+        )
+
+
+def _write_pdf(html_content: str, dest: BinaryIO, backend: PdfBackend) -> None:
+    """Setzt das HTML mit dem Backend und schreibt das PDF nach ``dest``."""
+    with stage(f"write_pdf[{backend.name}]"):
+        backend.write(html_content, dest, base_url=str(_TEMPLATES_DIR))
+
+
+def _static_pages(inputs: _RenderInputs, template_name: str, backend: PdfBackend) -> bytes:
+    """PDF der statischen Kapitel (erste Seite ist ein Platzhalter für die Titelseite)."""
+    key = f"{template_name}\0{_render_context.fingerprint(template_name, backend.extra_css)}\0{backend.name}"
+    with _static_pages_lock:
+        pdf_bytes = _static_pages_cache.get(key)
+        if pdf_bytes is not None:
+            _static_pages_cache.move_to_end(key)
+            return pdf_bytes
+
+    with stage("static_pages"):
+        buffer = io.BytesIO()
+        _write_pdf(_render_html(inputs, template_name, backend, segment="static"), buffer, backend)
+    pdf_bytes = buffer.getvalue()
+
+    with _static_pages_lock:
+        _static_pages_cache[key] = pdf_bytes
+        while len(_static_pages_cache) > _STATIC_PAGES_CACHE_SIZE:
+            _static_pages_cache.popitem(last=False)
+    return pdf_bytes
+
+
+def _seekable(dest: BinaryIO) -> bool:
+    try:
+        return dest.seekable()
+    except (AttributeError, ValueError):
+        return False
 
-    pdf_buffer = io.BytesIO()
-    pisa_status = pisa.CreatePDF(
-        src=html_content,
-        dest=pdf_buffer,
-        encoding="utf-8",
+
+def _produce_pdf(
+    inputs: _RenderInputs,
+    template_name: str,
+    backend: PdfBackend,
+    dest: BinaryIO,
+) -> None:
+    """Erzeugt das PDF eines Templates und schreibt es nach ``dest``.
+
+    Bei ``_SPLIT_TEMPLATES`` werden nur die Projektkapitel gesetzt. Anstelle
+    der statischen Kapitel enthält das Dokument leere Platzhalterseiten ohne
+    Kopf-/Fußzeile, die anschließend durch die zwischengespeicherten
+    statischen Seiten ersetzt werden. Da beide Teile mit denselben
+    Seitenpositionen gesetzt werden, stimmen die Seitenzahlen.
+    """
+    if template_name not in _SPLIT_TEMPLATES:
+        _write_pdf(_render_html(inputs, template_name, backend), dest, backend)
+        return
+
+    from pypdf import PdfReader, PdfWriter
+
+    static = PdfReader(io.BytesIO(_static_pages(inputs, template_name, backend)))
+    n_static = len(static.pages) - 1
+
+    buffer = io.BytesIO()
+    _write_pdf(
+        _render_html(inputs, template_name, backend, segment="dynamic", static_pages=n_static),
+        buffer,
+        backend,
     )
 
-    if pisa_status.err:
-        raise RuntimeError(f"PDF-Erzeugung fehlgeschlagen: {pisa_status.err} Fehler")
+    with stage("merge_pdf"):
+        dynamic = PdfReader(buffer)
+        if len(dynamic.pages) <= n_static:
+            raise RuntimeError(
+                f"PDF-Erzeugung fehlgeschlagen: {len(dynamic.pages)} Seiten, "
+                f"mindestens {n_static + 1} erwartet"
+            )
+        writer = PdfWriter()
+        writer.add_page(dynamic.pages[0])
+        for page in static.pages[1:]:
+            writer.add_page(page)
+        for page in dynamic.pages[n_static + 1:]:
+            writer.add_page(page)
+        if dynamic.metadata:
+            writer.add_metadata(dynamic.metadata)
+        if _seekable(dest):
+            writer.write(dest)
+        else:
+            # pypdf braucht tell()/seek(); Sockets und Pipes über einen Puffer
+            merged = io.BytesIO()
+            writer.write(merged)
+            dest.write(merged.getbuffer())
+
+
+def _template_for(variant: str) -> str:
+    try:
+        return REPORT_VARIANTS[variant]
+    except KeyError:
+        raise ValueError(f"Unbekannte Report-Variante: {variant}") from None
+
+
+def write_pdf(
+    project: FarmProject,
+    dest: BinaryIO | Path | str,
+    variant: str = "voll",
+    use_cache: bool = True,
+    backend: str | None = None,
+) -> None:
+    """Schreibt einen Report direkt in eine Datei oder ein Dateiobjekt.
+
+    Anders als ``generate_pdf`` entsteht kein zusätzliches Bytes-Objekt des
+    gesamten PDFs; ``dest`` kann z.B. ein ``tempfile.SpooledTemporaryFile``,
+    eine offene Datei oder ein Socket-Dateiobjekt sein. Liegt das PDF bereits
+    im Cache, werden die gespeicherten Bytes geschrieben; neu erzeugte PDFs
+    werden nicht in den Cache übernommen.
+
+    Args:
+        project: Das vollständige Projektdatenmodell.
+        dest: Pfad oder binäres, beschreibbares Dateiobjekt.
+        variant: Schlüssel aus ``REPORT_VARIANTS``.
+        use_cache: Bereits erzeugte, identische PDFs aus dem Cache liefern.
+        backend: Name des PDF-Backends (None = prozessweiter Standard).
+    """
+    template_name = _template_for(variant)
+    pdf_backend = get_backend(backend)
+    inputs = _RenderInputs(project)
+
+    with stage(f"report[{template_name}]"):
+        cached = None
+        if use_cache:
+            cached = _pdf_cache.get(_cache_key(inputs, template_name, pdf_backend))
 
-    pdf_buffer.seek(0)
-    return pdf_buffer.read()
+        if isinstance(dest, (str, Path)):
+            path = Path(dest)
+            try:
+                with open(path, "wb") as f:
+                    if cached is not None:
+                        f.write(cached)
+                    else:
+                        _produce_pdf(inputs, template_name, pdf_backend, f)
+            except BaseException:
+                # Keine halb geschriebenen PDFs zurücklassen
+                path.unlink(missing_ok=True)
+                raise
+            return
 
+        if cached is not None:
+            dest.write(cached)
+        else:
+            _produce_pdf(inputs, template_name, pdf_backend, dest)
 
-def generate_pdf(project: FarmProject) -> bytes:
+
+def render_pdf_view(
+    project: FarmProject,
+    variant: str = "voll",
+    use_cache: bool = True,
+    backend: str | None = None,
+) -> memoryview:
+    """Erzeugt einen Report und gibt ihn ohne weitere Kopie als memoryview zurück.
+
+    Bei einem Cache-Treffer verweist die memoryview direkt auf die
+    gespeicherten Bytes, sonst auf den internen Puffer des Renderers
+    (``BytesIO.getbuffer()``). Neu erzeugte PDFs werden nicht in den Cache
+    übernommen, da das eine Kopie erfordern würde.
+
+    Args:
+        project: Das vollständige Projektdatenmodell.
+        variant: Schlüssel aus ``REPORT_VARIANTS``.
+        use_cache: Bereits erzeugte, identische PDFs aus dem Cache liefern.
+        backend: Name des PDF-Backends (None = prozessweiter Standard).
+
+    Returns:
+        Schreibgeschützte memoryview auf die PDF-Daten.
+    """
+    template_name = _template_for(variant)
+    pdf_backend = get_backend(backend)
+    inputs = _RenderInputs(project)
+
+    with stage(f"report[{template_name}]"):
+        if use_cache:
+            cached = _pdf_cache.get(_cache_key(inputs, template_name, pdf_backend))
+            if cached is not None:
+                return memoryview(cached)
+
+        pdf_buffer = io.BytesIO()
+        _produce_pdf(inputs, template_name, pdf_backend, pdf_buffer)
+        return pdf_buffer.getbuffer().toreadonly()
+
+
+def get_render_context() -> RenderContext:
+    """Gibt den prozessweiten Render-Kontext zurück (z.B. für ``stats()``)."""
+    return _render_context
+
+
+def get_pdf_cache() -> PdfCache:
+    """Gibt den prozessweiten PDF-Cache zurück."""
+    return _pdf_cache
+
+
+def configure_pdf_cache(
+    max_entries: int = 32,
+    max_bytes: int = 64 * 1024 * 1024,
+    disk_dir: Path | str | None = None,
+    disk_max_bytes: int = 512 * 1024 * 1024,
+) -> PdfCache:
+    """Ersetzt den prozessweiten PDF-Cache durch einen neu konfigurierten.
+
+    Args:
+        max_entries: Maximale Anzahl PDFs im Speicher.
+        max_bytes: Maximale Gesamtgröße der PDFs im Speicher.
+        disk_dir: Verzeichnis für die Plattenstufe (None = deaktiviert).
+        disk_max_bytes: Maximale Gesamtgröße des Plattenverzeichnisses.
+
+    Returns:
+        Der neue Cache.
+    """
+    global _pdf_cache
+    _pdf_cache = PdfCache(
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        disk_dir=disk_dir,
+        disk_max_bytes=disk_max_bytes,
+    )
+    return _pdf_cache
+
+
+def generate_pdf(project: FarmProject, use_cache: bool = True, backend: str | None = None) -> bytes:
     """Erzeugt den vollständigen PDF-Report für ein Projekt.
 
     Args:
         project: Das vollständige Projektdatenmodell.
+        use_cache: Bereits erzeugte, identische PDFs aus dem Cache liefern.
+        backend: Name des PDF-Backends (None = prozessweiter Standard).
 
     Returns:
         Die PDF-Datei als Bytes.
     """
-    return _render_pdf(project, "report.html")
+    return _render_pdf(project, "report.html", use_cache=use_cache, backend=backend)
 
 
-def generate_pdf_kurz(project: FarmProject) -> bytes:
+def generate_pdf_kurz(project: FarmProject, use_cache: bool = True, backend: str | None = None) -> bytes:
     """Erzeugt den Kurzreport (max. 3 Seiten) für ein Projekt.
 
     Enthält: Deckblatt, Tierzahlen mit Ampelbewertung, Zusammenfassung und
@@ -99,8 +754,49 @@ def generate_pdf_kurz(project: FarmProject) -> bytes:
 
     Args:
         project: Das vollständige Projektdatenmodell.
+        use_cache: Bereits erzeugte, identische PDFs aus dem Cache liefern.
+        backend: Name des PDF-Backends (None = prozessweiter Standard).
 
     Returns:
         Die PDF-Datei als Bytes.
     """
-    return _render_pdf(project, "report_kurz.html")
+    return _render_pdf(project, "report_kurz.html", use_cache=use_cache, backend=backend)
+
+
+def generate_reports(
+    project: FarmProject,
+    variants: tuple[str, ...] = tuple(REPORT_VARIANTS),
+    use_cache: bool = True,
+    backend: str | None = None,
+) -> dict[str, bytes]:
+    """Erzeugt mehrere Report-Varianten in einem Durchgang.
+
+    Template-Kontext, Projekt-JSON und der aufbereitete Lageplan werden nur
+    einmal erzeugt und von allen Varianten geteilt; die Varianten werden
+    parallel gerendert.
+
+    Args:
+        project: Das vollständige Projektdatenmodell.
+        variants: Schlüssel aus ``REPORT_VARIANTS`` (Standard: alle).
+        use_cache: Bereits erzeugte, identische PDFs aus dem Cache liefern.
+        backend: Name des PDF-Backends (None = prozessweiter Standard).
+
+    Returns:
+        dict Variante -> PDF-Datei als Bytes.
+    """
+    templates = {variant: _template_for(variant) for variant in variants}
+    get_backend(backend)  # unbekannte Backends vor dem Start melden
+
+    inputs = _RenderInputs(project)
+    # Gemeinsame Eingaben vorab erzeugen, statt sie in jedem Thread anzufordern
+    _render_context.warm()
+    inputs.warm()
+
+    with ThreadPoolExecutor(max_workers=max(1, len(variants))) as pool:
+        futures = {
+            variant: pool.submit(
+                _render_pdf, project, templates[variant], use_cache, inputs, backend,
+            )
+            for variant in variants
+        }
+        return {variant: future.result() for variant, future in futures.items()}
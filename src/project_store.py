@@ -0,0 +1,259 @@
+"""Persistente Ablage von Projektentwürfen in SQLite.
+
+Je Entwurf wird das ``FarmProject`` als JSON (``model_dump_json``) ohne
+Lageplan gespeichert. Der Lageplan liegt einmalig als Blob in einer
+eigenen Tabelle, adressiert über seinen SHA-256 – mehrere Entwürfe mit
+demselben Bild teilen sich den Blob.
+
+Projektnummer und (normalisierte) Adresse stehen zusätzlich in eigenen,
+indizierten Spalten. Listen und Suchen lesen nur diese Spalten und
+deserialisieren keine vollständigen Projekte.
+"""
+
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.models import FarmProject
+from src.tim_online import normalize_address
+
+_DEFAULT_STORE_PATH = Path.home() / ".local" / "share" / "haltungsform" / "projects.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lageplan (
+    sha256 TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    projektnummer TEXT NOT NULL,
+    strasse TEXT NOT NULL,
+    hausnummer TEXT NOT NULL,
+    plz TEXT NOT NULL,
+    ort TEXT NOT NULL,
+    strasse_norm TEXT NOT NULL,
+    hausnummer_norm TEXT NOT NULL,
+    plz_norm TEXT NOT NULL,
+    ort_norm TEXT NOT NULL,
+    lageplan_sha256 TEXT REFERENCES lageplan (sha256),
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_projektnummer ON projects (projektnummer);
+CREATE INDEX IF NOT EXISTS projects_adresse
+    ON projects (plz_norm, strasse_norm, hausnummer_norm);
+CREATE INDEX IF NOT EXISTS projects_updated ON projects (updated);
+CREATE INDEX IF NOT EXISTS projects_lageplan ON projects (lageplan_sha256);
+"""
+
+_SUMMARY_COLUMNS = (
+    "id, projektnummer, strasse, hausnummer, plz, ort, "
+    "lageplan_sha256 IS NOT NULL, updated"
+)
+
+
+@dataclass(frozen=True)
+class ProjectSummary:
+    """Listeneintrag eines Entwurfs (ohne Projektdaten)."""
+
+    id: str
+    projektnummer: str
+    strasse: str
+    hausnummer: str
+    plz: str
+    ort: str
+    has_lageplan: bool
+    updated: float
+
+    @property
+    def adresse_einzeilig(self) -> str:
+        return f"{self.strasse} {self.hausnummer}, {self.plz} {self.ort}"
+
+
+class ProjectStore:
+    """Projektentwürfe in einer SQLite-Datenbank.
+
+    Args:
+        path: Pfad der Datenbank (``":memory:"`` für eine flüchtige Ablage).
+    """
+
+    def __init__(self, path: Path | str = _DEFAULT_STORE_PATH):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def save(self, project: FarmProject, project_id: str | None = None) -> str:
+        """Speichert einen Entwurf und gibt seine ID zurück.
+
+        Args:
+            project: Das zu speichernde Projekt.
+            project_id: ID eines bestehenden Entwurfs, der überschrieben
+                wird (None = neuer Entwurf).
+        """
+        project_id = project_id or uuid.uuid4().hex
+        data = project.model_dump_json(exclude={"lageplan_sha256"})
+        lageplan = project.lageplan or None
+        digest = project.lageplan_sha256
+        now = time.time()
+
+        with self._lock, self._conn:
+            if lageplan is not None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO lageplan (sha256, data) VALUES (?, ?)",
+                    (digest, lageplan),
+                )
+            self._conn.execute(
+                """
+                INSERT INTO projects (
+                    id, projektnummer, strasse, hausnummer, plz, ort,
+                    strasse_norm, hausnummer_norm, plz_norm, ort_norm,
+                    lageplan_sha256, created, updated, data
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    projektnummer = excluded.projektnummer,
+                    strasse = excluded.strasse,
+                    hausnummer = excluded.hausnummer,
+                    plz = excluded.plz,
+                    ort = excluded.ort,
+                    strasse_norm = excluded.strasse_norm,
+                    hausnummer_norm = excluded.hausnummer_norm,
+                    plz_norm = excluded.plz_norm,
+                    ort_norm = excluded.ort_norm,
+                    lageplan_sha256 = excluded.lageplan_sha256,
+                    updated = excluded.updated,
+                    data = excluded.data
+                """,
+                (
+                    project_id,
+                    project.projektnummer,
+                    project.strasse,
+                    project.hausnummer,
+                    project.plz,
+                    project.ort,
+                    *normalize_address(project.strasse, project.hausnummer, project.plz, project.ort),
+                    digest,
+                    now,
+                    now,
+                    data,
+                ),
+            )
+            self._delete_orphans()
+        return project_id
+
+    def load(self, project_id: str) -> FarmProject:
+        """Lädt einen Entwurf vollständig, einschließlich Lageplan.
+
+        Raises:
+            KeyError: Wenn kein Entwurf mit dieser ID existiert.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT p.data, l.data FROM projects p "
+                "LEFT JOIN lageplan l ON l.sha256 = p.lageplan_sha256 "
+                "WHERE p.id = ?",
+                (project_id,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Unbekannter Entwurf: {project_id}")
+
+        data, lageplan = row
+        project = FarmProject.model_validate_json(data)
+        project.lageplan = lageplan
+        return project
+
+    def delete(self, project_id: str) -> bool:
+        """Löscht einen Entwurf; gibt zurück, ob er existierte."""
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+            self._delete_orphans()
+        return cur.rowcount > 0
+
+    def list_projects(self, limit: int = 50, offset: int = 0) -> list[ProjectSummary]:
+        """Listet Entwürfe, zuletzt geänderte zuerst."""
+        return self._summaries(
+            f"SELECT {_SUMMARY_COLUMNS} FROM projects ORDER BY updated DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+
+    def find_by_projektnummer(self, projektnummer: str) -> list[ProjectSummary]:
+        """Entwürfe mit genau dieser Projektnummer, zuletzt geänderte zuerst."""
+        return self._summaries(
+            f"SELECT {_SUMMARY_COLUMNS} FROM projects WHERE projektnummer = ? "
+            "ORDER BY updated DESC",
+            (projektnummer,),
+        )
+
+    def find_by_address(
+        self,
+        strasse: str,
+        hausnummer: str = "",
+        plz: str = "",
+        ort: str = "",
+    ) -> list[ProjectSummary]:
+        """Entwürfe zu einer Adresse; leere Angaben werden nicht verglichen.
+
+        Die Adresse wird wie im Geocoding-Cache normalisiert
+        (``normalize_address``), sodass z.B. ``Hauptstr.`` und
+        ``Hauptstrasse`` übereinstimmen.
+        """
+        fields = ("strasse_norm", "hausnummer_norm", "plz_norm", "ort_norm")
+        conditions, params = [], []
+        for column, value in zip(fields, normalize_address(strasse, hausnummer, plz, ort)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if not conditions:
+            return []
+        return self._summaries(
+            f"SELECT {_SUMMARY_COLUMNS} FROM projects WHERE {' AND '.join(conditions)} "
+            "ORDER BY updated DESC",
+            tuple(params),
+        )
+
+    def search(self, text: str, limit: int = 50) -> list[ProjectSummary]:
+        """Freitextsuche über Projektnummer, Straße und Ort."""
+        pattern = f"%{text.strip()}%"
+        return self._summaries(
+            f"SELECT {_SUMMARY_COLUMNS} FROM projects "
+            "WHERE projektnummer LIKE ? OR strasse LIKE ? OR ort LIKE ? "
+            "ORDER BY updated DESC LIMIT ?",
+            (pattern, pattern, pattern, limit),
+        )
+
+    def _summaries(self, sql: str, params: tuple) -> list[ProjectSummary]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            ProjectSummary(
+                id=row[0],
+                projektnummer=row[1],
+                strasse=row[2],
+                hausnummer=row[3],
+                plz=row[4],
+                ort=row[5],
+                has_lageplan=bool(row[6]),
+                updated=row[7],
+            )
+            for row in rows
+        ]
+
+    def _delete_orphans(self) -> None:
+        # Aufrufer hält self._lock und eine offene Transaktion
+        self._conn.execute(
+            "DELETE FROM lageplan WHERE sha256 NOT IN "
+            "(SELECT lageplan_sha256 FROM projects WHERE lageplan_sha256 IS NOT NULL)"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,384 @@
+"""HTTP-Dienst für die Report-Erzeugung ohne Streamlit-Oberfläche.
+
+Aufruf aus dem Projektverzeichnis::
+
+    python -m src.service [--host 127.0.0.1] [--port 8080] [--workers 2]
+                          [--max-pending 8] [--backend NAME]
+
+Endpunkte:
+
+- ``POST /projects``: XLSX-Datei (profarm-Layout) oder FarmProject-JSON
+  als Body; Antwort ist das validierte FarmProject als JSON (Lageplan als
+  ``lageplan_b64``, die Antwort kann also unverändert an ``/jobs`` gehen).
+- ``POST /jobs?variant=voll|kurz``: Body wie bei ``/projects``; reicht
+  einen Render-Job ein. Antwort ``202`` mit Job-ID und ``Location``.
+- ``GET /jobs/<id>``: Zustand des Jobs.
+- ``GET /jobs/<id>/pdf``: das fertige PDF (``409``, solange der Job läuft).
+
+Ein Lageplan kann im JSON als ``lageplan_b64`` (Base64) mitgegeben werden.
+
+Die Reports werden in Worker-Prozessen erzeugt, die beim Start des
+Dienstes gestartet werden, xhtml2pdf/reportlab laden und beide Varianten
+einmal rendern (Templates, Schriften, statische Kapitel). Sind
+``max_pending`` Jobs offen, antwortet der Dienst mit ``429`` und
+``Retry-After``.
+
+Der Dienst hat keine Authentifizierung und bindet standardmäßig nur an
+127.0.0.1.
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import ValidationError
+
+from src.jobs import DONE, FAILED, JobQueue, QueueFull
+from src.models import FarmProject
+from src.pdf_backends import get_backend
+from src.pdf_generator import REPORT_VARIANTS, get_render_context, write_pdf
+from src.xlsx_parser import parse_xlsx
+
+logger = logging.getLogger(__name__)
+
+# Größte angenommene Anfrage (XLSX bzw. JSON mit Lageplan)
+_MAX_BODY_BYTES = 32 * 1024 * 1024
+_RETRY_AFTER_S = 5
+
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/pdf)?$")
+# Höchstens so lange wartet ein Worker beim Start auf die übrigen
+_WORKER_START_TIMEOUT_S = 300
+
+# Im Worker-Prozess: Barriere aller Worker (siehe ReportService.start_workers)
+_ready_barrier = None
+
+
+def _init_worker(backend: str | None, warm: bool, ready=None) -> None:
+    """Initialisiert einen Worker-Prozess: Backend laden und Caches füllen."""
+    global _ready_barrier
+    _ready_barrier = ready
+    get_backend(backend)
+    if not warm:
+        return
+    get_render_context().warm()
+    try:
+        for variant in REPORT_VARIANTS:
+            write_pdf(FarmProject(), io.BytesIO(), variant=variant, use_cache=False, backend=backend)
+    except Exception:
+        # Ohne Aufwärmen rendert der erste Job eben langsamer
+        logger.exception("Aufwärmen des Workers %d fehlgeschlagen", os.getpid())
+
+
+def _worker_ready() -> int:
+    """Blockiert den Worker, bis alle Worker initialisiert sind; gibt die PID zurück.
+
+    Da jeder Aufruf seinen Worker bis zur Barriere belegt, muss der Pool für
+    ``workers`` Aufrufe ebenso viele Prozesse starten.
+    """
+    _ready_barrier.wait(timeout=_WORKER_START_TIMEOUT_S)
+    return os.getpid()
+
+
+def _render_job(project: FarmProject, variant: str, backend: str | None) -> bytes:
+    """Erzeugt einen Report im Worker-Prozess."""
+    buffer = io.BytesIO()
+    write_pdf(project, buffer, variant=variant, use_cache=False, backend=backend)
+    return buffer.getvalue()
+
+
+def _job_key(variant: str, project: FarmProject) -> str:
+    """Schlüssel zum Zusammenfassen identischer Render-Jobs."""
+    payload = f"{variant}|{date.today().isoformat()}|{project.model_dump_json()}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def parse_project(body: bytes) -> FarmProject:
+    """Liest ein Projekt aus einer XLSX-Datei oder aus FarmProject-JSON.
+
+    XLSX-Dateien werden an der ZIP-Signatur erkannt, alles andere wird
+    als JSON gelesen.
+
+    Raises:
+        ValueError: Wenn die XLSX-Datei nicht gelesen werden kann.
+        ValidationError: Wenn die Daten kein gültiges FarmProject ergeben.
+    """
+    if body[:4] == b"PK\x03\x04":
+        try:
+            data = parse_xlsx(body)
+        except Exception as e:
+            raise ValueError(f"XLSX-Datei konnte nicht gelesen werden: {e}") from e
+        return FarmProject.model_validate(data)
+    return FarmProject.model_validate_json(body)
+
+
+def project_json(project: FarmProject) -> bytes:
+    """Serialisiert ein Projekt so, wie ``parse_project`` es wieder einliest.
+
+    ``FarmProject.lageplan`` ist von ``model_dump`` ausgenommen; der Lageplan
+    wird daher als ``lageplan_b64`` mitgegeben.
+    """
+    data = project.model_dump(mode="json")
+    if project.lageplan:
+        data["lageplan_b64"] = base64.b64encode(project.lageplan).decode("ascii")
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class ReportService:
+    """Job-Warteschlange über einem Pool vorab gestarteter Worker-Prozesse.
+
+    Args:
+        workers: Anzahl Worker-Prozesse.
+        max_pending: Maximale Anzahl offener Jobs; weitere werden abgewiesen.
+        max_finished: Anzahl fertiger Jobs, deren PDF abrufbar bleibt.
+        backend: Name des PDF-Backends (None = Standard).
+        warm: Worker beim Start durch Probe-Reports aufwärmen.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 8,
+        max_finished: int = 32,
+        backend: str | None = None,
+        warm: bool = True,
+    ):
+        get_backend(backend)  # unbekannte Backends vor dem Start melden
+        self.workers = workers
+        self.backend = backend
+        self.worker_pids: set[int] = set()
+        # "spawn" statt fork: der HTTP-Server läuft mit mehreren Threads
+        mp_context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(backend, warm, mp_context.Barrier(workers)),
+        )
+        self.jobs = JobQueue(self._executor, max_finished=max_finished, max_pending=max_pending)
+
+    def start_workers(self) -> None:
+        """Startet alle Worker-Prozesse und wartet, bis sie aufgewärmt sind.
+
+        Die PIDs der Worker stehen danach in ``worker_pids``.
+
+        Raises:
+            BrokenExecutor: Wenn ein Worker nicht gestartet werden konnte.
+            threading.BrokenBarrierError: Wenn nicht alle Worker innerhalb
+                von ``_WORKER_START_TIMEOUT_S`` bereit waren.
+        """
+        futures = [self._executor.submit(_worker_ready) for _ in range(self.workers)]
+        self.worker_pids = {future.result() for future in futures}
+
+    def submit(self, project: FarmProject, variant: str) -> str:
+        """Reicht einen Render-Job ein und gibt seine ID zurück.
+
+        Raises:
+            ValueError: Bei einer unbekannten Report-Variante.
+            QueueFull: Wenn bereits ``max_pending`` Jobs offen sind.
+            BrokenExecutor: Wenn ein Worker-Prozess abgestürzt ist.
+        """
+        if variant not in REPORT_VARIANTS:
+            raise ValueError(f"Unbekannte Report-Variante: {variant}")
+        return self.jobs.submit(
+            _job_key(variant, project), _render_job, project, variant, self.backend,
+        )
+
+    def shutdown(self) -> None:
+        self.jobs.shutdown(wait=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "HaltungsformReport/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> ReportService:
+        return self.server.service
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: HTTPStatus, payload, headers: dict[str, str] | None = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, "application/json; charset=utf-8", headers)
+
+    def _send_error(self, status: HTTPStatus, message: str, headers: dict[str, str] | None = None) -> None:
+        self._send_json(status, {"fehler": message}, headers)
+
+    def _read_project(self) -> FarmProject | None:
+        """Liest das Projekt aus dem Body; sendet bei Fehlern die Antwort selbst."""
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length fehlt")
+            return None
+        if length > _MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Maximal {_MAX_BODY_BYTES} Bytes")
+            return None
+
+        body = self.rfile.read(length)
+        try:
+            return parse_project(body)
+        except ValidationError as e:
+            self._send_json(
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+                {"fehler": "Ungültiges Projekt", "details": e.errors(include_url=False, include_input=False)},
+            )
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+        return None
+
+    def _job_status(self, job) -> dict:
+        status = {"id": job.id, "status": job.status, "dauer": round(job.elapsed, 3)}
+        if job.status == DONE:
+            status["pdf"] = f"/jobs/{job.id}/pdf"
+        elif job.status == FAILED:
+            error = job.error
+            status["fehler"] = f"{type(error).__name__}: {error}" if error else "abgebrochen"
+        return status
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path not in ("/projects", "/jobs"):
+            # Body ungelesen: Verbindung nicht weiterverwenden
+            self.close_connection = True
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unbekannter Pfad: {url.path}")
+            return
+
+        project = self._read_project()
+        if project is None:
+            return
+        if url.path == "/projects":
+            self._send(HTTPStatus.OK, project_json(project), "application/json; charset=utf-8")
+            return
+
+        variant = parse_qs(url.query).get("variant", ["voll"])[0]
+        try:
+            job_id = self.service.submit(project, variant)
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except QueueFull as e:
+            self._send_error(
+                HTTPStatus.TOO_MANY_REQUESTS, str(e), {"Retry-After": str(_RETRY_AFTER_S)},
+            )
+            return
+        except BrokenExecutor:
+            logger.exception("Worker-Pool nicht verfügbar")
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, "Worker-Pool nicht verfügbar")
+            return
+
+        job = self.service.jobs.get(job_id)
+        self._send_json(HTTPStatus.ACCEPTED, self._job_status(job), {"Location": f"/jobs/{job_id}"})
+
+    def do_GET(self) -> None:
+        match = _JOB_PATH.match(urlsplit(self.path).path)
+        job = self.service.jobs.get(match.group(1)) if match else None
+        if job is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "Unbekannter Job")
+            return
+
+        if not match.group(2):
+            self._send_json(HTTPStatus.OK, self._job_status(job))
+        elif job.status == DONE:
+            self._send(
+                HTTPStatus.OK,
+                job.result,
+                "application/pdf",
+                {"Content-Disposition": f'attachment; filename="{job.id}.pdf"'},
+            )
+        elif job.status == FAILED:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, self._job_status(job))
+        else:
+            self._send_json(
+                HTTPStatus.CONFLICT, self._job_status(job), {"Retry-After": "1"},
+            )
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    service: ReportService | None = None,
+    **service_kwargs,
+) -> ThreadingHTTPServer:
+    """Erzeugt den HTTP-Server; die Worker sind danach bereits gestartet.
+
+    Mit ``port=0`` wählt das Betriebssystem einen freien Port
+    (``server.server_address``), z.B. für lokale Tests.
+
+    Args:
+        host: Adresse, an die der Server bindet.
+        port: Port (0 = beliebiger freier Port).
+        service: Bestehender ``ReportService`` (sonst neu erzeugt).
+        **service_kwargs: Argumente für ``ReportService``.
+    """
+    service = service or ReportService(**service_kwargs)
+    service.start_workers()
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.service = service
+    return server
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.service",
+        description="HTTP-Dienst für die Erzeugung von Vorabschätzungen.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse (Standard: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port (Standard: 8080)")
+    parser.add_argument("--workers", type=int, default=2, help="Anzahl Worker-Prozesse")
+    parser.add_argument("--max-pending", type=int, default=8, help="Maximale Anzahl offener Jobs")
+    parser.add_argument("--backend", default=None, help="PDF-Backend (Standard: xhtml2pdf)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = make_server(
+        args.host,
+        args.port,
+        workers=args.workers,
+        max_pending=args.max_pending,
+        backend=args.backend,
+    )
+    host, port = server.server_address[:2]
+    print(f"Dienst läuft auf http://{host}:{port}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
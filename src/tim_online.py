@@ -2,64 +2,378 @@
 
 Erzeugt eine vorkonfigurierte Tim-Online URL für einen Projektstandort.
 Geocodiert die Adresse über Nominatim (OpenStreetMap) und transformiert
-die Koordinaten von WGS84 (EPSG:4326) nach ETRS89/UTM Zone 32N (EPSG:25832).
+die Koordinaten von WGS84 (EPSG:4326) nach ETRS89/UTM Zone 32N (EPSG:25832,
+siehe ``src.utm``).
+
+Geocoding-Ergebnisse werden in einer SQLite-Datenbank zwischengespeichert,
+damit wiederholte Aufrufe (z.B. bei jedem Streamlit-Rerun) ohne
+Netzwerkzugriff auskommen.
+
+geopy und numpy werden erst beim ersten Geocoding geladen, damit
+der Import des Moduls (z.B. für ``normalize_address``) billig bleibt.
 """
 
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
 from urllib.parse import quote
 
-from geopy.geocoders import Nominatim
-from pyproj import Transformer
+from src.instrumentation import instrumented
 
-# Transformer wird einmalig erstellt (Thread-safe, wiederverwendbar)
-_transformer = Transformer.from_crs("EPSG:4326", "EPSG:25832", always_xy=False)
+_USER_AGENT = "haltungsform-vorabschaetzung"
+_GEOCODE_TIMEOUT = 10
 
+_DEFAULT_CACHE_PATH = Path.home() / ".cache" / "haltungsform" / "geocode.sqlite3"
+# Gefundene Adressen ändern sich selten, Fehlschläge (Tippfehler, neue
+# Straßen in OSM) sollen dagegen bald erneut versucht werden.
+DEFAULT_TTL = 90 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 24 * 3600
 
-def build_tim_online_url(
+# Nutzungsrichtlinie von Nominatim: höchstens eine Anfrage pro Sekunde
+NOMINATIM_RATE = 1.0
+
+
+def normalize_address(strasse: str, hausnummer: str, plz: str, ort: str) -> tuple[str, str, str, str]:
+    """Normalisiert eine Adresse zum Cache-Schlüssel.
+
+    Groß-/Kleinschreibung und Leerraum werden vereinheitlicht, ``str.`` am
+    Ende des Straßennamens wird zu ``strasse`` ausgeschrieben.
+    """
+    def _norm(value) -> str:
+        return re.sub(r"\s+", " ", str(value or "")).strip().casefold()
+
+    strasse_norm = re.sub(r"str\.?$", "strasse", _norm(strasse))
+    hausnummer_norm = _norm(hausnummer).replace(" ", "")
+    return strasse_norm, hausnummer_norm, _norm(plz), _norm(ort)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Gecachtes Geocoding-Ergebnis; ``easting`` None bedeutet 'nicht gefunden'."""
+
+    easting: float | None
+    northing: float | None
+
+    @property
+    def found(self) -> bool:
+        return self.easting is not None
+
+
+class GeocodeCache:
+    """Persistenter Geocoding-Cache in SQLite.
+
+    Speichert die bereits nach UTM32 transformierten Koordinaten je
+    normalisierter Adresse. Negative Ergebnisse (Adresse nicht gefunden)
+    werden mit einer kürzeren Gültigkeitsdauer gespeichert.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = _DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+    ):
+        self.path = str(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS geocode (
+                    strasse TEXT NOT NULL,
+                    hausnummer TEXT NOT NULL,
+                    plz TEXT NOT NULL,
+                    ort TEXT NOT NULL,
+                    easting REAL,
+                    northing REAL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (strasse, hausnummer, plz, ort)
+                )
+                """
+            )
+
+    def get(self, key: tuple[str, str, str, str]) -> CacheEntry | None:
+        """Gibt den gültigen Eintrag für ``key`` zurück oder None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT easting, northing, created FROM geocode "
+                "WHERE strasse = ? AND hausnummer = ? AND plz = ? AND ort = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+
+        easting, northing, created = row
+        ttl = self.ttl if easting is not None else self.negative_ttl
+        if time.time() - created > ttl:
+            return None
+        return CacheEntry(easting, northing)
+
+    def put(self, key: tuple[str, str, str, str], coords: tuple[float, float] | None) -> None:
+        """Speichert UTM-Koordinaten oder (bei None) ein negatives Ergebnis."""
+        easting, northing = coords if coords is not None else (None, None)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode "
+                "(strasse, hausnummer, plz, ort, easting, northing, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, easting, northing, time.time()),
+            )
+
+    def purge_expired(self) -> int:
+        """Löscht abgelaufene Einträge und gibt deren Anzahl zurück."""
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM geocode WHERE "
+                "(easting IS NOT NULL AND created < ?) OR "
+                "(easting IS NULL AND created < ?)",
+                (now - self.ttl, now - self.negative_ttl),
+            )
+        return cur.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_geocoder = None
+_cache: GeocodeCache | None = None
+_state_lock = threading.Lock()
+
+
+class _TokenBucket:
+    """Thread-sicherer Token-Bucket zur Begrenzung der Anfragerate."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blockiert, bis ein Token verfügbar ist, und verbraucht es."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Prozessweit geteilt: alle Nominatim-Anfragen (Einzel- und Massenabfragen,
+# alle Threads) zusammen höchstens NOMINATIM_RATE pro Sekunde
+_nominatim_bucket = _TokenBucket(NOMINATIM_RATE)
+
+
+class _RateLimitedGeocoder:
+    """Wartet vor jeder Anfrage an ``geocoder`` auf ein Token aus ``bucket``."""
+
+    def __init__(self, geocoder, bucket: _TokenBucket):
+        self.geocoder = geocoder
+        self.bucket = bucket
+
+    def geocode(self, query, exactly_one: bool = True, timeout=None):
+        self.bucket.acquire()
+        return self.geocoder.geocode(query=query, exactly_one=exactly_one, timeout=timeout)
+
+
+def _nominatim():
+    from geopy.geocoders import Nominatim
+
+    return _RateLimitedGeocoder(Nominatim(user_agent=_USER_AGENT), _nominatim_bucket)
+
+
+def _get_geocoder():
+    """Gibt den prozessweiten Geocoder zurück (Standard: Nominatim)."""
+    global _geocoder
+    with _state_lock:
+        if _geocoder is None:
+            _geocoder = _nominatim()
+        return _geocoder
+
+
+def set_geocoder(geocoder) -> None:
+    """Setzt den prozessweiten Geocoder.
+
+    Erwartet ein Objekt mit der geopy-Schnittstelle
+    ``geocode(query=..., exactly_one=True, timeout=...)``, dessen Ergebnis
+    ``latitude``/``longitude`` besitzt. None stellt Nominatim wieder her.
+    Nur der Standard-Nominatim wird gedrosselt; andere Netzwerkdienste
+    müssen ihre Anfragerate selbst begrenzen.
+    """
+    global _geocoder
+    with _state_lock:
+        _geocoder = geocoder
+
+
+class GeocoderChain:
+    """Fragt mehrere Geocoder der Reihe nach ab.
+
+    Das erste gefundene Ergebnis wird zurückgegeben. Fehler eines Geocoders
+    führen zum nächsten. Findet keiner die Adresse und ist dabei mindestens
+    einer gescheitert, wird der letzte Fehler weitergereicht: die Adresse
+    könnte beim gescheiterten Dienst existieren und darf daher nicht als
+    'nicht gefunden' gecacht werden.
+    """
+
+    def __init__(self, geocoders):
+        self.geocoders = list(geocoders)
+
+    def geocode(self, query, exactly_one: bool = True, timeout=None):
+        last_error = None
+        for geocoder in self.geocoders:
+            try:
+                location = geocoder.geocode(query=query, exactly_one=exactly_one, timeout=timeout)
+            except Exception as e:
+                last_error = e
+                continue
+            if location is not None:
+                return location
+        if last_error is not None:
+            raise last_error
+        return None
+
+
+def use_offline_gazetteer(path: Path | str, fallback: bool = True, **kwargs):
+    """Schaltet den Offline-Geocoder aus ``src.gazetteer`` prozessweit ein.
+
+    Args:
+        path: Adressliste (CSV oder Parquet), siehe ``OfflineGeocoder.from_file``.
+        fallback: Bei True wird Nominatim für nicht gefundene Adressen
+            nachgeschaltet, bei False wird ausschließlich offline geocodiert.
+        **kwargs: Weitere Argumente für ``OfflineGeocoder.from_file``.
+
+    Returns:
+        Der geladene OfflineGeocoder.
+    """
+    from src.gazetteer import OfflineGeocoder
+
+    offline = OfflineGeocoder.from_file(path, **kwargs)
+    if fallback:
+        set_geocoder(GeocoderChain([offline, _nominatim()]))
+    else:
+        set_geocoder(offline)
+    return offline
+
+
+def _get_cache() -> GeocodeCache:
+    """Gibt den prozessweiten Geocoding-Cache zurück."""
+    global _cache
+    with _state_lock:
+        if _cache is None:
+            try:
+                _cache = GeocodeCache()
+            except (OSError, sqlite3.Error):
+                # Kein beschreibbares Cache-Verzeichnis: nur im Speicher cachen
+                _cache = GeocodeCache(":memory:")
+        return _cache
+
+
+def configure_geocode_cache(
+    path: Path | str = _DEFAULT_CACHE_PATH,
+    ttl: float = DEFAULT_TTL,
+    negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+) -> GeocodeCache:
+    """Ersetzt den prozessweiten Geocoding-Cache durch einen neu konfigurierten."""
+    global _cache
+    cache = GeocodeCache(path, ttl=ttl, negative_ttl=negative_ttl)
+    with _state_lock:
+        _cache = cache
+    return cache
+
+
+def _geocode_query(strasse: str, hausnummer: str, plz: str, ort: str) -> dict:
+    return {
+        "street": f"{hausnummer} {strasse}".strip(),
+        "postalcode": plz,
+        "city": ort,
+        "country": "Germany",
+    }
+
+
+@instrumented()
+def geocode_utm(
     strasse: str,
     hausnummer: str,
     plz: str,
     ort: str,
-    scale: int = 2047,
-) -> str | None:
-    """Erzeugt eine Tim-Online NRW URL für die gegebene Adresse.
+    geocoder=None,
+    cache: GeocodeCache | None = None,
+) -> tuple[float, float] | None:
+    """Ermittelt die UTM32-Koordinaten (Rechtswert, Hochwert) einer Adresse.
+
+    Zuerst wird der Cache befragt; nur bei einem Cache-Miss wird geocodiert.
+    Netzwerk- und Dienstfehler werden nicht gecacht, damit der nächste Aufruf
+    es erneut versucht.
 
     Args:
         strasse: Straßenname
         hausnummer: Hausnummer
         plz: Postleitzahl
         ort: Ortsname
-        scale: Kartenmaßstab (Standard: 2047)
+        geocoder: Geocoder mit geopy-Schnittstelle (Standard: prozessweit).
+        cache: Geocoding-Cache (Standard: prozessweit).
 
     Returns:
-        Die Tim-Online URL oder None falls Geocoding fehlschlägt.
+        (easting, northing) oder None falls die Adresse nicht gefunden wurde.
     """
     if not strasse or not ort:
         return None
 
-    geolocator = Nominatim(user_agent="haltungsform-vorabschaetzung")
+    cache = cache if cache is not None else _get_cache()
+    key = normalize_address(strasse, hausnummer, plz, ort)
+    entry = cache.get(key)
+    if entry is not None:
+        return (entry.easting, entry.northing) if entry.found else None
 
+    geocoder = geocoder if geocoder is not None else _get_geocoder()
     try:
-        location = geolocator.geocode(
-            query={
-                "street": f"{hausnummer} {strasse}".strip(),
-                "postalcode": plz,
-                "city": ort,
-                "country": "Germany",
-            },
+        location = geocoder.geocode(
+            query=_geocode_query(strasse, hausnummer, plz, ort),
             exactly_one=True,
-            timeout=10,
+            timeout=_GEOCODE_TIMEOUT,
         )
     except Exception:
         return None
 
     if location is None:
+        cache.put(key, None)
         return None
 
-    # WGS84 (lat, lon) -> ETRS89/UTM32N (easting, northing)
-    easting, northing = _transformer.transform(location.latitude, location.longitude)
-    easting = int(round(easting))
-    northing = int(round(northing))
+    from src.utm import wgs84_to_utm32
 
+    easting, northing = wgs84_to_utm32(location.latitude, location.longitude)
+    cache.put(key, (easting, northing))
+    return easting, northing
+
+
+def _format_url(
+    strasse: str,
+    hausnummer: str,
+    plz: str,
+    ort: str,
+    easting: float,
+    northing: float,
+    scale: int,
+) -> str:
     # Adresstext für Tim-Online
     address_text = f"{strasse} {hausnummer}\n{plz} {ort}"
     encoded_text = quote(address_text, safe="")
@@ -69,6 +383,175 @@ def build_tim_online_url(
         f"?bg=basemapDE"
         f"&text={encoded_text}"
         f"&scale={scale}"
-        f"&center={easting},{northing}"
+        f"&center={int(round(easting))},{int(round(northing))}"
         f"&icon=true"
     )
+
+
+@instrumented()
+def build_tim_online_url(
+    strasse: str,
+    hausnummer: str,
+    plz: str,
+    ort: str,
+    scale: int = 2047,
+    geocoder=None,
+    cache: GeocodeCache | None = None,
+) -> str | None:
+    """Erzeugt eine Tim-Online NRW URL für die gegebene Adresse.
+
+    Args:
+        strasse: Straßenname
+        hausnummer: Hausnummer
+        plz: Postleitzahl
+        ort: Ortsname
+        scale: Kartenmaßstab (Standard: 2047)
+        geocoder: Geocoder mit geopy-Schnittstelle (Standard: prozessweit).
+        cache: Geocoding-Cache (Standard: prozessweit).
+
+    Returns:
+        Die Tim-Online URL oder None falls Geocoding fehlschlägt.
+    """
+    coords = geocode_utm(strasse, hausnummer, plz, ort, geocoder=geocoder, cache=cache)
+    if coords is None:
+        return None
+
+    easting, northing = coords
+    return _format_url(strasse, hausnummer, plz, ort, easting, northing, scale)
+
+
+@dataclass(frozen=True)
+class BulkGeocodeResult:
+    """Ergebnis von ``build_tim_online_urls`` für eine Eingabeadresse.
+
+    ``status`` ist einer von: ``"cached"``, ``"geocoded"``, ``"not_found"``,
+    ``"invalid"`` (Straße oder Ort fehlt) oder ``"error"`` (Dienstfehler).
+    """
+
+    strasse: str
+    hausnummer: str
+    plz: str
+    ort: str
+    status: str
+    url: str | None = None
+    easting: float | None = None
+    northing: float | None = None
+    error: str | None = None
+
+
+def _address_fields(address) -> tuple[str, str, str, str]:
+    if isinstance(address, Mapping):
+        return tuple(
+            str(address.get(field) or "")
+            for field in ("strasse", "hausnummer", "plz", "ort")
+        )
+    strasse, hausnummer, plz, ort = address
+    return str(strasse or ""), str(hausnummer or ""), str(plz or ""), str(ort or "")
+
+
+@instrumented()
+def build_tim_online_urls(
+    addresses: Iterable,
+    scale: int = 2047,
+    max_workers: int = 4,
+    geocoder=None,
+    cache: GeocodeCache | None = None,
+) -> list[BulkGeocodeResult]:
+    """Erzeugt Tim-Online URLs für viele Adressen auf einmal.
+
+    Gleiche Adressen (nach ``normalize_address``) werden nur einmal
+    geocodiert. Cache-Treffer kommen ohne Netzwerkzugriff aus; die übrigen
+    Adressen werden von ``max_workers`` Threads geocodiert; Anfragen an
+    Nominatim teilen sich dabei die prozessweite Begrenzung auf
+    ``NOMINATIM_RATE`` pro Sekunde mit allen anderen Aufrufern. Alle neu
+    geocodierten Punkte werden in einem einzigen, vektorisierten
+    Aufruf von ``wgs84_to_utm32`` nach UTM32 umgerechnet.
+
+    Args:
+        addresses: Tupel (strasse, hausnummer, plz, ort) oder Mappings mit
+            diesen Schlüsseln.
+        scale: Kartenmaßstab (Standard: 2047)
+        max_workers: Anzahl paralleler Geocoding-Threads.
+        geocoder: Geocoder mit geopy-Schnittstelle (Standard: prozessweit).
+        cache: Geocoding-Cache (Standard: prozessweit).
+
+    Returns:
+        Ein Ergebnis je Eingabeadresse, in Eingabereihenfolge.
+    """
+    cache = cache if cache is not None else _get_cache()
+    geocoder = geocoder if geocoder is not None else _get_geocoder()
+
+    fields = [_address_fields(a) for a in addresses]
+    keys = [normalize_address(*f) for f in fields]
+
+    # Status und Koordinaten je eindeutigem Schlüssel
+    resolved: dict[tuple, tuple[str, tuple[float, float] | None, str | None]] = {}
+    misses: dict[tuple, tuple[str, str, str, str]] = {}
+    for f, key in zip(fields, keys):
+        if key in resolved or key in misses:
+            continue
+        strasse, _, _, ort = f
+        if not strasse or not ort:
+            resolved[key] = ("invalid", None, None)
+            continue
+        entry = cache.get(key)
+        if entry is None:
+            misses[key] = f
+        elif entry.found:
+            resolved[key] = ("cached", (entry.easting, entry.northing), None)
+        else:
+            resolved[key] = ("not_found", None, None)
+
+    if misses:
+        def _lookup(f):
+            try:
+                location = geocoder.geocode(
+                    query=_geocode_query(*f),
+                    exactly_one=True,
+                    timeout=_GEOCODE_TIMEOUT,
+                )
+            except Exception as e:
+                return "error", None, f"{type(e).__name__}: {e}"
+            if location is None:
+                return "not_found", None, None
+            return "geocoded", (location.latitude, location.longitude), None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses)))) as pool:
+            looked_up = dict(zip(misses, pool.map(_lookup, misses.values())))
+
+        found = [key for key, (status, _, _) in looked_up.items() if status == "geocoded"]
+        if found:
+            import numpy as np
+
+            from src.utm import wgs84_to_utm32
+
+            lats = np.fromiter((looked_up[k][1][0] for k in found), dtype=float, count=len(found))
+            lons = np.fromiter((looked_up[k][1][1] for k in found), dtype=float, count=len(found))
+            eastings, northings = wgs84_to_utm32(lats, lons)
+            for key, easting, northing in zip(found, eastings.tolist(), northings.tolist()):
+                looked_up[key] = ("geocoded", (easting, northing), None)
+
+        for key, (status, coords, error) in looked_up.items():
+            if status == "geocoded":
+                cache.put(key, coords)
+            elif status == "not_found":
+                cache.put(key, None)
+            resolved[key] = (status, coords, error)
+
+    results = []
+    for f, key in zip(fields, keys):
+        status, coords, error = resolved[key]
+        url = None
+        easting = northing = None
+        if coords is not None:
+            easting, northing = coords
+            url = _format_url(*f, easting, northing, scale)
+        results.append(BulkGeocodeResult(
+            *f,
+            status=status,
+            url=url,
+            easting=easting,
+            northing=northing,
+            error=error,
+        ))
+    return results
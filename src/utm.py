@@ -0,0 +1,84 @@
+"""Umrechnung WGS84 (EPSG:4326) -> ETRS89/UTM Zone 32N (EPSG:25832) ohne pyproj.
+
+Transversale Mercator-Projektion nach der Krüger-Reihe bis zur 6. Ordnung
+in der dritten Abplattung n (Karney 2011, "Transverse Mercator with an
+accuracy of a few nanometers"). Innerhalb der Zone und deutlich darüber
+hinaus ist der Fehler der Reihe kleiner als 1 µm.
+
+WGS84 und ETRS89 werden wie bei pyproj für EPSG:4326 -> EPSG:25832 als
+identisch behandelt (Unterschied im Dezimeterbereich, für die Kartenmitte
+in Tim-Online ohne Belang).
+
+Die Funktionen sind zustandslos und damit ohne Sperren aus beliebig vielen
+Threads nutzbar. Arrays werden vektorisiert umgerechnet.
+"""
+
+import numpy as np
+
+# GRS80-Ellipsoid
+_A = 6378137.0
+_F = 1 / 298.257222101
+
+# UTM Zone 32N
+_K0 = 0.9996
+_LON0 = np.radians(9.0)
+_FALSE_EASTING = 500000.0
+
+_N = _F / (2 - _F)
+_E = np.sqrt(_F * (2 - _F))
+# Rektifizierender Radius, mit k0 skaliert
+_K0_A = _K0 * _A / (1 + _N) * (1 + _N**2 / 4 + _N**4 / 64 + _N**6 / 256)
+
+# Koeffizienten alpha_1 .. alpha_6 der Krüger-Reihe
+_ALPHA = (
+    _N / 2 - 2 / 3 * _N**2 + 5 / 16 * _N**3 + 41 / 180 * _N**4
+    - 127 / 288 * _N**5 + 7891 / 37800 * _N**6,
+    13 / 48 * _N**2 - 3 / 5 * _N**3 + 557 / 1440 * _N**4
+    + 281 / 630 * _N**5 - 1983433 / 1935360 * _N**6,
+    61 / 240 * _N**3 - 103 / 140 * _N**4 + 15061 / 26880 * _N**5
+    + 167603 / 181440 * _N**6,
+    49561 / 161280 * _N**4 - 179 / 168 * _N**5 + 6601661 / 7257600 * _N**6,
+    34729 / 80640 * _N**5 - 3418889 / 1995840 * _N**6,
+    212378941 / 319334400 * _N**6,
+)
+
+
+def wgs84_to_utm32(lat, lon):
+    """Rechnet geographische Koordinaten nach ETRS89/UTM32N um.
+
+    Args:
+        lat: Breite in Grad (Skalar oder Array).
+        lon: Länge in Grad (Skalar oder Array, gleiche Form wie ``lat``).
+
+    Returns:
+        (easting, northing) in Metern; Skalare bei skalaren Eingaben,
+        sonst float64-Arrays.
+    """
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lam = np.radians(np.asarray(lon, dtype=np.float64)) - _LON0
+
+    # Konforme Breite: tau' = tan(chi)
+    sin_phi = np.sin(phi)
+    tau_c = np.sinh(np.arctanh(sin_phi) - _E * np.arctanh(_E * sin_phi))
+    cos_lam = np.cos(lam)
+
+    # Sphärische transversale Mercator-Koordinaten zeta' = xi' + i eta'
+    xi = np.arctan2(tau_c, cos_lam)
+    eta = np.arcsinh(np.sin(lam) / np.hypot(tau_c, cos_lam))
+    zeta = xi + 1j * eta
+
+    # zeta = zeta' + sum_j alpha_j sin(2 j zeta'), Clenshaw-Summation:
+    # eine komplexe sin/cos-Auswertung statt sechs
+    two_zeta = 2 * zeta
+    x = 2 * np.cos(two_zeta)
+    b1 = np.zeros_like(zeta)
+    b2 = np.zeros_like(zeta)
+    for alpha in reversed(_ALPHA):
+        b1, b2 = alpha + x * b1 - b2, b1
+    zeta = zeta + b1 * np.sin(two_zeta)
+
+    easting = _FALSE_EASTING + _K0_A * zeta.imag
+    northing = _K0_A * zeta.real
+    if easting.ndim == 0:
+        return float(easting), float(northing)
+    return easting, northing
@@ -1,91 +1,331 @@
 """Parser für die profarm XLSX-Datei (Blatt 'Daten')."""
 
 import io
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 
-import openpyxl
-
+from src.instrumentation import instrumented
 from src.models import IstZustandRow, PlanZustandRow
 
 
-def parse_xlsx(file_bytes: bytes) -> dict:
+# Standard-Zellen der Adressdaten (Spalte B, Zeilen 1-6)
+DEFAULT_HEADER_CELLS = {
+    "strasse": "B1",
+    "hausnummer": "B2",
+    "plz": "B3",
+    "ort": "B4",
+    "projektnummer": "B5",
+    "email": "B6",
+}
+
+# Standard-Spalten der Betriebseinheiten
+DEFAULT_COLUMNS = {
+    "be_nr": "A",
+    "tierart_ist": "B",
+    "tierplaetze_ist": "C",
+    "ausfuehrung_ist": "D",
+    "kamine": "E",
+    "sdt": "F",
+    "tierart_ziel": "G",
+    "tierplaetze_ziel": "H",
+    "ausfuehrung_ziel": "I",
+}
+
+# Beschriftungen, an denen ein Blatt im profarm-Layout erkannt wird
+DEFAULT_SIGNATURE = {
+    "A1": "Straße",
+    "A8": "Betriebseinheit Nr.",
+}
+
+
+@dataclass(frozen=True)
+class XlsxLayout:
+    """Beschreibt, wo die Daten im profarm-Blatt stehen.
+
+    Attributes:
+        sheet_name: Name des Datenblatts (Fallback: erstes Blatt).
+        header_cells: Feldname -> Zelle der Adressdaten.
+        columns: Feldname -> Spalte der Betriebseinheiten.
+        start_row: Erste Zeile der Betriebseinheiten.
+        max_empty_rows: Nach so vielen aufeinanderfolgenden leeren Zeilen
+            endet die Tabelle, frühestens jedoch nach ``min_end_row``.
+        min_end_row: Bis zu dieser Zeile wird unabhängig von Leerzeilen
+            gelesen (festes Tabellenende älterer Vorlagen).
+        end_row: Optionale letzte Zeile (None = bis zum Tabellenende).
+        signature: Zelle -> erwartete Beschriftung; daran erkennt
+            ``parse_xlsx_multi`` Blätter im profarm-Layout.
+    """
+
+    sheet_name: str = "Daten"
+    header_cells: dict = field(default_factory=lambda: dict(DEFAULT_HEADER_CELLS))
+    columns: dict = field(default_factory=lambda: dict(DEFAULT_COLUMNS))
+    start_row: int = 9
+    max_empty_rows: int = 20
+    min_end_row: int = 50
+    end_row: int | None = None
+    signature: dict = field(default_factory=lambda: dict(DEFAULT_SIGNATURE))
+
+
+DEFAULT_LAYOUT = XlsxLayout()
+
+
+@instrumented()
+def parse_xlsx(file_bytes: bytes, read_only: bool = True, layout: XlsxLayout = DEFAULT_LAYOUT) -> dict:
     """Parse die profarm XLSX-Datei und extrahiere Betriebsdaten.
 
-    Erwartetes Format (Blatt 'Daten'):
+    Erwartetes Format (Blatt 'Daten', siehe ``DEFAULT_LAYOUT``):
     - B1: Straße, B2: Hausnummer, B3: PLZ, B4: Ort, B5: Projektnummer, B6: E-Mail
-    - Zeilen 9-50: Betriebseinheiten
+    - ab Zeile 9: Betriebseinheiten, mindestens bis Zeile 50 und danach bis
+      ``max_empty_rows`` leere Zeilen folgen
       - A: BE-Nr, B: Tierart (Ist), C: Tierplätze (Ist), D: Ausführung (Ist),
         E: Kamine, F: S.d.T., G: Tierart (Ziel), H: Tierplätze (Ziel), I: Ausführung (Ziel)
 
+    Args:
+        file_bytes: Inhalt der XLSX-Datei.
+        read_only: Arbeitsmappe im Streaming-Modus von openpyxl öffnen. Es wird
+            nur das benötigte Blatt gelesen, ohne Objektmodell und Formatvorlagen.
+            False lädt die vollständige Arbeitsmappe (langsamer, mehr Speicher).
+        layout: Position von Adressdaten und Betriebseinheiten.
+
     Returns:
         dict mit Schlüsseln: strasse, hausnummer, plz, ort, projektnummer,
         email, ist_zustand, plan_zustand
     """
-    wb = openpyxl.load_workbook(io.BytesIO(file_bytes), data_only=True)
-
-    # Blatt "Daten" suchen
-    if "Daten" in wb.sheetnames:
-        ws = wb["Daten"]
-    else:
-        # Fallback: erstes Blatt verwenden
-        ws = wb.worksheets[0]
-
-    # Adressdaten auslesen
-    result = {
-        "strasse": _cell_str(ws, "B1"),
-        "hausnummer": _cell_str(ws, "B2"),
-        "plz": _cell_str(ws, "B3"),
-        "ort": _cell_str(ws, "B4"),
-        "projektnummer": _cell_str(ws, "B5"),
-        "email": _cell_str(ws, "B6"),
-    }
+    wb = _open_workbook(file_bytes, read_only)
+    try:
+        return _parse_sheet(_select_sheet(wb, layout), layout)
+    finally:
+        # Im Streaming-Modus hält openpyxl das ZIP-Archiv offen
+        wb.close()
+
+
+@instrumented()
+def parse_xlsx_multi(
+    file_bytes: bytes,
+    layout: XlsxLayout = DEFAULT_LAYOUT,
+    max_workers: int | None = None,
+    use_processes: bool = False,
+) -> dict[str, dict]:
+    """Parse eine XLSX-Datei mit einem profarm-Blatt je Betrieb.
+
+    Alle Blätter, deren Beschriftungen ``layout.signature`` entsprechen,
+    werden parallel gelesen. Standardmäßig teilen sich Threads das einmal
+    geöffnete, schreibgeschützte Archiv. Mit ``use_processes=True`` öffnet
+    jeder Prozess die Datei selbst; das lohnt sich bei vielen großen Blättern,
+    weil das Parsen dann nicht durch den GIL begrenzt ist.
+
+    Args:
+        file_bytes: Inhalt der XLSX-Datei.
+        layout: Position von Adressdaten und Betriebseinheiten je Blatt.
+        max_workers: Anzahl Threads/Prozesse (Standard: Executor-Standard).
+        use_processes: ProcessPoolExecutor statt Threads verwenden.
+
+    Returns:
+        dict Projektnummer -> Ergebnis wie ``parse_xlsx``, ergänzt um den
+        Schlüssel ``blatt``. Blätter ohne Projektnummer werden unter ihrem
+        Blattnamen abgelegt, doppelte Projektnummern um den Blattnamen ergänzt.
+    """
+    wb = _open_workbook(file_bytes, read_only=True)
+    try:
+        sheet_names = [ws.title for ws in wb.worksheets if _matches_layout(ws, layout)]
+        if not sheet_names:
+            return {}
+
+        if use_processes:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                parsed = list(pool.map(
+                    _parse_sheet_from_bytes,
+                    [file_bytes] * len(sheet_names),
+                    sheet_names,
+                    [layout] * len(sheet_names),
+                ))
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                parsed = list(pool.map(lambda name: _parse_sheet(wb[name], layout), sheet_names))
+    finally:
+        wb.close()
+
+    projects: dict[str, dict] = {}
+    for sheet_name, result in zip(sheet_names, parsed):
+        result["blatt"] = sheet_name
+        key = result["projektnummer"] or sheet_name
+        if key in projects:
+            key = f"{key} ({sheet_name})"
+        projects[key] = result
+    return projects
+
+
+def iter_betriebseinheiten(
+    file_bytes: bytes,
+    layout: XlsxLayout = DEFAULT_LAYOUT,
+) -> Iterator[tuple[IstZustandRow, PlanZustandRow]]:
+    """Liefert die Betriebseinheiten einer XLSX-Datei als Generator.
+
+    Die Arbeitsmappe wird im Streaming-Modus gelesen; es liegt immer nur eine
+    Zeile im Speicher, sodass auch Tabellen mit tausenden Zeilen mit
+    konstantem Speicherbedarf verarbeitet werden. Das Archiv wird geschlossen,
+    sobald der Generator erschöpft oder geschlossen ist.
+
+    Yields:
+        Tupel (IstZustandRow, PlanZustandRow) je Betriebseinheit.
+    """
+    wb = _open_workbook(file_bytes, read_only=True)
+    try:
+        yield from _iter_rows(_select_sheet(wb, layout), layout)
+    finally:
+        wb.close()
+
+
+def _parse_sheet(ws, layout: XlsxLayout) -> dict:
+    """Liest Adressdaten und Betriebseinheiten eines Blatts."""
+    result = _read_header(ws, layout)
 
-    # Betriebseinheiten auslesen (Zeilen 9-50)
     ist_zustand = []
     plan_zustand = []
+    for ist, plan in _iter_rows(ws, layout):
+        ist_zustand.append(ist)
+        plan_zustand.append(plan)
 
-    for row_num in range(9, 51):
-        be_nr = ws.cell(row=row_num, column=1).value  # A
-        tierart_ist = ws.cell(row=row_num, column=2).value  # B
+    result["ist_zustand"] = ist_zustand
+    result["plan_zustand"] = plan_zustand
+    return result
+
+
+def _parse_sheet_from_bytes(file_bytes: bytes, sheet_name: str, layout: XlsxLayout) -> dict:
+    """Prozess-Worker für ``parse_xlsx_multi``: öffnet die Datei selbst."""
+    wb = _open_workbook(file_bytes, read_only=True)
+    try:
+        return _parse_sheet(wb[sheet_name], layout)
+    finally:
+        wb.close()
+
+
+def _matches_layout(ws, layout: XlsxLayout) -> bool:
+    """Prüft, ob die Signatur-Zellen des Blatts die erwarteten Beschriftungen tragen."""
+    found = _read_cells(ws, layout.signature)
+    return all(
+        _value_str(found[ref]).casefold() == str(expected).strip().casefold()
+        for ref, expected in layout.signature.items()
+    )
+
+
+def _open_workbook(file_bytes: bytes, read_only: bool):
+    import openpyxl
+
+    return openpyxl.load_workbook(io.BytesIO(file_bytes), read_only=read_only, data_only=True)
+
+
+def _select_sheet(wb, layout: XlsxLayout):
+    """Gibt das Datenblatt zurück; Fallback: erstes Blatt."""
+    if layout.sheet_name in wb.sheetnames:
+        return wb[layout.sheet_name]
+    return wb.worksheets[0]
+
+
+def _read_header(ws, layout: XlsxLayout) -> dict:
+    """Liest die Adressdaten des Blatts."""
+    cells = _read_cells(ws, layout.header_cells.values())
+    return {name: _value_str(cells[ref]) for name, ref in layout.header_cells.items()}
+
+
+def _read_cells(ws, refs) -> dict:
+    """Liest einzelne Zellen mit einem einzigen Durchlauf über ihren Bereich.
+
+    Returns:
+        dict Zellbezug -> Zellwert
+    """
+    from openpyxl.utils.cell import coordinate_to_tuple
+
+    positions = {ref: coordinate_to_tuple(ref) for ref in refs}  # (Zeile, Spalte)
+    if not positions:
+        return {}
+
+    min_row = min(r for r, _ in positions.values())
+    max_row = max(r for r, _ in positions.values())
+    min_col = min(c for _, c in positions.values())
+    max_col = max(c for _, c in positions.values())
+
+    values = {}
+    rows = ws.iter_rows(
+        min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True,
+    )
+    for row_num, row in enumerate(rows, start=min_row):
+        for col_num, val in enumerate(row, start=min_col):
+            values[(row_num, col_num)] = val
+
+    return {ref: values.get(pos) for ref, pos in positions.items()}
+
+
+def _iter_rows(ws, layout: XlsxLayout) -> Iterator[tuple[IstZustandRow, PlanZustandRow]]:
+    """Liest die Betriebseinheiten zeilenweise bis zum Tabellenende."""
+    from openpyxl.utils.cell import column_index_from_string
+
+    indices = {
+        name: column_index_from_string(col)
+        for name, col in {**DEFAULT_COLUMNS, **layout.columns}.items()
+    }
+    min_col = min(indices.values())
+    max_col = max(indices.values())
+    offsets = {name: idx - min_col for name, idx in indices.items()}
+    width = max_col - min_col + 1
+
+    empty_run = 0
+    rows = ws.iter_rows(
+        min_row=layout.start_row,
+        max_row=layout.end_row,
+        min_col=min_col,
+        max_col=max_col,
+        values_only=True,
+    )
+    for row, values in enumerate(rows, start=layout.start_row):
+        # Kurze Zeilen (Streaming-Modus) auffüllen
+        if len(values) < width:
+            values = tuple(values) + (None,) * (width - len(values))
+        cell = {name: values[offset] for name, offset in offsets.items()}
 
         # Zeile überspringen wenn BE-Nr und Tierart leer
-        if be_nr is None and tierart_ist is None:
+        if cell["be_nr"] is None and cell["tierart_ist"] is None:
+            empty_run += 1
+            if empty_run >= layout.max_empty_rows and row >= layout.min_end_row:
+                return
             continue
+        empty_run = 0
 
-        be_nr_str = str(be_nr) if be_nr is not None else ""
-        tierplaetze_ist = ws.cell(row=row_num, column=3).value  # C
-        ausfuehrung_ist = ws.cell(row=row_num, column=4).value  # D
-        kamine = ws.cell(row=row_num, column=5).value  # E
-        sdt = ws.cell(row=row_num, column=6).value  # F
-
-        tierart_ziel = ws.cell(row=row_num, column=7).value  # G
-        tierplaetze_ziel = ws.cell(row=row_num, column=8).value  # H
-        ausfuehrung_ziel = ws.cell(row=row_num, column=9).value  # I
-
-        ist_zustand.append(IstZustandRow(
-            be_nr=be_nr_str,
-            tierart=str(tierart_ist) if tierart_ist else "Mastschweine",
-            tierplaetze=int(tierplaetze_ist) if tierplaetze_ist else 0,
-            ausfuehrung=_normalize_ausfuehrung(ausfuehrung_ist),
-            kamine=str(kamine) if kamine else "Nein",
-            stand_der_technik=str(sdt) if sdt else "Nein",
-        ))
-
-        plan_zustand.append(PlanZustandRow(
-            be_nr=be_nr_str,
-            tierart=str(tierart_ziel) if tierart_ziel else "Mastschweine",
-            tierplaetze=int(tierplaetze_ziel) if tierplaetze_ziel else 0,
-            ausfuehrung=_normalize_ausfuehrung(ausfuehrung_ziel),
-        ))
+        yield _build_rows(cell)
 
-    result["ist_zustand"] = ist_zustand
-    result["plan_zustand"] = plan_zustand
 
-    return result
+def _build_rows(cell: dict) -> tuple[IstZustandRow, PlanZustandRow]:
+    """Erzeugt Ist- und Plan-Zeile aus den Zellwerten einer Tabellenzeile."""
+    be_nr = cell["be_nr"]
+    be_nr_str = str(be_nr) if be_nr is not None else ""
+
+    tierart_ist = cell["tierart_ist"]
+    tierplaetze_ist = cell["tierplaetze_ist"]
+    kamine = cell["kamine"]
+    sdt = cell["sdt"]
+    tierart_ziel = cell["tierart_ziel"]
+    tierplaetze_ziel = cell["tierplaetze_ziel"]
+
+    ist = IstZustandRow(
+        be_nr=be_nr_str,
+        tierart=str(tierart_ist) if tierart_ist else "Mastschweine",
+        tierplaetze=int(tierplaetze_ist) if tierplaetze_ist else 0,
+        ausfuehrung=_normalize_ausfuehrung(cell["ausfuehrung_ist"]),
+        kamine=str(kamine) if kamine else "Nein",
+        stand_der_technik=str(sdt) if sdt else "Nein",
+    )
+    plan = PlanZustandRow(
+        be_nr=be_nr_str,
+        tierart=str(tierart_ziel) if tierart_ziel else "Mastschweine",
+        tierplaetze=int(tierplaetze_ziel) if tierplaetze_ziel else 0,
+        ausfuehrung=_normalize_ausfuehrung(cell["ausfuehrung_ziel"]),
+    )
+    return ist, plan
 
 
-def _cell_str(ws, cell_ref: str) -> str:
-    """Liest einen Zellwert als String."""
-    val = ws[cell_ref].value
+def _value_str(val) -> str:
+    """Wandelt einen Zellwert in einen String um."""
     if val is None:
         return ""
     return str(val).strip()
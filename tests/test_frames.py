@@ -0,0 +1,88 @@
+"""Tests für die Umwandlung zwischen Tabellen und Zeilenmodellen (``src.frames``)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.frames import frame_to_ist_rows, frame_to_plan_rows, ist_rows_to_frame
+from src.models import IstZustandRow
+
+
+def _plan_frame(tierplaetze) -> pd.DataFrame:
+    return pd.DataFrame({
+        "BE-Nr.": [str(i + 1) for i in range(len(tierplaetze))],
+        "Tierart": "Mastschweine",
+        "Tierplätze": pd.Series(tierplaetze, dtype=object),
+        "Ausführung": "1 - Zwangsbelüfteter Stall",
+    })
+
+
+def test_roundtrip():
+    rows = [
+        IstZustandRow(be_nr="1", tierart="Sauen", tierplaetze=120, ausfuehrung="1 - Zwangsbelüfteter Stall",
+                      kamine="Ja", stand_der_technik="Nein"),
+        IstZustandRow(be_nr="2", tierart="Mastschweine", tierplaetze=0, ausfuehrung="1 - Zwangsbelüfteter Stall",
+                      kamine="Nein", stand_der_technik="Ja"),
+    ]
+
+    converted, errors = frame_to_ist_rows(ist_rows_to_frame(rows))
+
+    assert errors == []
+    assert [r.model_dump() for r in converted] == [r.model_dump() for r in rows]
+
+
+def test_valid_numbers_are_converted():
+    rows, errors = frame_to_plan_rows(_plan_frame([700, 800.0, "900", None]))
+
+    assert errors == []
+    assert [r.tierplaetze for r in rows] == [700, 800, 900, 0]
+    assert all(type(r.tierplaetze) is int for r in rows)
+
+
+@pytest.mark.parametrize(
+    ("value", "message"),
+    [
+        ("viele", "keine Zahl"),
+        (12.5, "keine ganze Zahl"),
+        (-3, "negativ"),
+        (-np.inf, "negativ"),
+        (np.inf, "zu groß"),
+        (1e30, "zu groß"),
+        (2.0**63, "zu groß"),
+    ],
+)
+def test_invalid_cell_gets_default_and_error(value, message):
+    rows, errors = frame_to_plan_rows(_plan_frame([10, value]))
+
+    assert [r.tierplaetze for r in rows] == [10, 0]
+    assert len(errors) == 1
+    error = errors[0]
+    assert (error.row, error.column, error.message) == (2, "Tierplätze", message)
+    assert str(error).startswith("Zeile 2, Tierplätze:")
+
+
+def test_largest_int64_compatible_value_is_kept():
+    value = 2**63 - 1024  # größte als float darstellbare Zahl unter 2**63
+
+    rows, errors = frame_to_plan_rows(_plan_frame([float(value)]))
+
+    assert errors == []
+    assert rows[0].tierplaetze == value
+
+
+def test_error_rows_refer_to_unfiltered_table():
+    df = _plan_frame([10, None, "x"])
+    df.loc[1, :] = None  # leere Zeile aus dem Editor
+
+    rows, errors = frame_to_plan_rows(df)
+
+    assert len(rows) == 2
+    assert [(e.row, e.message) for e in errors] == [(3, "keine Zahl")]
+
+
+def test_missing_columns_get_defaults():
+    rows, errors = frame_to_ist_rows(pd.DataFrame({"BE-Nr.": [1]}))
+
+    assert errors == []
+    assert rows[0].be_nr == "1"
+    assert (rows[0].tierart, rows[0].tierplaetze, rows[0].kamine) == ("Mastschweine", 0, "Nein")
@@ -0,0 +1,23 @@
+"""Importzeiten der Module unter ``src`` (Harness ``benchmarks.importtime``)."""
+
+import pytest
+
+from benchmarks.importtime import DEFAULT_BUDGET_MS, LAZY_DEPENDENCIES, main, measure, src_modules
+
+# Die src-Module werden auch ohne Oberfläche genutzt (Dienst, Batch)
+FORBIDDEN = (*LAZY_DEPENDENCIES, "streamlit")
+
+
+@pytest.mark.parametrize("module", src_modules())
+def test_module_import(module):
+    times = measure(module)
+
+    loaded = sorted({name.split(".")[0] for name in times} & set(FORBIDDEN))
+    assert loaded == [], f"{module} lädt beim Import: {', '.join(loaded)}"
+    assert times[module] / 1000 <= DEFAULT_BUDGET_MS
+
+
+def test_harness_enforces_budget(capsys):
+    assert main(["src.static_texts", "--repeat", "1"]) == 0
+    assert main(["src.utm", "--repeat", "1", "--budget-ms", "0.001"]) == 1
+    assert "Budget" in capsys.readouterr().err
@@ -0,0 +1,187 @@
+"""Tests für die Laufzeit- und Speichermessung (``src.instrumentation``)."""
+
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from src import instrumentation
+from src.instrumentation import (
+    JsonLinesSink,
+    PrometheusTextfileSink,
+    instrumented,
+    last_run,
+    recent_runs,
+    stage,
+)
+
+
+@pytest.fixture
+def collect():
+    """Registriert einen Sink, der alle abgeschlossenen Läufe sammelt."""
+    runs = []
+    instrumentation.add_sink(runs.append)
+    yield runs
+    instrumentation.remove_sink(runs.append)
+
+
+def _nested_run():
+    with stage("report"):
+        with stage("render_html"):
+            with stage("jinja"):
+                pass
+        with stage("write_pdf"):
+            pass
+
+
+def test_nested_stages_form_one_run(collect):
+    _nested_run()
+
+    assert len(collect) == 1
+    run = collect[0]
+    assert run.name == "report"
+    assert [(s.name, s.depth) for s in run.stages] == [
+        ("report", 0), ("render_html", 1), ("jinja", 2), ("write_pdf", 1),
+    ]
+    assert run.total == run.stages[0].wall >= run.stages[1].wall >= run.stages[2].wall
+    assert all(s.cpu >= 0 and s.peak_bytes is None and s.error is None for s in run.stages)
+    assert last_run() is run
+
+
+def test_failed_stage_records_error(collect):
+    with pytest.raises(KeyError):
+        with stage("report"):
+            with stage("render_html"):
+                raise KeyError("x")
+
+    assert [(s.name, s.error) for s in collect[0].stages] == [
+        ("report", "KeyError"), ("render_html", "KeyError"),
+    ]
+    # Der nächste Lauf beginnt wieder bei Tiefe 0
+    with stage("danach"):
+        pass
+    assert [(s.name, s.depth) for s in last_run().stages] == [("danach", 0)]
+
+
+def test_instrumented_decorator(collect):
+    @instrumented()
+    def parse():
+        return 1
+
+    @instrumented("eigener_name")
+    def build():
+        return parse() + 1
+
+    assert build() == 2
+    assert build.__name__ == "build"
+    assert [(s.name, s.depth) for s in collect[0].stages] == [("eigener_name", 0), ("parse", 1)]
+
+
+def test_threads_have_separate_runs(collect):
+    barrier = threading.Barrier(2)
+
+    def _work(name):
+        with stage(name):
+            barrier.wait(timeout=5)
+            with stage(f"{name}.innen"):
+                pass
+
+    threads = [threading.Thread(target=_work, args=(name,)) for name in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted([(s.name, s.depth) for s in run.stages] for run in collect) == [
+        [("a", 0), ("a.innen", 1)], [("b", 0), ("b.innen", 1)],
+    ]
+
+
+def test_recent_runs_newest_first_and_bounded():
+    for i in range(instrumentation._RECENT_RUNS + 5):
+        with stage(f"lauf-{i}"):
+            pass
+
+    runs = recent_runs()
+    assert len(runs) == instrumentation._RECENT_RUNS
+    assert runs[0].name == f"lauf-{instrumentation._RECENT_RUNS + 4}"
+    assert runs[-1].name == "lauf-5"
+    assert last_run() is runs[0]
+
+
+def test_failing_sink_does_not_break_stage(collect):
+    def _broken(run):
+        raise RuntimeError("Sink kaputt")
+
+    instrumentation.add_sink(_broken)
+    try:
+        with stage("report"):
+            pass
+    finally:
+        instrumentation.remove_sink(_broken)
+    assert len(collect) == 1
+
+
+def test_memory_peak_with_tracemalloc(collect):
+    was_tracing = tracemalloc.is_tracing()
+    instrumentation.configure(trace_memory=True)
+    try:
+        with stage("report"):
+            with stage("allokation"):
+                data = bytearray(4 * 1024 * 1024)
+                del data
+    finally:
+        instrumentation.configure(trace_memory=was_tracing)
+
+    outer, inner = collect[0].stages
+    assert inner.peak_bytes >= 4 * 1024 * 1024
+    assert outer.peak_bytes >= inner.peak_bytes
+
+
+def test_json_lines_sink(tmp_path):
+    path = tmp_path / "metriken" / "runs.jsonl"
+    sink = JsonLinesSink(path)
+    instrumentation.add_sink(sink)
+    try:
+        _nested_run()
+        _nested_run()
+    finally:
+        instrumentation.remove_sink(sink)
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["name"] == "report"
+    assert [(s["name"], s["depth"]) for s in lines[0]["stages"]] == [
+        ("report", 0), ("render_html", 1), ("jinja", 2), ("write_pdf", 1),
+    ]
+    assert set(lines[0]["stages"][0]) == {"name", "depth", "wall", "cpu", "peak_bytes", "error"}
+
+
+def test_prometheus_textfile_sink(tmp_path):
+    path = tmp_path / "haltungsform.prom"
+    sink = PrometheusTextfileSink(path, prefix="test")
+    instrumentation.add_sink(sink)
+    try:
+        _nested_run()
+        _nested_run()
+        with pytest.raises(ValueError):
+            with stage('write_pdf["x"]'):
+                raise ValueError
+    finally:
+        instrumentation.remove_sink(sink)
+
+    text = path.read_text(encoding="utf-8")
+    samples = {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines() if not line.startswith("#")
+    }
+    assert samples['test_stage_runs_total{stage="report"}'] == 2
+    assert samples['test_stage_runs_total{stage="jinja"}'] == 2
+    assert samples['test_stage_errors_total{stage="report"}'] == 0
+    assert samples['test_stage_errors_total{stage="write_pdf[\\"x\\"]"}'] == 1
+    assert samples['test_stage_seconds_total{stage="report"}'] > 0
+    # Ohne tracemalloc keine Speicherwerte
+    assert not any(key.startswith("test_stage_memory_peak_bytes") for key in samples)
+    assert "# TYPE test_stage_runs_total counter" in text
+    assert not list(tmp_path.glob("*.tmp"))
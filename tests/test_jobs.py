@@ -0,0 +1,143 @@
+"""Tests für die Job-Warteschlange (``src.jobs``)."""
+
+import threading
+import time
+
+import pytest
+
+from src.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, QueueFull
+
+TIMEOUT_S = 5
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(max_workers=1, max_finished=2, max_pending=2)
+    yield queue
+    queue.shutdown(wait=True)
+
+
+def _result(queue: JobQueue, job_id: str):
+    return queue.get(job_id).future.result(timeout=TIMEOUT_S)
+
+
+def _wait(queue: JobQueue, job_id: str) -> None:
+    """Wartet, bis der Job abgeschlossen und als fertig markiert ist."""
+    job = queue.get(job_id)
+    job.future.exception(timeout=TIMEOUT_S)
+    # Der Abschluss-Callback läuft im Worker-Thread kurz nach dem Ergebnis
+    deadline = time.monotonic() + TIMEOUT_S
+    while job.finished is None:
+        assert time.monotonic() < deadline, "Job nicht als fertig markiert"
+        time.sleep(0.01)
+
+
+def _fail():
+    raise RuntimeError("kaputt")
+
+
+def test_job_result_and_status(queue):
+    gate = threading.Event()
+    started = threading.Event()
+
+    def _blocked():
+        started.set()
+        gate.wait(TIMEOUT_S)
+        return b"pdf"
+
+    job_id = queue.submit("a", _blocked)
+    assert started.wait(TIMEOUT_S)
+    job = queue.get(job_id)
+    assert job.status == RUNNING
+    assert job.result is None
+
+    gate.set()
+    assert _result(queue, job_id) == b"pdf"
+    assert job.status == DONE
+    assert job.result == b"pdf"
+    assert job.error is None
+
+
+def test_same_key_is_coalesced(queue):
+    gate = threading.Event()
+    calls = []
+
+    def _blocked():
+        calls.append(1)
+        gate.wait(TIMEOUT_S)
+        return len(calls)
+
+    first = queue.submit("a", _blocked)
+    # Wartend/laufend: gleiche ID, keine zweite Ausführung
+    assert queue.submit("a", _blocked) == first
+    gate.set()
+    _wait(queue, first)
+    # Erfolgreich abgeschlossen: ebenfalls gleiche ID
+    assert queue.submit("a", _blocked) == first
+    assert calls == [1]
+    assert queue.submit("b", _blocked) != first
+
+
+def test_failed_job_is_resubmitted(queue):
+    failed = queue.submit("a", _fail)
+    _wait(queue, failed)
+    job = queue.get(failed)
+    assert job.status == FAILED
+    assert isinstance(job.error, RuntimeError)
+    assert job.result is None
+
+    retried = queue.submit("a", lambda: b"pdf")
+
+    assert retried != failed
+    assert _result(queue, retried) == b"pdf"
+    # Der fehlgeschlagene Job bleibt abrufbar, bis er verdrängt wird
+    assert queue.get(failed).status == FAILED
+
+
+def test_queue_full_at_max_pending(queue):
+    gate = threading.Event()
+    running = queue.submit("a", gate.wait, TIMEOUT_S)
+    waiting = queue.submit("b", gate.wait, TIMEOUT_S)
+    assert queue.pending() == 2
+    assert queue.get(waiting).status == QUEUED
+
+    with pytest.raises(QueueFull):
+        queue.submit("c", gate.wait, TIMEOUT_S)
+    # Zusammengefasste Jobs zählen nicht als neue Jobs
+    assert queue.submit("a", gate.wait, TIMEOUT_S) == running
+
+    gate.set()
+    _wait(queue, running)
+    _wait(queue, waiting)
+    assert queue.pending() == 0
+    queue.submit("c", gate.wait, TIMEOUT_S)
+
+
+def test_finished_jobs_are_evicted_oldest_first(queue):
+    ids = []
+    for key in "abc":
+        ids.append(queue.submit(key, lambda key=key: key))
+        _wait(queue, ids[-1])
+
+    # max_finished=2: der älteste fertige Job ist verworfen
+    assert queue.get(ids[0]) is None
+    assert [queue.get(job_id).result for job_id in ids[1:]] == ["b", "c"]
+    # Sein Schlüssel ist wieder frei und wird neu ausgeführt
+    assert queue.submit("a", lambda: "neu") not in ids
+
+
+def test_pending_jobs_are_not_evicted():
+    queue = JobQueue(max_workers=1, max_finished=0)
+    gate = threading.Event()
+    try:
+        job_ids = [queue.submit(key, gate.wait, TIMEOUT_S) for key in "abc"]
+        jobs = [queue.get(job_id) for job_id in job_ids]
+        assert all(job is not None for job in jobs)
+
+        gate.set()
+        for job in jobs:
+            job.future.result(timeout=TIMEOUT_S)
+    finally:
+        queue.shutdown(wait=True)
+    assert queue.pending() == 0
+    assert all(queue.get(job_id) is None for job_id in job_ids)
@@ -0,0 +1,118 @@
+"""Tests für den Gitterindex der Nachbarbetriebe (``src.nachbarbetriebe``)."""
+
+import io
+
+import numpy as np
+import pytest
+
+from src.nachbarbetriebe import FarmRegister
+
+CENTER = (444957.7, 5750218.4)
+
+
+def _records(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    easting = CENTER[0] + rng.uniform(-5000, 5000, n)
+    northing = CENTER[1] + rng.uniform(-5000, 5000, n)
+    return [(f"Betrieb {i}", e, no, "Mastschweine", i) for i, (e, no) in enumerate(zip(easting, northing))]
+
+
+def _brute_force(records, ostwert, nordwert, radius=None, k=None):
+    distances = sorted(
+        (float(np.hypot(e - ostwert, n - nordwert)), name) for name, e, n, _, _ in records
+    )
+    if radius is not None:
+        distances = [d for d in distances if d[0] <= radius]
+    if k is not None:
+        distances = distances[:k]
+    return distances
+
+
+def _assert_same(result, expected):
+    assert [f.bezeichnung for f in result] == [name for _, name in expected]
+    assert [f.entfernung for f in result] == pytest.approx([d for d, _ in expected])
+
+
+@pytest.fixture(scope="module")
+def records():
+    return _records(2000)
+
+
+@pytest.mark.parametrize("cell_size", [250.0, 1000.0, 3000.0])
+@pytest.mark.parametrize("radius", [0.0, 150.0, 600.0, 2000.0, 20000.0])
+def test_within_radius_matches_brute_force(records, cell_size, radius):
+    register = FarmRegister(records, cell_size=cell_size)
+    rng = np.random.default_rng(1)
+    for ostwert, nordwert in [CENTER, *(CENTER + rng.uniform(-6000, 6000, (5, 2)))]:
+        result = register.within_radius(ostwert, nordwert, radius)
+
+        _assert_same(result, _brute_force(records, ostwert, nordwert, radius=radius))
+
+
+@pytest.mark.parametrize("k", [1, 5, 50])
+def test_nearest_matches_brute_force(records, k):
+    register = FarmRegister(records, cell_size=500.0)
+    # Auch weit außerhalb des Registers: der Radius muss mehrfach verdoppelt werden
+    for ostwert, nordwert in [CENTER, (CENTER[0] + 40000, CENTER[1] - 30000)]:
+        result = register.nearest(ostwert, nordwert, k=k)
+
+        _assert_same(result, _brute_force(records, ostwert, nordwert, k=k))
+
+
+def test_radius_boundary_is_inclusive():
+    register = FarmRegister([("Rand", 1000.0, 0.0, "Sauen", 10), ("Außen", 1000.001, 0.0, "Sauen", 10)])
+
+    assert [f.bezeichnung for f in register.within_radius(0.0, 0.0, 1000.0)] == ["Rand"]
+    assert register.within_radius(0.0, 0.0, -1.0) == []
+
+
+def test_negative_coordinates_and_cell_borders():
+    # Betriebe genau auf Zellgrenzen und beiderseits des Nullpunkts
+    records = [(str(i), e, n, "Rinder", 1) for i, (e, n) in enumerate(
+        [(-1000.0, 0.0), (0.0, -1000.0), (999.999, 1000.0), (-0.5, -0.5), (2000.0, 2000.0)]
+    )]
+    register = FarmRegister(records, cell_size=1000.0)
+
+    for point in [(0.0, 0.0), (-1000.0, -1000.0), (1000.0, 1000.0)]:
+        result = register.within_radius(*point, 1500.0)
+        _assert_same(result, _brute_force(records, *point, radius=1500.0))
+
+
+def test_empty_register():
+    register = FarmRegister([])
+
+    assert len(register) == 0
+    assert register.within_radius(*CENTER, 1000.0) == []
+    assert register.nearest(*CENTER, k=3) == []
+
+
+def test_k_larger_than_register():
+    records = _records(4)
+    register = FarmRegister(records)
+
+    result = register.nearest(*CENTER, k=10)
+
+    _assert_same(result, _brute_force(records, *CENTER))
+    assert register.nearest(*CENTER, k=0) == []
+
+
+def test_from_csv_with_decimal_comma():
+    csv_text = (
+        "bezeichnung;ostwert;nordwert;tierart;tierplaetze\n"
+        "Hof A;444957,7;5750218,4;Mastschweine;1200\n"
+        "Hof B;;5750218,4;Sauen;80\n"
+        "Hof C;445057,7;5750218,4;Rinder;abc\n"
+    )
+
+    register = FarmRegister.from_csv(io.StringIO(csv_text))
+
+    assert len(register) == 2  # Hof B ohne Koordinaten
+    farms = register.within_radius(*CENTER, 200.0)
+    assert [(f.bezeichnung, f.tierplaetze, round(f.entfernung)) for f in farms] == [
+        ("Hof A", 1200, 0), ("Hof C", 0, 100),
+    ]
+
+
+def test_from_csv_missing_column():
+    with pytest.raises(ValueError, match="tierplaetze"):
+        FarmRegister.from_csv(io.StringIO("ostwert;nordwert;tierart\n1;2;Sauen\n"))
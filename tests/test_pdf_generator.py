@@ -0,0 +1,258 @@
+"""Tests für die PDF-Erzeugung (``src.pdf_generator``)."""
+
+import io
+import os
+import shutil
+import socket
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from pypdf import PdfReader
+
+from src import pdf_generator
+from src.models import FarmProject
+from src.pdf_backends import get_backend
+from src.pdf_generator import (
+    _ASSETS_DIR,
+    _LAGEPLAN_MAX_PX,
+    _TEMPLATES_DIR,
+    REPORT_VARIANTS,
+    PdfCache,
+    RenderContext,
+    _cache_key,
+    _encode_lageplan,
+    _RenderInputs,
+    generate_reports,
+    write_pdf,
+)
+
+PROJECT = FarmProject(strasse="Bredeck", hausnummer="3", plz="33442", ort="Herzebrock-Clarholz",
+                      projektnummer="T-1")
+
+
+class _NonSeekableSink(io.RawIOBase):
+    """Beschreibbares Dateiobjekt ohne seek()/tell(), wie eine Pipe."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data += b
+        return len(b)
+
+
+@pytest.fixture(scope="module")
+def reports():
+    return generate_reports(PROJECT, use_cache=False)
+
+
+@pytest.mark.parametrize("variant", list(REPORT_VARIANTS))
+def test_write_pdf_to_non_seekable_sink(variant, reports):
+    sink = _NonSeekableSink()
+
+    write_pdf(PROJECT, sink, variant=variant, use_cache=False)
+
+    assert bytes(sink.data).startswith(b"%PDF")
+    assert len(PdfReader(io.BytesIO(bytes(sink.data))).pages) == len(
+        PdfReader(io.BytesIO(reports[variant])).pages
+    )
+
+
+def test_write_pdf_to_socket():
+    left, right = socket.socketpair()
+    received = bytearray()
+
+    def _read():
+        with right:
+            while chunk := right.recv(65536):
+                received.extend(chunk)
+
+    reader = threading.Thread(target=_read)
+    reader.start()
+    with left, left.makefile("wb") as f:
+        write_pdf(PROJECT, f, variant="voll", use_cache=False)
+    reader.join(timeout=30)
+
+    assert bytes(received).startswith(b"%PDF")
+    assert len(PdfReader(io.BytesIO(bytes(received))).pages) > 1
+
+
+def _save(img: Image.Image, fmt: str, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def _line_drawing(width: int, height: int) -> Image.Image:
+    """Schwarz-rote Strichzeichnung auf weißem Grund."""
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    for x in range(0, width, 150):
+        draw.line([(x, 0), (width - x, height)], fill="black", width=3)
+    for y in range(0, height, 200):
+        draw.line([(0, y), (width, height - y)], fill=(220, 0, 0), width=2)
+    return img
+
+
+def _photo(width: int, height: int) -> Image.Image:
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    pixels = np.clip(base + rng.integers(0, 64, size=(height, width, 3)), 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels, "RGB")
+
+
+def _decode(data: bytes) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+
+def test_downscaled_line_drawing_stays_png():
+    mime, data = _encode_lageplan(_save(_line_drawing(4500, 3000), "PNG"))
+
+    assert mime == "image/png"
+    assert _decode(data).size == (_LAGEPLAN_MAX_PX, 1000)
+
+
+def test_photo_becomes_jpeg():
+    mime, data = _encode_lageplan(_save(_photo(3000, 2000), "PNG"))
+
+    assert mime == "image/jpeg"
+    assert data.startswith(b"\xff\xd8")
+    assert _decode(data).size == (_LAGEPLAN_MAX_PX, 1000)
+
+
+def test_transparent_image_stays_png():
+    img = _photo(400, 300).convert("RGBA")
+    img.putalpha(128)
+
+    mime, data = _encode_lageplan(_save(img, "PNG"))
+
+    assert mime == "image/png"
+    assert _decode(data).mode == "RGBA"
+
+
+@pytest.mark.parametrize("size", [(4500, 3000), (1200, 6000)])
+def test_size_is_capped(size):
+    mime, data = _encode_lageplan(_save(_photo(*size), "JPEG", quality=90))
+
+    assert mime == "image/jpeg"
+    assert max(_decode(data).size) == _LAGEPLAN_MAX_PX
+
+
+def test_small_image_is_not_enlarged():
+    _, data = _encode_lageplan(_save(_line_drawing(800, 600), "PNG"))
+
+    assert _decode(data).size == (800, 600)
+
+
+def test_unreadable_image_is_passed_through():
+    assert _encode_lageplan(b"kein Bild") == ("image/png", b"kein Bild")
+    assert _encode_lageplan(b"\xff\xd8kaputt") == ("image/jpeg", b"\xff\xd8kaputt")
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = PdfCache(max_entries=2)
+    cache.put("a", b"A")
+    cache.put("b", b"B")
+    assert cache.get("a") == b"A"  # a zuletzt genutzt
+
+    cache.put("c", b"C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"A"
+    assert cache.get("c") == b"C"
+    assert cache.stats() == {"hits": 3, "disk_hits": 0, "misses": 1, "entries": 2, "bytes": 2}
+
+
+def test_memory_cache_is_limited_by_size():
+    cache = PdfCache(max_entries=10, max_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"x" * 4)
+    cache.put("c", b"x" * 4)
+    cache.put("zu-gross", b"x" * 11)
+
+    assert cache.get("a") is None
+    assert cache.get("zu-gross") is None
+    assert cache.stats()["bytes"] == 8
+
+
+def test_disk_cache_survives_memory_eviction(tmp_path):
+    cache = PdfCache(max_entries=1, disk_dir=tmp_path)
+    cache.put("a", b"A")
+    cache.put("b", b"B")
+
+    assert cache.get("a") == b"A"
+    assert cache.stats()["disk_hits"] == 1
+    # Neue Instanz: nur die Plattenstufe
+    assert PdfCache(disk_dir=tmp_path).get("b") == b"B"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_disk_cache_evicts_oldest_by_mtime(tmp_path):
+    cache = PdfCache(max_entries=0, disk_dir=tmp_path, disk_max_bytes=30)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, b"x" * 10)
+        os.utime(tmp_path / f"{key}.pdf", (1_000_000 + i, 1_000_000 + i))
+    # Lesen frischt die mtime auf: a ist jetzt zuletzt genutzt
+    assert cache.get("a") is not None
+
+    cache.put("d", b"x" * 10)
+
+    assert sorted(p.stem for p in tmp_path.glob("*.pdf")) == ["a", "c", "d"]
+
+
+@pytest.fixture
+def render_context(tmp_path):
+    templates = tmp_path / "templates"
+    assets = tmp_path / "assets"
+    shutil.copytree(_TEMPLATES_DIR, templates)
+    shutil.copytree(_ASSETS_DIR, assets)
+    return RenderContext(templates, assets)
+
+
+def _touch(path, text: str) -> None:
+    """Hängt ``text`` an und setzt eine neue mtime (auch bei grober Zeitauflösung)."""
+    mtime = path.stat().st_mtime_ns
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+@pytest.mark.parametrize("changed", ["report_kurz.html", "style.css"])
+def test_cache_key_changes_with_template_and_css(render_context, monkeypatch, changed):
+    monkeypatch.setattr(pdf_generator, "_render_context", render_context)
+    inputs = _RenderInputs(PROJECT)
+    backend = get_backend()
+    fingerprint = render_context.fingerprint("report_kurz.html")
+    key = _cache_key(inputs, "report_kurz.html", backend)
+    assert _cache_key(inputs, "report_kurz.html", backend) == key
+
+    _touch(render_context._templates_dir / changed, "\n/* geändert */\n")
+
+    assert render_context.fingerprint("report_kurz.html") != fingerprint
+    assert _cache_key(inputs, "report_kurz.html", backend) != key
+
+
+def test_cache_key_ignores_other_templates(render_context, monkeypatch):
+    monkeypatch.setattr(pdf_generator, "_render_context", render_context)
+    fingerprint = render_context.fingerprint("report_kurz.html")
+
+    _touch(render_context._templates_dir / "report.html", "\n")
+
+    assert render_context.fingerprint("report_kurz.html") == fingerprint
+
+
+def test_cache_key_depends_on_project():
+    backend = get_backend()
+    key = _cache_key(_RenderInputs(PROJECT), "report.html", backend)
+
+    other = PROJECT.model_copy(update={"projektnummer": "T-2"})
+    assert _cache_key(_RenderInputs(other), "report.html", backend) != key
+    assert _cache_key(_RenderInputs(PROJECT), "report_kurz.html", backend) != key
@@ -0,0 +1,149 @@
+"""Tests für die Ablage der Projektentwürfe (``src.project_store``)."""
+
+import sqlite3
+
+import pytest
+
+from src.models import Assessment, AmpelColor, FarmProject, IstZustandRow, Nachbarbetrieb
+from src.project_store import ProjectStore
+
+LAGEPLAN = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+OTHER_LAGEPLAN = b"\xff\xd8" + bytes(1000)
+
+
+def _project(projektnummer="P-1", strasse="Hauptstr.", hausnummer="12a", plz="48143",
+             ort="Münster", lageplan=None) -> FarmProject:
+    return FarmProject(
+        strasse=strasse, hausnummer=hausnummer, plz=plz, ort=ort, projektnummer=projektnummer,
+        immissionsorte=Assessment(aufwand=AmpelColor.RED, begruendung_aufwand="Wohnbebauung"),
+        ist_zustand=[IstZustandRow(be_nr="1", tierplaetze=700)],
+        nachbar_umkreis=600,
+        nachbarbetriebe_liste=[Nachbarbetrieb(bezeichnung="Hof", tierart="Sauen", tierplaetze=80, entfernung=420)],
+        lageplan=lageplan,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProjectStore(tmp_path / "projects.sqlite3")
+    yield store
+    store.close()
+
+
+def _blob_count(store: ProjectStore) -> int:
+    with sqlite3.connect(store.path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM lageplan").fetchone()[0]
+
+
+def test_round_trip_with_lageplan(store):
+    project = _project(lageplan=LAGEPLAN)
+
+    loaded = store.load(store.save(project))
+
+    assert loaded == project
+    assert loaded.lageplan == LAGEPLAN
+    assert loaded.lageplan_sha256 == project.lageplan_sha256
+
+
+def test_round_trip_without_lageplan(store):
+    project = _project()
+
+    loaded = store.load(store.save(project))
+
+    assert loaded == project
+    assert loaded.lageplan is None
+    assert store.list_projects()[0].has_lageplan is False
+
+
+def test_overwrite_existing_draft(store):
+    project_id = store.save(_project(lageplan=LAGEPLAN))
+
+    assert store.save(_project(projektnummer="P-2"), project_id=project_id) == project_id
+
+    assert [s.id for s in store.list_projects()] == [project_id]
+    assert store.load(project_id).projektnummer == "P-2"
+    assert store.load(project_id).lageplan is None
+    assert _blob_count(store) == 0
+
+
+def test_load_unknown_draft(store):
+    with pytest.raises(KeyError):
+        store.load("unbekannt")
+    assert store.delete("unbekannt") is False
+
+
+def test_lageplan_is_stored_once(store):
+    first = store.save(_project("P-1", lageplan=LAGEPLAN))
+    second = store.save(_project("P-2", lageplan=LAGEPLAN))
+    store.save(_project("P-3", lageplan=OTHER_LAGEPLAN))
+
+    assert _blob_count(store) == 2
+    assert store.load(first).lageplan == store.load(second).lageplan == LAGEPLAN
+
+
+def test_orphaned_lageplan_is_removed_after_delete(store):
+    first = store.save(_project("P-1", lageplan=LAGEPLAN))
+    second = store.save(_project("P-2", lageplan=LAGEPLAN))
+
+    assert store.delete(first) is True
+    # Noch von P-2 verwendet
+    assert _blob_count(store) == 1
+    assert store.load(second).lageplan == LAGEPLAN
+
+    assert store.delete(second) is True
+    assert _blob_count(store) == 0
+    assert store.list_projects() == []
+
+
+def test_persists_across_connections(tmp_path):
+    path = tmp_path / "projects.sqlite3"
+    store = ProjectStore(path)
+    project_id = store.save(_project(lageplan=LAGEPLAN))
+    store.close()
+
+    reopened = ProjectStore(path)
+    assert reopened.load(project_id).lageplan == LAGEPLAN
+    reopened.close()
+
+
+def test_find_by_projektnummer(store):
+    first = store.save(_project("P-1"))
+    store.save(_project("P-10"))
+
+    result = store.find_by_projektnummer("P-1")
+
+    assert [s.id for s in result] == [first]
+    assert result[0].adresse_einzeilig == "Hauptstr. 12a, 48143 Münster"
+    assert store.find_by_projektnummer("P-") == []
+
+
+def test_find_by_address_is_normalized(store):
+    first = store.save(_project("P-1", strasse="Hauptstr.", hausnummer="12 a"))
+    second = store.save(_project("P-2", strasse="Hauptstrasse", hausnummer="12a", plz="48149"))
+    store.save(_project("P-3", strasse="Nebenweg", hausnummer="12a"))
+
+    assert {s.id for s in store.find_by_address("HAUPTSTRASSE", "12a")} == {first, second}
+    assert [s.id for s in store.find_by_address("hauptstr.", "12A", plz="48143")] == [first]
+    assert store.find_by_address("Hauptstraße", "13") == []
+    assert store.find_by_address("") == []
+
+
+def test_search(store):
+    first = store.save(_project("Althöfer-2024", strasse="Bredeck", ort="Herzebrock-Clarholz"))
+    second = store.save(_project("P-2", strasse="Bredecker Weg", ort="Münster"))
+    store.save(_project("P-3", strasse="Hauptstr.", ort="Münster"))
+
+    assert {s.id for s in store.search("Bredeck")} == {first, second}
+    assert [s.id for s in store.search(" althöfer ")] == [first]
+    assert [s.id for s in store.search("Clarholz")] == [first]
+    assert len(store.search("", limit=2)) == 2
+
+
+def test_list_projects_newest_first(store):
+    ids = [store.save(_project(f"P-{i}")) for i in range(3)]
+    store.save(_project("P-0 neu"), project_id=ids[0])
+
+    listed = store.list_projects()
+    assert listed[0].id == ids[0]
+    assert {s.id for s in listed} == set(ids)
+    assert len(store.list_projects(limit=1, offset=1)) == 1
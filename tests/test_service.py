@@ -0,0 +1,196 @@
+"""Tests für den HTTP-Dienst (``src.service``) gegen einen lokal gestarteten Server.
+
+Die Worker werden ohne Aufwärmen gestartet; jeder Job rendert einen echten
+Report, die Tests dauern daher einige Sekunden.
+"""
+
+import base64
+import http.client
+import io
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from src.models import FarmProject
+from src.service import ReportService, make_server
+
+XLSX = Path(__file__).resolve().parent.parent / "RHFB_Vorabschätzung_K-HA.xlsx"
+MAX_PENDING = 2
+TIMEOUT_S = 120
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = make_server(port=0, workers=1, max_pending=MAX_PENDING, warm=False)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.service.shutdown()
+
+
+def _request(server, method: str, path: str, body: bytes | None = None):
+    """Sendet eine Anfrage und gibt (Status, Header, Body) zurück."""
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=TIMEOUT_S)
+    try:
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def _project(projektnummer: str) -> bytes:
+    return FarmProject(strasse="Bredeck", hausnummer="3", ort="Herzebrock-Clarholz",
+                       projektnummer=projektnummer).model_dump_json().encode("utf-8")
+
+
+def _wait(server, job_id: str) -> dict:
+    """Fragt den Job ab, bis er abgeschlossen ist."""
+    deadline = time.monotonic() + TIMEOUT_S
+    while time.monotonic() < deadline:
+        status, _, body = _request(server, "GET", f"/jobs/{job_id}")
+        assert status == 200
+        job = json.loads(body)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.2)
+    pytest.fail(f"Job {job_id} nicht rechtzeitig fertig")
+
+
+def test_post_project_json(server):
+    status, headers, body = _request(server, "POST", "/projects", _project("P-1"))
+
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/json")
+    assert json.loads(body)["projektnummer"] == "P-1"
+
+
+def test_post_project_xlsx(server):
+    status, _, body = _request(server, "POST", "/projects", XLSX.read_bytes())
+
+    assert status == 200
+    project = json.loads(body)
+    assert (project["strasse"], project["ort"]) == ("Bredeck", "Herzebrock-Clarholz")
+    assert len(project["ist_zustand"]) == 1
+
+
+def test_post_project_errors(server):
+    status, _, body = _request(server, "POST", "/projects", b'{"ist_zustand": "keine Liste"}')
+    assert status == 422
+    assert json.loads(body)["details"]
+
+    status, _, body = _request(server, "POST", "/projects", b"PK\x03\x04kaputt")
+    assert status == 400
+    assert "XLSX" in json.loads(body)["fehler"]
+
+
+def _lageplan_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_project_with_lageplan_round_trips_to_jobs(server):
+    lageplan = _lageplan_png()
+    original = json.loads(_project("L-1"))
+    original["lageplan_b64"] = base64.b64encode(lageplan).decode("ascii")
+    original = json.dumps(original).encode("utf-8")
+
+    status, _, echoed = _request(server, "POST", "/projects", original)
+    assert status == 200
+    assert base64.b64decode(json.loads(echoed)["lageplan_b64"]) == lageplan
+
+    # Der Job-Schlüssel enthält den Hash des Lageplans: gleiche ID nur mit Lageplan
+    status, _, body = _request(server, "POST", "/jobs?variant=kurz", original)
+    assert status == 202
+    job_id = json.loads(body)["id"]
+    status, _, body = _request(server, "POST", "/jobs?variant=kurz", echoed)
+    assert status == 202
+    assert json.loads(body)["id"] == job_id
+    assert _wait(server, job_id)["status"] == "done"
+
+
+def test_job_lifecycle_and_coalescing(server):
+    status, headers, body = _request(server, "POST", "/jobs?variant=kurz", _project("P-2"))
+    assert status == 202
+    job_id = json.loads(body)["id"]
+    assert headers["Location"] == f"/jobs/{job_id}"
+
+    # Gleiches Projekt, gleiche Variante: derselbe Job
+    status, _, body = _request(server, "POST", "/jobs?variant=kurz", _project("P-2"))
+    assert status == 202
+    assert json.loads(body)["id"] == job_id
+
+    job = _wait(server, job_id)
+    assert job["status"] == "done"
+    assert job["pdf"] == f"/jobs/{job_id}/pdf"
+
+    status, headers, body = _request(server, "GET", job["pdf"])
+    assert status == 200
+    assert headers["Content-Type"] == "application/pdf"
+    assert body.startswith(b"%PDF")
+
+    # Auch nach Abschluss wird nicht erneut gerendert
+    status, _, body = _request(server, "POST", "/jobs?variant=kurz", _project("P-2"))
+    assert json.loads(body)["id"] == job_id
+
+
+def test_unknown_variant(server):
+    status, _, _ = _request(server, "POST", "/jobs?variant=lang", _project("P-3"))
+    assert status == 400
+
+
+def test_queue_full_and_pdf_not_ready(server):
+    job_ids = []
+    for i in range(MAX_PENDING):
+        status, _, body = _request(server, "POST", "/jobs?variant=kurz", _project(f"Q-{i}"))
+        assert status == 202
+        job_ids.append(json.loads(body)["id"])
+
+    status, headers, body = _request(server, "POST", "/jobs?variant=kurz", _project("Q-voll"))
+    assert status == 429
+    assert headers["Retry-After"] == "5"
+    assert json.loads(body)["fehler"]
+
+    # Mit einem Worker wartet der letzte Job noch
+    status, headers, _ = _request(server, "GET", f"/jobs/{job_ids[-1]}/pdf")
+    assert status == 409
+    assert headers["Retry-After"] == "1"
+
+    for job_id in job_ids:
+        assert _wait(server, job_id)["status"] == "done"
+    status, _, _ = _request(server, "POST", "/jobs?variant=kurz", _project("Q-voll"))
+    assert status == 202
+
+
+@pytest.mark.parametrize(
+    ("method", "path"),
+    [
+        ("GET", "/jobs/" + "0" * 32),
+        ("GET", "/jobs/" + "0" * 32 + "/pdf"),
+        ("GET", "/jobs/kein-job"),
+        ("GET", "/"),
+        ("POST", "/unbekannt"),
+    ],
+)
+def test_unknown_paths(server, method, path):
+    status, _, body = _request(server, method, path, b"{}" if method == "POST" else None)
+
+    assert status == 404
+    assert json.loads(body)["fehler"]
+
+
+def test_start_workers_starts_every_worker():
+    service = ReportService(workers=2, warm=False)
+    try:
+        service.start_workers()
+        assert len(service.worker_pids) == 2
+    finally:
+        service.shutdown()
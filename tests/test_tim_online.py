@@ -0,0 +1,171 @@
+"""Tests für das Geocoding mit SQLite-Cache (``src.tim_online``)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src import tim_online
+from src.tim_online import (
+    DEFAULT_NEGATIVE_TTL,
+    DEFAULT_TTL,
+    GeocodeCache,
+    GeocoderChain,
+    build_tim_online_url,
+    geocode_utm,
+)
+
+ADDRESS = ("Musterstraße", "1", "48143", "Münster")
+
+
+class StubGeocoder:
+    """Geocoder mit geopy-Schnittstelle; liefert ``result`` bzw. wirft es."""
+
+    def __init__(self, result=None):
+        self.result = result
+        self.calls = 0
+
+    def geocode(self, query, exactly_one=True, timeout=None):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def _location(lat=51.9, lon=8.2):
+    return SimpleNamespace(latitude=lat, longitude=lon)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Steuerbare Uhr für die Gültigkeitsdauer der Cache-Einträge."""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(tim_online.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = GeocodeCache(tmp_path / "geocode.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_hit_is_served_from_cache(cache):
+    geocoder = StubGeocoder(_location())
+
+    first = geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache)
+    second = geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache)
+
+    assert first == pytest.approx((444957.698, 5750218.425), abs=1e-3)
+    assert second == first
+    assert geocoder.calls == 1
+
+
+def test_cache_key_is_normalized(cache):
+    geocoder = StubGeocoder(_location())
+
+    geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache)
+    geocode_utm(" MUSTERSTRASSE ", "1", "48143", "münster", geocoder=geocoder, cache=cache)
+
+    assert geocoder.calls == 1
+
+
+def test_cache_persists_across_connections(tmp_path):
+    path = tmp_path / "geocode.sqlite3"
+    first = GeocodeCache(path)
+    geocode_utm(*ADDRESS, geocoder=StubGeocoder(_location()), cache=first)
+    first.close()
+
+    second = GeocodeCache(path)
+    geocoder = StubGeocoder(_location())
+    assert geocode_utm(*ADDRESS, geocoder=geocoder, cache=second) is not None
+    assert geocoder.calls == 0
+    second.close()
+
+
+def test_miss_is_cached_negatively(cache):
+    geocoder = StubGeocoder(None)
+
+    assert geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache) is None
+    assert geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache) is None
+    assert geocoder.calls == 1
+    assert build_tim_online_url(*ADDRESS, geocoder=geocoder, cache=cache) is None
+    assert geocoder.calls == 1
+
+
+def test_positive_entry_expires_after_ttl(cache, clock):
+    geocoder = StubGeocoder(_location())
+    geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache)
+
+    clock[0] += DEFAULT_TTL - 60
+    geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache)
+    assert geocoder.calls == 1
+
+    clock[0] += 120
+    geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache)
+    assert geocoder.calls == 2
+
+
+def test_negative_entry_expires_after_one_day(cache, clock):
+    assert DEFAULT_NEGATIVE_TTL == 24 * 3600
+    geocoder = StubGeocoder(None)
+    geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache)
+
+    clock[0] += 23 * 3600
+    assert geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache) is None
+    assert geocoder.calls == 1
+
+    # Adresse inzwischen bekannt: nach Ablauf wird erneut gefragt
+    clock[0] += 2 * 3600
+    geocoder.result = _location()
+    assert geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache) is not None
+    assert geocoder.calls == 2
+
+
+def test_purge_expired(cache, clock):
+    geocode_utm(*ADDRESS, geocoder=StubGeocoder(None), cache=cache)
+    geocode_utm("Andere Straße", "2", "48143", "Münster", geocoder=StubGeocoder(_location()), cache=cache)
+
+    clock[0] += DEFAULT_NEGATIVE_TTL + 1
+    assert cache.purge_expired() == 1
+
+
+def test_errors_are_not_cached(cache):
+    geocoder = StubGeocoder(TimeoutError("Dienst nicht erreichbar"))
+
+    assert geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache) is None
+    assert cache.get(tim_online.normalize_address(*ADDRESS)) is None
+
+    geocoder.result = _location()
+    assert geocode_utm(*ADDRESS, geocoder=geocoder, cache=cache) is not None
+    assert geocoder.calls == 2
+
+
+def test_chain_outage_is_not_cached_as_miss(cache):
+    gazetteer = StubGeocoder(None)
+    nominatim = StubGeocoder(TimeoutError("Dienst nicht erreichbar"))
+    chain = GeocoderChain([gazetteer, nominatim])
+
+    with pytest.raises(TimeoutError):
+        chain.geocode(query={}, exactly_one=True)
+    assert geocode_utm(*ADDRESS, geocoder=chain, cache=cache) is None
+    assert cache.get(tim_online.normalize_address(*ADDRESS)) is None
+
+
+def test_chain_returns_first_result():
+    chain = GeocoderChain([StubGeocoder(TimeoutError()), StubGeocoder(_location(51.0, 7.0))])
+    assert chain.geocode(query={}).latitude == 51.0
+    assert GeocoderChain([StubGeocoder(None), StubGeocoder(None)]).geocode(query={}) is None
+
+
+def test_bulk_lookup_uses_cache(cache):
+    geocoder = StubGeocoder(_location())
+    addresses = [ADDRESS, ADDRESS, ("", "", "", "Münster")]
+
+    first = tim_online.build_tim_online_urls(addresses, geocoder=geocoder, cache=cache)
+    second = tim_online.build_tim_online_urls(addresses, geocoder=geocoder, cache=cache)
+
+    assert [r.status for r in first] == ["geocoded", "geocoded", "invalid"]
+    assert [r.status for r in second] == ["cached", "cached", "invalid"]
+    assert first[0].url == second[0].url
+    assert geocoder.calls == 1
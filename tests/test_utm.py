@@ -0,0 +1,70 @@
+"""Tests für die Umrechnung WGS84 -> ETRS89/UTM32N (``src.utm``)."""
+
+import numpy as np
+import pytest
+
+from src.utm import wgs84_to_utm32
+
+# Referenzwerte aus pyproj (EPSG:4326 -> EPSG:25832)
+REFERENCE = [
+    # (Breite, Länge, Rechtswert, Hochwert)
+    (51.9, 8.2, 444957.69833736384, 5750218.425264534),
+    (51.0, 9.0, 500000.0, 5649824.888131557),  # Mittelmeridian
+    (50.32, 5.86, 276483.1786264735, 5578926.636538198),  # Südwestecke NRW
+    (52.53, 9.47, 531883.228870956, 5820092.773869069),  # Nordostecke NRW
+    (51.4556, 7.0116, 361851.81100552494, 5702366.526250851),  # Essen
+    (50.9375, 6.9603, 356689.07368722034, 5644855.73355422),  # Köln
+    (52.0302, 8.5325, 467927.55782438954, 5764500.3027322395),  # Bielefeld
+    (47.3, 10.5, 613397.455615734, 5239593.90406215),  # Allgäu
+    (54.9, 6.0, 307647.16565332864, 6087785.208389285),  # Nordsee
+]
+
+# Unter einem Millimeter, wie in benchmarks/bench_utm.py (--tolerance-mm 0.1)
+TOLERANCE_M = 1e-4
+
+# Rechteck um NRW (wie benchmarks/bench_utm.py)
+NRW_LAT = (50.32, 52.53)
+NRW_LON = (5.86, 9.47)
+
+
+@pytest.mark.parametrize(("lat", "lon", "easting", "northing"), REFERENCE)
+def test_reference_points(lat, lon, easting, northing):
+    result = wgs84_to_utm32(lat, lon)
+
+    assert isinstance(result[0], float) and isinstance(result[1], float)
+    assert result == pytest.approx((easting, northing), abs=TOLERANCE_M)
+
+
+def test_arrays_match_scalars():
+    lat = np.array([p[0] for p in REFERENCE])
+    lon = np.array([p[1] for p in REFERENCE])
+
+    easting, northing = wgs84_to_utm32(lat, lon)
+
+    assert easting.shape == northing.shape == lat.shape
+    assert easting.tolist() == [wgs84_to_utm32(la, lo)[0] for la, lo in zip(lat, lon)]
+    np.testing.assert_allclose(easting, [p[2] for p in REFERENCE], rtol=0, atol=TOLERANCE_M)
+    np.testing.assert_allclose(northing, [p[3] for p in REFERENCE], rtol=0, atol=TOLERANCE_M)
+
+
+def test_array_shape_is_kept():
+    lat = np.full((2, 3), 51.9)
+    lon = np.full((2, 3), 8.2)
+
+    easting, northing = wgs84_to_utm32(lat, lon)
+
+    assert easting.shape == northing.shape == (2, 3)
+
+
+def test_matches_pyproj():
+    pyproj = pytest.importorskip("pyproj")
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(*NRW_LAT, 10_000)
+    lon = rng.uniform(*NRW_LON, 10_000)
+
+    transformer = pyproj.Transformer.from_crs("EPSG:4326", "EPSG:25832", always_xy=False)
+    ref_easting, ref_northing = transformer.transform(lat, lon)
+    easting, northing = wgs84_to_utm32(lat, lon)
+
+    np.testing.assert_allclose(easting, ref_easting, rtol=0, atol=TOLERANCE_M)
+    np.testing.assert_allclose(northing, ref_northing, rtol=0, atol=TOLERANCE_M)
@@ -0,0 +1,129 @@
+"""Tests für den Parser der profarm XLSX-Datei (``src.xlsx_parser``)."""
+
+import io
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from src.xlsx_parser import (
+    DEFAULT_COLUMNS,
+    DEFAULT_HEADER_CELLS,
+    DEFAULT_LAYOUT,
+    iter_betriebseinheiten,
+    parse_xlsx,
+    parse_xlsx_multi,
+)
+
+TEMPLATE = Path(__file__).resolve().parent.parent / "RHFB_Vorabschätzung_K-HA.xlsx"
+
+UNIT = ("Mastschweine", 700, "1 - Zwangsbelüfteter Stall", "Ja", "Nein", "Mastschweine", 800, "1")
+
+
+def _workbook(units: dict[int, tuple], header: dict | None = None) -> bytes:
+    """Mitgelieferte Arbeitsmappe mit Betriebseinheiten nur in den Zeilen aus ``units``.
+
+    ``header`` überschreibt Adressdaten (Feldname -> Wert).
+    """
+    wb = openpyxl.load_workbook(TEMPLATE)
+    ws = wb[DEFAULT_LAYOUT.sheet_name]
+    for name, value in (header or {}).items():
+        ws[DEFAULT_HEADER_CELLS[name]] = value
+    ws.delete_rows(DEFAULT_LAYOUT.start_row, ws.max_row - DEFAULT_LAYOUT.start_row + 1)
+    for row, (be_nr, values) in units.items():
+        ws[f"{DEFAULT_COLUMNS['be_nr']}{row}"] = be_nr
+        for name, value in zip(list(DEFAULT_COLUMNS)[1:], values):
+            ws[f"{DEFAULT_COLUMNS[name]}{row}"] = value
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def test_bundled_workbook():
+    data = parse_xlsx(TEMPLATE.read_bytes())
+
+    assert (data["strasse"], data["hausnummer"], data["plz"], data["ort"]) == (
+        "Bredeck", "3", "33442", "Herzebrock-Clarholz",
+    )
+    assert [row.be_nr for row in data["ist_zustand"]] == ["1"]
+    assert data["plan_zustand"][0].tierplaetze == 700
+
+
+@pytest.mark.parametrize("read_only", [True, False])
+def test_gap_before_old_end_row_is_not_cut_off(read_only):
+    # Bis Zeile 50 hat der Parser schon immer gelesen, Lücken eingeschlossen
+    file_bytes = _workbook({9: (1, UNIT), 40: (2, UNIT)})
+
+    data = parse_xlsx(file_bytes, read_only=read_only)
+
+    assert [row.be_nr for row in data["ist_zustand"]] == ["1", "2"]
+    assert [row.tierplaetze for row in data["plan_zustand"]] == [800, 800]
+
+
+def test_rows_after_old_end_row_are_read():
+    file_bytes = _workbook({9: (1, UNIT), 50: (2, UNIT), 65: (3, UNIT)})
+
+    assert [row.be_nr for row in parse_xlsx(file_bytes)["ist_zustand"]] == ["1", "2", "3"]
+
+
+def test_table_ends_after_empty_rows():
+    last = DEFAULT_LAYOUT.min_end_row + DEFAULT_LAYOUT.max_empty_rows + 1
+    file_bytes = _workbook({9: (1, UNIT), last: (2, UNIT)})
+
+    assert [row.be_nr for row in parse_xlsx(file_bytes)["ist_zustand"]] == ["1"]
+
+
+def test_iter_betriebseinheiten_matches_parse_xlsx():
+    file_bytes = _workbook({9: (1, UNIT), 40: (2, UNIT)})
+
+    ist, plan = zip(*iter_betriebseinheiten(file_bytes))
+
+    data = parse_xlsx(file_bytes)
+    assert list(ist) == data["ist_zustand"]
+    assert list(plan) == data["plan_zustand"]
+
+
+def _combine(workbooks: dict[str, bytes]) -> bytes:
+    """Eine Arbeitsmappe mit je einem Blatt (Name -> Datei) plus einem fremden Blatt."""
+    combined = openpyxl.Workbook()
+    combined.active.title = "Notizen"
+    combined.active["A1"] = "Kein profarm-Blatt"
+    for title, file_bytes in workbooks.items():
+        source = openpyxl.load_workbook(io.BytesIO(file_bytes))[DEFAULT_LAYOUT.sheet_name]
+        target = combined.create_sheet(title)
+        for row in source.iter_rows():
+            for cell in row:
+                if cell.value is not None:
+                    target[cell.coordinate] = cell.value
+    buffer = io.BytesIO()
+    combined.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_parse_xlsx_multi_matches_parse_xlsx(use_processes):
+    workbooks = {
+        "Betrieb A": _workbook({9: (1, UNIT), 10: (2, UNIT)}, {"projektnummer": "A-1"}),
+        "Betrieb B": _workbook(
+            {9: ("1a", ("Sauen", 120, "1", "Nein", "Ja", "Sauen", 0, "1")), 40: (7, UNIT)},
+            {"projektnummer": "B-2", "strasse": "Dorfstraße", "ort": "Telgte"},
+        ),
+    }
+
+    projects = parse_xlsx_multi(_combine(workbooks), max_workers=2, use_processes=use_processes)
+
+    assert sorted(projects) == ["A-1", "B-2"]
+    for key, (title, file_bytes) in zip(["A-1", "B-2"], workbooks.items()):
+        result = dict(projects[key])
+        assert result.pop("blatt") == title
+        assert result == parse_xlsx(file_bytes)
+
+
+def test_parse_xlsx_multi_keys():
+    same = _workbook({9: (1, UNIT)}, {"projektnummer": "P-1"})
+    unnamed = _workbook({9: (1, UNIT)}, {"projektnummer": None})
+
+    projects = parse_xlsx_multi(_combine({"Erstes": same, "Zweites": same, "Ohne Nummer": unnamed}))
+
+    assert sorted(projects) == ["Ohne Nummer", "P-1", "P-1 (Zweites)"]
+    assert parse_xlsx_multi(_combine({})) == {}